@@ -0,0 +1,84 @@
+# World backups: a full first backup with one worker and with the process
+# pool, then incremental backups of the unchanged world and after a few
+# chunks in some region files changed.
+# The world is synthetic: SIZE_MB of region files with partly compressible
+# content (like real chunk data), written to a temporary directory.
+# Run from the repository root: python -m benchmarks.bench_backup [size_mb]
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from src.backend.backup import BackupManager
+
+REGION_MB = 8
+# Region files touched in the "changed" run, and bytes written into each
+TOUCHED_REGIONS = 10
+TOUCH_BYTES = 4096
+
+
+class OfflineServer:
+    # Stands in for a ServerManager that is not running
+    def __init__(self, server_dir):
+        self.server_dir = server_dir
+        self.is_running = False
+
+
+class WorldConfig:
+    def get_value(self, filename, key, default=None):
+        return default
+
+
+def make_world(server_dir, size_mb, rng):
+    region_dir = os.path.join(server_dir, "world", "region")
+    os.makedirs(region_dir)
+    words = [rng.randbytes(16) for _ in range(64)]
+    parts = [rng.choice(words) + rng.randbytes(16) + rng.choice(words) + rng.choice(words)
+             for _ in range(REGION_MB * 1024 * 1024 // 64)]
+    template = b"".join(parts)
+    for i in range(max(1, size_mb // REGION_MB)):
+        # Same statistics in every file, but no piece shared between files
+        data = bytearray(template)
+        for offset in range(0, len(data), 4096):
+            data[offset:offset + 16] = rng.randbytes(16)
+        with open(os.path.join(region_dir, f"r.{i}.0.mca"), "wb") as f:
+            f.write(data)
+    with open(os.path.join(server_dir, "world", "level.dat"), "wb") as f:
+        f.write(rng.randbytes(4096))
+    return region_dir
+
+
+def run(label, manager):
+    result = manager.backup(label)
+    print(f"{label:<28} {result['seconds']:8.3f} s  {result['changed_files']:5d} changed files  "
+          f"{result['new_bytes'] / 1048576:8.1f} MB new  {result['stored_bytes'] / 1048576:8.1f} MB stored")
+    return result
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as root:
+        server_dir = os.path.join(root, "server")
+        started = time.perf_counter()
+        region_dir = make_world(server_dir, size_mb, rng)
+        print(f"Wrote a {size_mb} MB world in {time.perf_counter() - started:.1f} s")
+
+        single = BackupManager(OfflineServer(server_dir), WorldConfig(), os.path.join(root, "single"), workers=1)
+        run("full, 1 worker", single)
+        shutil.rmtree(os.path.join(root, "single"))
+
+        pooled = BackupManager(OfflineServer(server_dir), WorldConfig(), os.path.join(root, "store"))
+        run(f"full, {pooled.workers} workers", pooled)
+        result = run("incremental, unchanged", pooled)
+        print(f"    {result['files'] / max(result['seconds'], 1e-9):,.0f} files/s checked; "
+              f"a 10 GB world has ~{10 * 1024 // REGION_MB} region files of {REGION_MB} MB")
+
+        names = sorted(os.listdir(region_dir))
+        for name in rng.sample(names, min(TOUCHED_REGIONS, len(names))):
+            with open(os.path.join(region_dir, name), "r+b") as f:
+                f.seek(rng.randrange(REGION_MB * 1024 * 1024 - TOUCH_BYTES))
+                f.write(rng.randbytes(TOUCH_BYTES))
+        run("incremental, chunks changed", pooled)
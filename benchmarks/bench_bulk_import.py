@@ -0,0 +1,101 @@
+# Bulk whitelist import against a local stub of the Mojang API: one GET per
+# name (the old path), batched concurrent POSTs, and the same import again
+# answered from the UUID cache.
+# Run from the repository root: python -m benchmarks.bench_bulk_import [names] [latency_ms]
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.backend.mojang_api import MojangClient
+from src.backend.player_manager import PlayerManager
+from src.backend.uuid_cache import UuidResolver
+
+
+def fake_id(name):
+    return hashlib.md5(name.lower().encode()).hexdigest()
+
+
+class MojangStub(BaseHTTPRequestHandler):
+    # Answers the two lookup endpoints; names starting with "ghost" do not exist
+    latency = 0.05
+    requests_served = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        time.sleep(self.latency)
+        MojangStub.requests_served += 1
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        name = self.path.rsplit("/", 1)[-1]
+        if name.startswith("ghost"):
+            self._reply(204)
+        else:
+            self._reply(200, {"id": fake_id(name), "name": name})
+
+    def do_POST(self):
+        names = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if len(names) > 10:
+            self._reply(400, {"error": "too many names"})
+            return
+        self._reply(200, [{"id": fake_id(n), "name": n} for n in names if not n.startswith("ghost")])
+
+
+def start_stub(latency):
+    MojangStub.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MojangStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    names = [f"player{i}" for i in range(count - count // 50)] + [f"ghost{i}" for i in range(count // 50)]
+    server, url = start_stub(latency)
+
+    with tempfile.TemporaryDirectory() as root:
+        # Rate limit opened up so the comparison measures round trips, not the bucket
+        client = MojangClient(base_url=url, rate=1000, burst=1000)
+        manager = PlayerManager(root, resolver=UuidResolver(client, cache_path=None))
+        start = time.perf_counter()
+        for name in names:
+            manager.add_to_whitelist(name)
+        manager.flush()
+        sequential = time.perf_counter() - start
+        sequential_requests = MojangStub.requests_served
+
+        os.remove(os.path.join(root, "whitelist.json"))
+        manager = PlayerManager(root, resolver=UuidResolver(client, cache_path=None))
+        MojangStub.requests_served = 0
+        start = time.perf_counter()
+        added, skipped, unresolved = manager.bulk_import(names)
+        bulk = time.perf_counter() - start
+        bulk_requests = MojangStub.requests_served
+
+        # Same names again through the now-warm resolver cache
+        MojangStub.requests_served = 0
+        os.remove(os.path.join(root, "whitelist.json"))
+        warm_manager = PlayerManager(root, resolver=manager.resolver)
+        start = time.perf_counter()
+        warm_manager.bulk_import(names)
+        warm = time.perf_counter() - start
+        warm_requests = MojangStub.requests_served
+
+    server.shutdown()
+    print(f"names                {count} ({len(unresolved)} unknown), stub latency {latency * 1000:.0f} ms")
+    print(f"one GET per name     {sequential:8.2f} s  {sequential_requests} requests")
+    print(f"bulk import          {bulk:8.2f} s  {bulk_requests} requests, {added} added")
+    print(f"bulk import, cached  {warm:8.2f} s  {warm_requests} requests")
@@ -0,0 +1,111 @@
+# IP bans with large blocklists: importing a list of N random IPv4/IPv6
+# prefixes into an empty banned-ips.json (parse, index, one atomic write),
+# reloading the written file, lookups per second against the interval index
+# compared with a linear scan over the same ranges (on a small sample), one
+# ban and unban on the full list, and the memory held by the index.
+# Run from the repository root: python -m benchmarks.bench_ip_bans [prefixes]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.backend.ip_index import IpIndex, parse_address, parse_range
+from src.backend.player_manager import PlayerManager
+
+LOOKUPS = 200000
+# Linear scans are this much slower, so they get fewer lookups
+SCAN_LOOKUPS = 200
+# Share of the list that is IPv6
+IPV6_SHARE = 0.1
+
+
+def make_blocklist(path, count, rng):
+    with open(path, "w") as f:
+        f.write("# Synthetic blocklist\n")
+        for _ in range(count):
+            if rng.random() < IPV6_SHARE:
+                value = rng.getrandbits(128)
+                prefix = rng.choice((32, 48, 56, 64, 128))
+                f.write(f"{parse_range(f'{format_v6(value)}/{prefix}')[3]}\n")
+            else:
+                prefix = rng.choice((16, 20, 24, 24, 24, 28, 32, 32))
+                value = rng.getrandbits(32)
+                f.write(f"{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}/{prefix}\n")
+
+
+def format_v6(value):
+    return ":".join(f"{value >> shift & 0xffff:x}" for shift in range(112, -1, -16))
+
+
+def random_addresses(count, rng):
+    addresses = []
+    for _ in range(count):
+        if rng.random() < IPV6_SHARE:
+            addresses.append(format_v6(rng.getrandbits(128)))
+        else:
+            value = rng.getrandbits(32)
+            addresses.append(f"{value >> 24}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}")
+    return addresses
+
+
+def timed(label, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<36} {time.perf_counter() - started:8.3f} s")
+    return result
+
+
+def index_memory(ranges):
+    tracemalloc.start()
+    index = IpIndex()
+    index.add_many(ranges)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return index, size
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as root:
+        blocklist = os.path.join(root, "blocklist.netset")
+        make_blocklist(blocklist, count, rng)
+
+        players = PlayerManager(root)
+        added, already, invalid = timed(f"import {count:,} prefixes", players.import_ip_blocklist, blocklist)
+        print(f"    {added:,} added, {already:,} already covered, {len(invalid)} invalid; "
+              f"banned-ips.json {os.path.getsize(players.banned_ips_file) / 1048576:.1f} MB, "
+              f"{len(players.banned_ips.index):,} merged intervals")
+
+        reloaded = PlayerManager(root)
+        timed("reload banned-ips.json", len, reloaded.banned_ips)
+
+        addresses = random_addresses(LOOKUPS, rng)
+        started = time.perf_counter()
+        hits = sum(reloaded.is_ip_banned(address) for address in addresses)
+        elapsed = time.perf_counter() - started
+        print(f"{'is_ip_banned':<36} {LOOKUPS / elapsed:12,.0f} lookups/s  ({hits:,} banned)")
+
+        ranges = [parse_range(entry["ip"])[:3] for entry in reloaded.get_banned_ips()]
+        index, size = index_memory(ranges)
+        parsed = [parse_address(address) for address in addresses]
+        started = time.perf_counter()
+        for version, value in parsed:
+            index.contains(version, value)
+        elapsed = time.perf_counter() - started
+        print(f"{'index lookups (pre-parsed)':<36} {LOOKUPS / elapsed:12,.0f} lookups/s  "
+              f"index {size / 1048576:.1f} MB")
+        started = time.perf_counter()
+        for version, value in parsed[:SCAN_LOOKUPS]:
+            any(v == version and first <= value <= last for v, first, last in ranges)
+        elapsed = time.perf_counter() - started
+        print(f"{'linear scan':<36} {SCAN_LOOKUPS / elapsed:12,.0f} lookups/s")
+
+        address = next(a for a in addresses if not reloaded.is_ip_banned(a))
+        timed(f"ban {address}", reloaded.ban_ip, address)
+        timed("first lookup after it", reloaded.is_ip_banned, address)
+        timed("unban it", reloaded.unban_ip, address)
+        timed("first lookup after (re-index)", reloaded.is_ip_banned, address)
+        timed("write", reloaded.flush)
@@ -0,0 +1,71 @@
+# Python-side CPU cost per MB of console output: the old text-mode
+# readline()/strip() loop versus the chunked os.read reader.
+# Run from the repository root: python -m benchmarks.bench_line_reader [MB]
+import subprocess
+import sys
+import time
+
+from src.backend.line_reader import read_line_batches
+from src.backend.output_channel import OutputChannel
+
+GENERATOR = r"""
+import sys
+line = b"[12:00:00] [Server thread/INFO]: Preparing spawn area: 42% chunk 1234,5678 loaded\n"
+block = line * 1000
+remaining = int(sys.argv[1]) * 1024 * 1024
+out = sys.stdout.buffer
+while remaining > 0:
+    out.write(block)
+    remaining -= len(block)
+out.flush()
+"""
+
+
+def spawn(megabytes, text):
+    kwargs = {"text": True, "bufsize": 1} if text else {}
+    return subprocess.Popen(
+        [sys.executable, "-c", GENERATOR, str(megabytes)],
+        stdout=subprocess.PIPE, **kwargs
+    )
+
+
+def run_text(megabytes):
+    channel = OutputChannel(capacity=10000)
+    proc = spawn(megabytes, text=True)
+    cpu = time.process_time()
+    count = 0
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            break
+        channel.put(line.strip())
+        count += 1
+        if count % 5000 == 0:
+            channel.drain()
+    cpu = time.process_time() - cpu
+    proc.wait()
+    return cpu, count
+
+
+def run_chunked(megabytes):
+    channel = OutputChannel(capacity=10000)
+    proc = spawn(megabytes, text=False)
+    cpu = time.process_time()
+    count = 0
+    for lines in read_line_batches(proc.stdout.fileno()):
+        channel.put_many(lines)
+        count += len(lines)
+        if len(channel) > 5000:
+            channel.drain()
+    cpu = time.process_time() - cpu
+    proc.wait()
+    return cpu, count
+
+
+if __name__ == "__main__":
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    text_cpu, text_lines = run_text(megabytes)
+    chunk_cpu, chunk_lines = run_chunked(megabytes)
+    print(f"text readline  {text_cpu / megabytes * 1000:8.2f} ms CPU/MB  ({text_lines} lines)")
+    print(f"chunked read   {chunk_cpu / megabytes * 1000:8.2f} ms CPU/MB  ({chunk_lines} lines)")
+    print(f"speedup        {text_cpu / chunk_cpu:8.2f}x")
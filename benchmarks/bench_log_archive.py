@@ -0,0 +1,70 @@
+# Console archive: cost of observe() on the reader thread, background
+# compression throughput and ratio, and a 3-minute "Exception" search against
+# a scan of the whole day.
+# Run from the repository root: python -m benchmarks.bench_log_archive [lines]
+import random
+import sys
+import tempfile
+import time
+
+from src.backend.log_archive import ArchiveWriter, LogArchive
+
+DAY = 24 * 3600
+SAMPLES = [
+    b"[%02d:%02d:%02d] [Server thread/INFO]: Steve%d joined the game",
+    b"[%02d:%02d:%02d] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running %dms or 40 ticks behind",
+    b"[%02d:%02d:%02d] [Server thread/INFO]: <Alex> hello world %d",
+    b"[%02d:%02d:%02d] [Server thread/ERROR]: Encountered an unexpected Exception %d",
+    b"[%02d:%02d:%02d] [Server thread/INFO]: Saved the game %d",
+]
+
+
+def make_line(ts, rng):
+    t = int(ts) % DAY
+    return rng.choice(SAMPLES) % (t // 3600, t // 60 % 60, t % 60, rng.randrange(10000))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(1)
+    day_start = time.time() - DAY
+    step = DAY / count
+    batches = []
+    for i in range(0, count, 50):
+        ts = day_start + i * step
+        batches.append((ts, [make_line(ts, rng) for _ in range(50)]))
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = ArchiveWriter()
+        archive = LogArchive(root, writer)
+
+        # Reader-thread cost: what observe() does, timestamped like the real one
+        start = time.perf_counter()
+        for ts, lines in batches:
+            writer.submit(archive, ts, lines)
+        queued = time.perf_counter() - start
+
+        start = time.perf_counter()
+        writer.drain()
+        archive.flush()
+        written = time.perf_counter() - start
+        stats = archive.get_stats()
+
+        window_start = day_start + 14 * 3600 + 120
+        window_end = window_start + 180
+        start = time.perf_counter()
+        hits = archive.search(window_start, window_end, contains="Exception")
+        ranged = time.perf_counter() - start
+
+        start = time.perf_counter()
+        everything = archive.search(contains="Exception")
+        full = time.perf_counter() - start
+        archive.close()
+
+    print(f"lines                {count}, {stats['blocks']} blocks in {stats['segments']} segments")
+    print(f"observe() per batch  {queued / len(batches) * 1e6:8.2f} us (50 lines)")
+    print(f"compress + write     {count / written / 1e6:8.2f} M lines/s, "
+          f"{stats['raw_bytes'] / 1e6:.1f} MB -> {stats['compressed_bytes'] / 1e6:.1f} MB "
+          f"({stats['raw_bytes'] / stats['compressed_bytes']:.1f}x)")
+    print(f"3-minute search      {ranged * 1000:8.2f} ms, {len(hits)} hits")
+    print(f"whole-day search     {full * 1000:8.2f} ms, {len(everything)} hits")
@@ -0,0 +1,43 @@
+# Publishing console output to a growing number of subscribers: every
+# subscriber polls after each batch, plus one that never polls (it just skips
+# ahead). Memory per subscriber is a cursor, not a copy of the stream.
+# Run from the repository root: python -m benchmarks.bench_log_bus [lines] [batch]
+import sys
+import time
+import tracemalloc
+
+from src.backend.log_bus import LogBus
+
+
+def run(subscribers, lines, batch):
+    bus = LogBus(capacity=5000)
+    subs = [bus.subscribe(f"sub{i}") for i in range(subscribers)]
+    idle = bus.subscribe("idle")
+    payload = [b"[12:00:00] [Server thread/INFO]: Player moved too quickly!"] * batch
+    delivered = 0
+    start = time.perf_counter()
+    for _ in range(lines // batch):
+        bus.publish(payload)
+        for sub in subs:
+            delivered += len(sub.poll())
+    elapsed = time.perf_counter() - start
+    idle.poll()
+    return elapsed, delivered, idle.skipped
+
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    print(f"{lines} lines in batches of {batch}")
+    for subscribers in (1, 4, 16, 64):
+        elapsed, delivered, skipped = run(subscribers, lines, batch)
+        print(f"{subscribers:3d} subscribers  {lines / elapsed / 1e6:6.2f} M lines/s published, "
+              f"{delivered / elapsed / 1e6:6.2f} M lines/s delivered, idle subscriber skipped {skipped}")
+
+    tracemalloc.start()
+    bus = LogBus(capacity=5000)
+    bus.publish([b"x" * 80] * 5000)
+    before = tracemalloc.get_traced_memory()[0]
+    subs = [bus.subscribe(backlog=5000) for _ in range(1000)]
+    after = tracemalloc.get_traced_memory()[0]
+    print(f"memory per subscriber on a full buffer: {(after - before) / len(subs):.0f} bytes")
@@ -0,0 +1,99 @@
+# Console pattern matching with 10, 100 and 1000 rules: every regex on every
+# line (the naive way) against the PatternEngine's single keyword pass.
+# About 1% of the lines match some rule. Before timing, the keyword
+# prefilter is checked against the naive loop on rules that are easy to get
+# wrong (scoped flags, optional parts, alternation).
+# Run from the repository root: python -m benchmarks.bench_log_patterns [lines]
+import random
+import sys
+import time
+
+from src.backend.log_patterns import DEFAULT_RULES, PatternEngine, Rule
+
+NOISE = [
+    b"[12:00:00] [Server thread/INFO]: Steve%d lost connection: Disconnected",
+    b"[12:00:00] [Server thread/INFO]: <Alex%d> anyone want to trade diamonds?",
+    b"[12:00:00] [Server thread/WARN]: Steve%d moved too quickly! 12.5,0.0,3.1",
+    b"[12:00:00] [Server thread/INFO]: [Steve%d: Teleported Steve to 10.5, 64.0, -3.5]",
+    b"[12:00:00] [Worker-Main-3/INFO]: Preparing spawn area: %d%%",
+]
+
+
+def make_rules(count):
+    rules = list(DEFAULT_RULES)
+    for i in range(count - len(rules)):
+        rules.append(Rule(f"custom{i}", rf"\]: (?P<who>\w+) triggered alarm-{i} at (?P<level>\d+)",
+                          types={"level": "int"}))
+    return rules[:count]
+
+
+def make_lines(count, rules, rng):
+    custom = len(rules) - len(DEFAULT_RULES)
+    lines = []
+    for i in range(count):
+        if rng.random() < 0.01:
+            if custom > 0 and rng.random() < 0.5:
+                lines.append(b"[12:00:00] [Server thread/INFO]: Bob triggered alarm-%d at %d" % (rng.randrange(custom), i))
+            else:
+                lines.append(b"[12:00:00] [Server thread/INFO]: Steve%d joined the game" % i)
+        else:
+            lines.append(rng.choice(NOISE) % rng.randrange(100))
+    return lines
+
+
+# (rule, line that must match)
+PREFILTER_CASES = [
+    (Rule("scoped_ignorecase", rb"(?i:error) happened"), b"[12:00:00] [Server thread/WARN]: ERROR happened"),
+    (Rule("scoped_group", rb"disk (?i:full|low) on (?P<dev>\w+)"), b"[12:00:00] [Server thread/WARN]: disk FULL on sda"),
+    (Rule("global_ignorecase", rb"(?i)can't save"), b"[12:00:00] [Server thread/WARN]: CAN'T SAVE chunk"),
+    (Rule("optional", rb"Saving(?: chunks)? for level"), b"[12:00:00] [Server thread/INFO]: Saving for level 'world'"),
+    (Rule("alternation", rb"\]: (?:Stopping|Halting) the server"), b"[12:00:00] [Server thread/INFO]: Halting the server"),
+]
+
+
+def check_prefilter():
+    rules = [rule for rule, _ in PREFILTER_CASES]
+    matcher = PatternEngine(rules)
+    missed = [rule.name for rule, line in PREFILTER_CASES
+              if not any(hit[0] is rule for hit in matcher.match_lines([line]))]
+    if missed:
+        sys.exit(f"Keyword prefilter misses matches for: {', '.join(missed)}")
+    print(f"Prefilter check: {len(PREFILTER_CASES)} tricky rules match like the plain regexes")
+
+
+def naive(rules, batches):
+    found = 0
+    for batch in batches:
+        for line in batch:
+            for rule in rules:
+                if rule.regex.search(line):
+                    found += 1
+    return found
+
+
+def engine(rules, batches):
+    matcher = PatternEngine(rules, history=100000)
+    for batch in batches:
+        matcher.observe(batch)
+    return matcher.stats["events"]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(7)
+    check_prefilter()
+    print(f"{count} lines, batches of 100")
+    for rule_count in (10, 100, 1000):
+        rules = make_rules(rule_count)
+        lines = make_lines(count, rules, rng)
+        batches = [lines[i:i + 100] for i in range(0, len(lines), 100)]
+        # The naive loop is too slow to run on every line with many rules
+        sample = batches[: max(1, len(batches) * 10 // rule_count)]
+        start = time.perf_counter()
+        naive(rules, sample)
+        naive_rate = sum(len(b) for b in sample) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        events = engine(rules, batches)
+        engine_rate = count / (time.perf_counter() - start)
+        print(f"{rule_count:5d} rules  naive {naive_rate / 1e3:9.1f} k lines/s   "
+              f"engine {engine_rate / 1e3:9.1f} k lines/s   ({events} events)")
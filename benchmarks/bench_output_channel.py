@@ -0,0 +1,66 @@
+# Throughput of the reader -> UI hand-off: the old unbounded queue.Queue with
+# one put()/get() per line versus the batched OutputChannel.
+# Run from the repository root: python -m benchmarks.bench_output_channel
+import queue
+import threading
+import time
+
+from src.backend.output_channel import OutputChannel, DROP_OLDEST, COALESCE
+
+LINES = 500_000
+LINE = "[12:00:00] [Server thread/WARN]: Can't keep up! Is the server overloaded?"
+
+
+def run_queue(total):
+    q = queue.Queue()
+    received = 0
+    done = threading.Event()
+
+    def producer():
+        for _ in range(total):
+            q.put(LINE)
+        done.set()
+
+    start = time.perf_counter()
+    threading.Thread(target=producer).start()
+    while not (done.is_set() and q.empty()):
+        while not q.empty():
+            q.get()
+            received += 1
+        time.sleep(0.001)
+    return received, time.perf_counter() - start
+
+
+def run_channel(total, policy, batch_size):
+    channel = OutputChannel(capacity=total, policy=policy)
+    received = 0
+    done = threading.Event()
+    lines = [f"{LINE} {i}" for i in range(batch_size)] if policy == DROP_OLDEST else [LINE] * batch_size
+
+    def producer():
+        for _ in range(total // batch_size):
+            channel.put_many(lines)
+        done.set()
+
+    start = time.perf_counter()
+    threading.Thread(target=producer).start()
+    while not (done.is_set() and len(channel) == 0):
+        received += len(channel.drain())
+        time.sleep(0.001)
+    return received, time.perf_counter() - start
+
+
+def report(name, total, elapsed, extra=""):
+    print(f"{name:<32} {total / elapsed:>14,.0f} lines/sec {extra}")
+
+
+if __name__ == "__main__":
+    received, elapsed = run_queue(LINES)
+    report("queue.Queue put/get", LINES, elapsed)
+
+    for batch_size in (1, 64):
+        received, elapsed = run_channel(LINES, DROP_OLDEST, batch_size)
+        report(f"OutputChannel batch={batch_size}", LINES, elapsed)
+
+    received, elapsed = run_channel(LINES, COALESCE, 64)
+    report("OutputChannel coalesce batch=64", LINES, elapsed, f"({received} lines delivered)")
@@ -0,0 +1,81 @@
+# Ban/unban/lookup cost on a large banned-players.json: the old
+# read-scan-rewrite approach versus the indexed PlayerList with write-behind.
+# Run from the repository root: python -m benchmarks.bench_player_manager [entries]
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from src.backend.player_manager import PlayerList
+
+OPS = 200
+
+
+def make_bans(path, count):
+    bans = [{
+        "uuid": str(uuid.UUID(int=i)),
+        "name": f"player{i}",
+        "created": "2024-01-01 00:00:00 +0000",
+        "source": "Console",
+        "expires": "forever",
+        "reason": "Bot",
+    } for i in range(count)]
+    with open(path, "w") as f:
+        json.dump(bans, f, indent=2)
+
+
+def old_ban(path, name):
+    # What PlayerManager.ban_player used to do for every call
+    with open(path) as f:
+        bans = json.load(f)
+    for entry in bans:
+        if entry.get("name", "").lower() == name.lower():
+            return False
+    bans.append({"uuid": str(uuid.uuid4()), "name": name, "reason": "Bot"})
+    with open(path, "w") as f:
+        json.dump(bans, f, indent=4)
+    return True
+
+
+def old_unban(path, name):
+    with open(path) as f:
+        bans = json.load(f)
+    new_bans = [p for p in bans if p.get("name", "").lower() != name.lower()]
+    with open(path, "w") as f:
+        json.dump(new_bans, f, indent=4)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "banned-players.json")
+        make_bans(path, count)
+        names = [f"bot{i}" for i in range(OPS)]
+
+        old_ops = max(OPS // 20, 1)  # the old path is slow; time fewer ops
+        old = timed(lambda: [old_ban(path, n) for n in names[:old_ops]])
+        old += timed(lambda: [old_unban(path, n) for n in names[:old_ops]])
+        old_per_op = old / (2 * old_ops)
+
+        make_bans(path, count)
+        bans = PlayerList(path, write_delay=60)
+        load = timed(lambda: len(bans))
+        new = timed(lambda: [bans.add({"uuid": str(uuid.uuid4()), "name": n, "reason": "Bot"}) for n in names])
+        new += timed(lambda: [bans.remove(n) for n in names])
+        flush = timed(bans.flush)
+        lookups = timed(lambda: [bans.get(f"player{i}") for i in range(0, count, max(count // 10000, 1))])
+
+        print(f"entries                  {count}")
+        print(f"old ban/unban per op     {old_per_op * 1000:10.2f} ms")
+        print(f"indexed ban/unban per op {new / (2 * OPS) * 1000:10.4f} ms")
+        print(f"initial load             {load * 1000:10.2f} ms")
+        print(f"batched write ({2 * OPS} ops)  {flush * 1000:10.2f} ms")
+        print(f"lookup                   {lookups / min(count, 10000) * 1e6:10.2f} us")
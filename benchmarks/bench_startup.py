@@ -0,0 +1,171 @@
+# Cold start cost of the manager, each number measured in a fresh interpreter:
+#   - import time of the UI and backend entry modules, with their slowest
+#     direct imports from `-X importtime` and whether the heavy optional
+#     modules (psutil, requests, watchdog) got pulled in,
+#   - creating the Supervisor and loading N server directories,
+#   - time to the first rendered frame and until the first server's data is
+#     shown in the GUI (needs DearPyGui and a display; skipped otherwise).
+# Run from the repository root: python -m benchmarks.bench_startup [runs] [servers]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("psutil", "requests", "watchdog", "dearpygui")
+TOP_IMPORTS = 8
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+LOAD_SCRIPT = """
+import time
+started = time.perf_counter()
+from src.backend.supervisor import Supervisor
+imported = time.perf_counter()
+supervisor = Supervisor()
+supervisor.load_servers({root!r})
+loaded = time.perf_counter()
+supervisor.shutdown()
+print(imported - started, loaded - imported)
+"""
+
+# Stops the GUI once the selected server's properties and players are shown
+GUI_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import dearpygui.dearpygui as dpg
+from src.ui import app
+
+marks = {}
+render = dpg.render_dearpygui_frame
+
+def render_frame():
+    render()
+    marks.setdefault("first_frame", time.perf_counter() - started)
+    marks["frames"] = marks.get("frames", 0) + 1
+    if marks["frames"] > 2000:
+        dpg.stop_dearpygui()
+
+dpg.render_dearpygui_frame = render_frame
+
+class BenchApp(app.App):
+    def _after_read_server_data(self, job, name):
+        super()._after_read_server_data(job, name)
+        marks.setdefault("data_shown", time.perf_counter() - started)
+        dpg.stop_dearpygui()
+
+BenchApp()
+print(json.dumps(marks))
+"""
+
+
+def run_python(code, cwd=REPO, args=()):
+    env = dict(os.environ, PYTHONPATH=REPO)
+    return subprocess.run([sys.executable, *args, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def parse_importtime(stderr):
+    # [(cumulative us, self us, name)] for the measured module and its direct
+    # imports, slowest first. The output lists children before their parent,
+    # so those are the one-level-deep entries since the previous top-level one.
+    children = direct = []
+    last = None
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entry = (int(cumulative_us), int(self_us), name.strip())
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            last, direct, children = entry, children, []
+        elif depth == 1:
+            children.append(entry)
+    return [last] + sorted(direct, reverse=True) if last else []
+
+
+def bench_import(module, runs):
+    times = []
+    heavy = ""
+    for _ in range(runs):
+        result = run_python(IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES))
+        if result.returncode != 0:
+            print(f"{module}: import failed ({result.stderr.strip().splitlines()[-1]})")
+            return
+        elapsed, heavy = result.stdout.splitlines()
+        times.append(float(elapsed))
+    print(f"import {module}: {statistics.median(times) * 1000:.1f} ms median of {runs}"
+          f"  heavy modules loaded: {heavy or 'none'}")
+    result = run_python(f"import {module}", args=("-X", "importtime"))
+    for cumulative, own, name in parse_importtime(result.stderr)[:TOP_IMPORTS]:
+        print(f"    {cumulative / 1000:8.1f} ms cumulative {own / 1000:7.1f} ms self  {name}")
+
+
+def make_servers(root, count):
+    for i in range(count):
+        server_dir = os.path.join(root, f"server{i:03d}")
+        os.makedirs(server_dir)
+        with open(os.path.join(server_dir, "server.properties"), "w") as f:
+            f.write("motd=A Minecraft Server\nmax-players=20\nonline-mode=true\n")
+        with open(os.path.join(server_dir, "whitelist.json"), "w") as f:
+            json.dump([{"uuid": f"00000000-0000-0000-0000-{n:012d}", "name": f"player{n}"} for n in range(200)], f)
+
+
+def bench_load(runs, count):
+    import_times = []
+    load_times = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as root:
+            make_servers(root, count)
+            result = run_python(LOAD_SCRIPT.format(root=root), cwd=root)
+            if result.returncode != 0:
+                print(f"Backend load failed: {result.stderr.strip()}")
+                return
+            imported, loaded = map(float, result.stdout.split())
+            import_times.append(imported)
+            load_times.append(loaded)
+    print(f"Supervisor with {count} servers: import {statistics.median(import_times) * 1000:.1f} ms, "
+          f"load {statistics.median(load_times) * 1000:.1f} ms (median of {runs})")
+
+
+def bench_gui(runs, count):
+    if run_python("import dearpygui").returncode != 0:
+        print("Time to first frame: skipped (DearPyGui is not installed)")
+        return
+    first_frames = []
+    data_shown = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as root:
+            make_servers(os.path.join(root, "servers"), count)
+            result = run_python(GUI_SCRIPT, cwd=root)
+            if result.returncode != 0:
+                print(f"Time to first frame: skipped (GUI failed to start: {result.stderr.strip()[-200:]})")
+                return
+            marks = json.loads(result.stdout.strip().splitlines()[-1])
+            first_frames.append(marks["first_frame"])
+            if "data_shown" in marks:
+                data_shown.append(marks["data_shown"])
+    print(f"Time to first frame: {statistics.median(first_frames) * 1000:.1f} ms (median of {runs})")
+    if data_shown:
+        print(f"Time until server data is shown: {statistics.median(data_shown) * 1000:.1f} ms")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    bench_import("src.ui.app", runs)
+    bench_import("src.backend.supervisor", runs)
+    bench_import("src.backend.mojang_api", runs)
+    bench_load(runs, count)
+    bench_gui(runs, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Manager-side CPU and thread count while supervising N fake servers, with the
+# shared OutputMultiplexer versus one reader thread per server.
+# The "java" binary is replaced by a Python stub that prints log lines, so this
+# needs a POSIX system.
+# Run from the repository root: python -m benchmarks.bench_supervisor [seconds]
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from src.backend.supervisor import Supervisor
+
+# Each fake server prints LINES_PER_SEC lines per second until stdin closes or
+# it receives "stop"
+FAKE_JAVA = """#!{python}
+import sys, threading, time
+stopping = threading.Event()
+def read_commands():
+    for line in sys.stdin:
+        if line.strip() == "stop":
+            break
+    stopping.set()
+threading.Thread(target=read_commands, daemon=True).start()
+n = 0
+while not stopping.is_set():
+    for _ in range({burst}):
+        n += 1
+        sys.stdout.write(f"[12:00:00] [Server thread/INFO]: tick {{n}} entity update done\\n")
+    sys.stdout.flush()
+    time.sleep(0.05)
+print("[12:00:01] [Server thread/INFO]: Saving worlds", flush=True)
+print("[12:00:01] [Server thread/INFO]: All dimensions are saved", flush=True)
+"""
+
+LINES_PER_SEC = 400
+
+
+def make_fleet(root, count):
+    java = os.path.join(root, "fakejava")
+    with open(java, "w") as f:
+        f.write(FAKE_JAVA.format(python=sys.executable, burst=LINES_PER_SEC // 20))
+    os.chmod(java, 0o755)
+    for i in range(count):
+        server_dir = os.path.join(root, f"server{i:03d}")
+        os.makedirs(server_dir)
+        open(os.path.join(server_dir, "server.jar"), "w").close()
+    return java
+
+
+def run(count, seconds, use_multiplexer):
+    with tempfile.TemporaryDirectory() as root:
+        java = make_fleet(root, count)
+        supervisor = Supervisor(use_multiplexer=use_multiplexer, java_path=java, stop_timeout=10)
+        supervisor.discover(root)
+        supervisor.start_all()
+        time.sleep(1.0)  # let the stubs start up
+
+        threads = threading.active_count()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        lines = 0
+        while time.perf_counter() - wall < seconds:
+            lines += supervisor.pump_all()
+            time.sleep(1 / 60)  # one "frame"
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+
+        supervisor.stop_all()
+        for manager in supervisor.servers.values():
+            manager.wait_for_exit(10)
+        supervisor.shutdown()
+        return cpu / wall * 100, threads, lines / wall
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'servers':>7} {'mode':<12} {'manager CPU':>12} {'threads':>8} {'lines/sec':>10}")
+    for count in (1, 10, 50):
+        for use_multiplexer in (False, True):
+            cpu, threads, rate = run(count, seconds, use_multiplexer)
+            mode = "multiplexer" if use_multiplexer else "threads"
+            print(f"{count:>7} {mode:<12} {cpu:>11.1f}% {threads:>8} {rate:>10.0f}")
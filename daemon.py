@@ -0,0 +1,144 @@
+# Headless mode: run the supervisor without the GUI and control it over a
+# local socket.
+#   python daemon.py serve [--root servers] [--socket PATH | --port N]
+#   python daemon.py ctl status lobby
+#   python daemon.py ctl tail lobby
+#   python daemon.py dry-run [--root servers] [lobby ...]
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import signal
+import sys
+
+from src.backend.control_client import ControlClient
+from src.backend.control_server import ControlServer
+from src.backend.launch_profile import PROFILE_FILE, load_profile
+from src.backend.server_manager import detect_jar
+from src.backend.supervisor import (
+    Supervisor, SERVERS_ROOT, DEFAULT_SERVER_DIR, looks_like_server_dir, manager_data_path,
+)
+
+
+async def serve(args):
+    supervisor = Supervisor()
+    supervisor.load_servers(args.root)
+    server = ControlServer(supervisor, socket_path=args.socket, port=args.port)
+    await server.start()
+    print(f"Managing {', '.join(supervisor.names())}; listening on {server.address}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, AttributeError):
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        # Give running servers the chance to save before anything is killed
+        supervisor.stop_all()
+        for manager in supervisor.servers.values():
+            await loop.run_in_executor(None, manager.wait_for_exit, manager.stop_timeout)
+        supervisor.shutdown()
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def dry_run(args):
+    # Prints the command line each server would be started with, without
+    # starting anything or needing a running daemon
+    dirs = {}
+    if os.path.isdir(args.root):
+        for entry in sorted(os.listdir(args.root)):
+            if looks_like_server_dir(os.path.join(args.root, entry)):
+                dirs[entry] = os.path.join(args.root, entry)
+    if not dirs:
+        dirs[os.path.basename(DEFAULT_SERVER_DIR)] = DEFAULT_SERVER_DIR
+    for name in args.servers or dirs:
+        if name not in dirs:
+            print(f"Unknown server: {name}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            profile = load_profile(manager_data_path(dirs[name], PROFILE_FILE))
+        except ValueError as e:
+            print(f"{name}: {e}", file=sys.stderr)
+            sys.exit(1)
+        command = profile.command("java", detect_jar(dirs[name]), len(dirs))
+        print(f"{name}: {shlex.join(command)}")
+
+
+def ctl(args):
+    client = ControlClient(socket_path=args.socket, port=args.port)
+    try:
+        if args.cmd == "tail":
+            for line in client.tail(args.args[0], lines=100, follow=True):
+                print(line)
+            return
+        params = {"server": args.args[0]} if args.args else {}
+        if args.cmd == "config.apply":
+            # ctl config.apply '{"spigot.yml": {"world-settings.default.view-distance": 8}}' [server ...]
+            params = {"diff": json.loads(args.args[0]), "servers": args.args[1:]}
+        elif args.cmd == "send":
+            params["command"] = " ".join(args.args[1:])
+        elif args.cmd == "config.get" and len(args.args) > 1:
+            params["file"] = args.args[1]
+        elif args.cmd == "logs.search":
+            params["contains"] = " ".join(args.args[1:]) or None
+        elif args.cmd == "properties.set":
+            params["properties"] = dict(arg.split("=", 1) for arg in args.args[1:])
+        elif args.cmd == "backup.create":
+            params["label"] = " ".join(args.args[1:]) or None
+        elif args.cmd == "backup.restore":
+            params["snapshot"] = args.args[1]
+        elif args.cmd == "launch.set":
+            # ctl launch.set lobby heap=6G gc=zgc 'affinity=[0, 1]'
+            params["profile"] = {key: parse_value(value) for key, value in (arg.split("=", 1) for arg in args.args[1:])}
+        elif args.cmd.startswith("ipbans.") and len(args.args) > 1:
+            if args.cmd == "ipbans.import":
+                # ctl ipbans.import lobby blocklist.netset [reason]
+                params["path"] = os.path.abspath(args.args[1])
+            else:
+                params["address"] = args.args[1]
+            if len(args.args) > 2:
+                params["reason"] = " ".join(args.args[2:])
+        elif args.cmd == "ops.add" and len(args.args) > 2:
+            params.update(name=args.args[1], level=int(args.args[2]))
+        elif len(args.args) > 1:
+            params["name"] = args.args[1]
+        print(json.dumps(client.request(args.cmd, **params), indent=2))
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minecraft server manager daemon")
+    parser.add_argument("--socket", help="Unix socket path (default: in the temp directory)")
+    parser.add_argument("--port", type=int, help="listen on localhost TCP instead of a Unix socket")
+    commands = parser.add_subparsers(dest="mode", required=True)
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("--root", default=SERVERS_ROOT)
+    ctl_parser = commands.add_parser("ctl")
+    ctl_parser.add_argument("cmd")
+    ctl_parser.add_argument("args", nargs="*")
+    dry_run_parser = commands.add_parser("dry-run")
+    dry_run_parser.add_argument("--root", default=SERVERS_ROOT)
+    dry_run_parser.add_argument("servers", nargs="*")
+    args = parser.parse_args()
+    if args.mode == "serve":
+        asyncio.run(serve(args))
+    elif args.mode == "dry-run":
+        dry_run(args)
+    else:
+        ctl(args)
@@ -0,0 +1,202 @@
+import asyncio
+import os
+
+from src.backend.console_buffer import ConsoleBuffer
+from src.backend.launch_profile import LaunchProfile
+from src.backend.line_reader import LineSplitter, decode_line, READ_CHUNK_SIZE
+from src.backend.server_manager import (
+    detect_jar,
+    STATE_OFFLINE, STATE_RUNNING, STATE_STOPPING, STATE_SAVING, STATE_STOPPED, STATE_KILLED,
+    SAVE_STARTED_MARKERS, SAVE_FINISHED_MARKERS,
+)
+
+
+class AsyncServerManager:
+    # asyncio counterpart of ServerManager: the server process, its output and
+    # its exit are all driven from the event loop, so no threads are involved.
+    # Must be used from inside a running loop.
+    def __init__(self, server_dir, jar_name=None, java_path="java", console_capacity=5000,
+                 read_chunk_size=READ_CHUNK_SIZE, stop_timeout=120, launch_profile=None):
+        self.server_dir = server_dir
+        self.jar_name = jar_name or detect_jar(server_dir)
+        self.java_path = java_path
+        self.launch_profile = launch_profile or LaunchProfile()
+        self.instances = 1
+        self.read_chunk_size = read_chunk_size
+        self.stop_timeout = stop_timeout
+        self.console_buffer = ConsoleBuffer(console_capacity)
+        self.process = None
+        self.state = STATE_OFFLINE
+        self.save_finished = False
+        self._reader_task = None
+        self._changed = None
+        # psutil handle of the running process, kept between samples because
+        # cpu_percent() measures since the previous call on the same handle
+        self._ps_process = None
+
+    @property
+    def is_running(self):
+        return self.process is not None and self.process.returncode is None
+
+    def _log(self, line):
+        self.console_buffer.append(line)
+        self._notify()
+
+    def _notify(self):
+        # Wake every waiting lines() iterator; later waiters get a fresh event
+        changed, self._changed = self._changed, None
+        if changed:
+            changed.set()
+
+    def _changed_event(self):
+        # Created lazily so it binds to the running loop
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    async def start_server(self):
+        if self.is_running:
+            return False
+
+        jar_path = os.path.join(self.server_dir, self.jar_name)
+        if not os.path.exists(jar_path):
+            self._log(f"Error: {self.jar_name} not found in {self.server_dir}")
+            return False
+
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command_line(),
+                cwd=self.server_dir,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        except Exception as e:
+            self._log(f"Failed to start server: {str(e)}")
+            return False
+        for problem in self.launch_profile.apply_to_process(self.process.pid):
+            self._log(problem)
+
+        self.state = STATE_RUNNING
+        self.save_finished = False
+        self._reader_task = asyncio.ensure_future(self._read_output())
+        return True
+
+    def command_line(self):
+        return self.launch_profile.command(self.java_path, self.jar_name, self.instances)
+
+    async def _read_output(self):
+        splitter = LineSplitter()
+        stdout = self.process.stdout
+        while True:
+            data = await stdout.read(self.read_chunk_size)
+            if not data:
+                break
+            lines = splitter.feed(data)
+            if lines:
+                self._on_output(lines)
+        tail = splitter.flush()
+        if tail:
+            self._on_output(tail)
+
+        await self.process.wait()
+        self._ps_process = None
+        if self.state != STATE_KILLED:
+            self.state = STATE_STOPPED
+            self.console_buffer.append("Server stopped.")
+        self._notify()
+
+    def _on_output(self, lines):
+        self.console_buffer.extend(lines)
+        if self.state in (STATE_STOPPING, STATE_SAVING):
+            for line in lines:
+                if any(marker in line for marker in SAVE_STARTED_MARKERS):
+                    self.state = STATE_SAVING
+                elif any(marker in line for marker in SAVE_FINISHED_MARKERS):
+                    self.state = STATE_SAVING
+                    self.save_finished = True
+        self._notify()
+
+    async def wait(self):
+        # Resolves once the process has exited and all of its output was read
+        if self._reader_task:
+            await asyncio.shield(self._reader_task)
+        return self.process.returncode if self.process else None
+
+    async def lines(self, from_start=False):
+        # Async iterator over decoded console lines; ends when the server exits.
+        # Each iterator keeps its own cursor into the console buffer.
+        cursor = self.console_buffer.first_seq if from_start else self.console_buffer.generation
+        while True:
+            changed = self._changed_event()
+            batch, cursor = self.console_buffer.since(cursor)
+            for line in batch:
+                yield decode_line(line)
+            if batch:
+                continue
+            if self._reader_task is None or self._reader_task.done():
+                return
+            await changed.wait()
+
+    async def send_command(self, command):
+        if not self.is_running:
+            return False
+        try:
+            self.process.stdin.write((command + "\n").encode())
+            await self.process.stdin.drain()
+            return True
+        except Exception as e:
+            self._log(f"Error sending command: {str(e)}")
+            return False
+
+    async def stop_server(self, timeout=None):
+        # Sends "stop" and waits for the real save to finish; kills the server
+        # if it is still alive after the grace period
+        if not self.is_running or self.state != STATE_RUNNING:
+            return False
+        self.state = STATE_STOPPING
+        await self.send_command("stop")
+        grace = self.stop_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self.wait(), grace)
+        except asyncio.TimeoutError:
+            self._log(f"Server did not stop within {grace}s, killing it.")
+            await self.kill_server()
+        return True
+
+    async def kill_server(self):
+        if not self.is_running:
+            return
+        self.state = STATE_KILLED
+        import psutil
+        try:
+            parent = psutil.Process(self.process.pid)
+            for child in parent.children(recursive=True):
+                child.kill()
+            parent.kill()
+        except psutil.NoSuchProcess:
+            pass
+        self._log("Server killed.")
+        await self.wait()
+
+    def get_status(self):
+        if self.state in (STATE_STOPPING, STATE_SAVING):
+            return self.state
+        if self.is_running:
+            return "Online"
+        return "Offline"
+
+    def get_performance_stats(self):
+        if not self.is_running:
+            return {"cpu": 0, "ram": 0}
+        import psutil
+        try:
+            proc = self._ps_process
+            if proc is None or proc.pid != self.process.pid:
+                proc = self._ps_process = psutil.Process(self.process.pid)
+            with proc.oneshot():
+                cpu_percent = proc.cpu_percent(interval=None)
+                ram_mb = proc.memory_info().rss / 1024 / 1024
+            return {"cpu": cpu_percent, "ram": ram_mb}
+        except psutil.NoSuchProcess:
+            return {"cpu": 0, "ram": 0}
@@ -0,0 +1,372 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from src.backend.config_manager import PROPERTIES_FILE
+from src.backend.fileutil import atomic_write
+
+# Region files are stored in small pieces so a few changed chunks only add a
+# few pieces; everything else in larger ones
+REGION_SUFFIXES = (".mca", ".mcc", ".mcr")
+REGION_PIECE = 64 * 1024
+FILE_PIECE = 1024 * 1024
+# Held open by the running server (and locked on Windows)
+SKIP_FILES = ("session.lock",)
+# Less changed data than this is stored without starting worker processes
+POOL_THRESHOLD = 32 * 1024 * 1024
+
+SAVE_OFF_MARKERS = (b"Automatic saving is now disabled", b"Saving is already turned off")
+SAVE_DONE_MARKERS = (b"Saved the game", b"Saved the world")
+SAVE_OFF_TIMEOUT = 15
+SAVE_TIMEOUT = 300
+
+DEFAULT_RETENTION = {"keep_last": 10, "keep_daily": 7, "keep_weekly": 4}
+# Keys accepted in .mcmanager/backup.json ("store" is where backups go,
+# .mcmanager/backups by default)
+SETTINGS = ("store", "paths", "keep_last", "keep_daily", "keep_weekly", "workers", "level")
+
+
+class BackupError(Exception):
+    pass
+
+
+def object_path(objects_dir, digest):
+    return os.path.join(objects_dir, digest[:2], digest[2:])
+
+
+def store_file(objects_dir, path, level=1):
+    # Splits a file into pieces and writes the ones the store does not have
+    # yet. Runs in a worker process. Returns (hashes, size, new raw bytes,
+    # new stored bytes).
+    piece = REGION_PIECE if path.endswith(REGION_SUFFIXES) else FILE_PIECE
+    hashes = []
+    size = new_bytes = stored_bytes = 0
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(piece)
+            if not data:
+                break
+            size += len(data)
+            digest = hashlib.sha256(data).hexdigest()
+            hashes.append(digest)
+            target = object_path(objects_dir, digest)
+            if os.path.exists(target):
+                continue
+            payload = zlib.compress(data, level)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Content-addressed, so a concurrent writer of the same piece is harmless
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as out:
+                out.write(payload)
+            os.replace(tmp_path, target)
+            new_bytes += len(data)
+            stored_bytes += len(payload)
+    return hashes, size, new_bytes, stored_bytes
+
+
+def walk_files(base_dir, paths):
+    # Relative ("/"-separated) paths of every file under the given paths
+    for rel in paths:
+        full = os.path.join(base_dir, rel)
+        if os.path.isfile(full):
+            yield rel.replace(os.sep, "/")
+            continue
+        for dirpath, dirnames, filenames in os.walk(full):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name in SKIP_FILES or name.endswith(".tmp"):
+                    continue
+                yield os.path.relpath(os.path.join(dirpath, name), base_dir).replace(os.sep, "/")
+
+
+def select_retained(snapshots, keep_last=0, keep_daily=0, keep_weekly=0):
+    # Ids to keep: the newest keep_last, plus the newest snapshot of each of
+    # the last keep_daily days and keep_weekly weeks that have one
+    newest_first = sorted(snapshots, key=lambda s: s["time"], reverse=True)
+    keep = {s["id"] for s in newest_first[:keep_last]}
+    for count, period in ((keep_daily, "%Y-%m-%d"), (keep_weekly, "%G-%V")):
+        seen = set()
+        for snapshot in newest_first:
+            key = time.strftime(period, time.localtime(snapshot["time"]))
+            if key not in seen and len(seen) < count:
+                seen.add(key)
+                keep.add(snapshot["id"])
+    return keep
+
+
+class BackupStore:
+    # Content-addressed backup repository. Every piece of every file is a
+    # zlib blob named by its SHA-256 under objects/, so data shared between
+    # snapshots (or files) is stored once. A snapshot is a file table
+    # (<id>.files.json: path -> size, mtime, piece hashes) plus a small
+    # summary (<id>.json) that is written last and marks it complete.
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+    def _path(self, snapshot_id, suffix=".json"):
+        return os.path.join(self.snapshots_dir, snapshot_id + suffix)
+
+    def snapshots(self):
+        # Summaries, oldest first
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        summaries = []
+        for name in os.listdir(self.snapshots_dir):
+            if name.endswith(".json") and not name.endswith(".files.json"):
+                with open(os.path.join(self.snapshots_dir, name), "r") as f:
+                    summaries.append(json.load(f))
+        return sorted(summaries, key=lambda s: s["time"])
+
+    def get(self, snapshot_id):
+        try:
+            with open(self._path(snapshot_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise BackupError(f"No such backup: {snapshot_id}") from None
+
+    def files(self, snapshot_id):
+        with open(self._path(snapshot_id, ".files.json"), "r") as f:
+            return json.load(f)
+
+    def new_id(self, ts):
+        base = time.strftime("%Y%m%d-%H%M%S", time.localtime(ts))
+        snapshot_id, n = base, 1
+        while os.path.exists(self._path(snapshot_id)):
+            n += 1
+            snapshot_id = f"{base}-{n}"
+        return snapshot_id
+
+    def commit(self, summary, files):
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        atomic_write(self._path(summary["id"], ".files.json"), json.dumps(files, separators=(",", ":")))
+        atomic_write(self._path(summary["id"]), json.dumps(summary, indent=2))
+
+    def read_object(self, digest):
+        with open(object_path(self.objects_dir, digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"Corrupt backup object {digest}")
+        return data
+
+    def delete(self, snapshot_id):
+        # The summary goes first, so a half-deleted snapshot is never listed
+        for suffix in (".json", ".files.json"):
+            try:
+                os.remove(self._path(snapshot_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self):
+        # Removes pieces no snapshot refers to; returns (objects, bytes) freed
+        referenced = set()
+        for summary in self.snapshots():
+            for entry in self.files(summary["id"]).values():
+                referenced.update(entry["hashes"])
+        removed = freed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed, freed
+        for prefix in os.listdir(self.objects_dir):
+            directory = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(directory):
+                if prefix + name not in referenced:
+                    path = os.path.join(directory, name)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+
+class BackupManager:
+    # Backups of one server's worlds. While the server runs, saving is paused
+    # around the snapshot (save-off, then save-all flush and its confirmation
+    # in the console, save-on afterwards), so the files are consistent. Only
+    # files whose size or mtime changed since the previous snapshot are read
+    # again; their pieces are hashed and compressed by a process pool, and
+    # only pieces the store does not have yet are written.
+    def __init__(self, server_manager, config_manager, store_dir, paths=None, keep_last=None, keep_daily=None,
+                 keep_weekly=None, workers=None, level=1):
+        self.server_manager = server_manager
+        self.config_manager = config_manager
+        self.server_dir = server_manager.server_dir
+        self.store = BackupStore(store_dir)
+        self.paths = paths
+        self.retention = dict(DEFAULT_RETENTION)
+        for key, value in (("keep_last", keep_last), ("keep_daily", keep_daily), ("keep_weekly", keep_weekly)):
+            if value is not None:
+                self.retention[key] = value
+        self.workers = workers or os.cpu_count() or 1
+        # Chunks in region files are compressed already, so a fast level is enough
+        self.level = level
+        self._lock = threading.Lock()
+
+    def world_paths(self):
+        if self.paths:
+            return list(self.paths)
+        # The level plus the Bukkit-style separate dimension folders
+        level = self.config_manager.get_value(PROPERTIES_FILE, "level-name", "world") or "world"
+        return [p for p in (level, level + "_nether", level + "_the_end")
+                if os.path.exists(os.path.join(self.server_dir, p))]
+
+    def snapshots(self):
+        return self.store.snapshots()
+
+    def backup(self, label=None):
+        with self._lock:
+            running = self.server_manager.is_running
+            if running:
+                self._pause_saving()
+            try:
+                summary = self._snapshot(label)
+            finally:
+                if running:
+                    self.server_manager.send_command("save-on")
+            summary["pruned"] = self._prune()
+            return summary
+
+    def _pause_saving(self):
+        try:
+            if not self._command("save-off", SAVE_OFF_MARKERS, SAVE_OFF_TIMEOUT):
+                raise BackupError("The server did not confirm 'save-off'")
+            if not self._command("save-all flush", SAVE_DONE_MARKERS, SAVE_TIMEOUT):
+                raise BackupError("The server did not confirm 'save-all flush'")
+        except BackupError:
+            self.server_manager.send_command("save-on")
+            raise
+
+    def _command(self, command, markers, timeout):
+        # Sends a console command and waits for one of the markers in its output
+        seen = threading.Event()
+
+        def listener(lines):
+            if any(marker in line for line in lines for marker in markers):
+                seen.set()
+
+        self.server_manager.add_output_listener(listener)
+        try:
+            self.server_manager.send_command(command)
+            return seen.wait(timeout)
+        finally:
+            self.server_manager.remove_output_listener(listener)
+
+    def _snapshot(self, label):
+        started = time.time()
+        paths = self.world_paths()
+        if not paths:
+            raise BackupError(f"Nothing to back up in {self.server_dir}")
+        snapshots = self.store.snapshots()
+        previous = self.store.files(snapshots[-1]["id"]) if snapshots else {}
+
+        files = {}
+        changed = []
+        changed_bytes = 0
+        for rel in walk_files(self.server_dir, paths):
+            st = os.stat(os.path.join(self.server_dir, rel))
+            old = previous.get(rel)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                files[rel] = old
+            else:
+                files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                changed.append(rel)
+                changed_bytes += st.st_size
+
+        full_paths = [os.path.join(self.server_dir, rel) for rel in changed]
+        if self.workers > 1 and len(changed) > 1 and changed_bytes >= POOL_THRESHOLD:
+            # Workers are spawned, not forked: forking this heavily threaded
+            # process could copy a lock some other thread holds and hang a worker
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(changed)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = list(pool.map(store_file, repeat(self.store.objects_dir), full_paths, repeat(self.level)))
+        else:
+            results = [store_file(self.store.objects_dir, path, self.level) for path in full_paths]
+
+        new_bytes = stored_bytes = 0
+        for rel, (hashes, size, new, stored) in zip(changed, results):
+            files[rel]["hashes"] = hashes
+            files[rel]["size"] = size
+            new_bytes += new
+            stored_bytes += stored
+
+        summary = {
+            "id": self.store.new_id(started),
+            "time": started,
+            "label": label,
+            "paths": paths,
+            "files": len(files),
+            "bytes": sum(entry["size"] for entry in files.values()),
+            "changed_files": len(changed),
+            "new_bytes": new_bytes,
+            "stored_bytes": stored_bytes,
+        }
+        self.store.commit(summary, files)
+        summary["seconds"] = time.time() - started
+        return summary
+
+    def prune(self):
+        with self._lock:
+            return self._prune()
+
+    def _prune(self):
+        # Applies the retention policy; returns the ids that were deleted
+        snapshots = self.store.snapshots()
+        keep = select_retained(snapshots, **self.retention)
+        deleted = [s["id"] for s in snapshots if s["id"] not in keep]
+        for snapshot_id in deleted:
+            self.store.delete(snapshot_id)
+        if deleted:
+            self.store.collect_garbage()
+        return deleted
+
+    def restore(self, snapshot_id):
+        # Puts the worlds back as they were in the snapshot. Files that did not
+        # change are left alone, files the snapshot does not have are removed.
+        with self._lock:
+            if self.server_manager.is_running:
+                raise BackupError("Stop the server before restoring a backup")
+            summary = self.store.get(snapshot_id)
+            files = self.store.files(snapshot_id)
+            restored = unchanged = removed = 0
+            for rel, entry in files.items():
+                path = os.path.join(self.server_dir, *rel.split("/"))
+                try:
+                    st = os.stat(path)
+                    if st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]:
+                        unchanged += 1
+                        continue
+                except FileNotFoundError:
+                    pass
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + ".restore.tmp"
+                with open(tmp_path, "wb") as f:
+                    for digest in entry["hashes"]:
+                        f.write(self.store.read_object(digest))
+                os.replace(tmp_path, path)
+                # Same mtime as in the snapshot, so the next backup skips it
+                os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+                restored += 1
+            for rel in set(walk_files(self.server_dir, summary["paths"])) - set(files):
+                os.remove(os.path.join(self.server_dir, *rel.split("/")))
+                removed += 1
+            return {"id": snapshot_id, "restored": restored, "unchanged": unchanged, "removed": removed}
+
+
+def load_settings(path):
+    # BackupManager options from .mcmanager/backup.json; none when missing
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError("Backup settings must be a JSON object")
+    unknown = set(data) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown backup settings: {', '.join(sorted(unknown))}")
+    return data
@@ -0,0 +1,331 @@
+import re
+
+# Editable documents for the config files found in a server directory. Both
+# keep the raw lines, so comments, blank lines and key order survive a
+# round trip; an edit only rewrites the lines of the keys it touches.
+
+
+class PropertiesDocument:
+    # key=value lines (server.properties); values are strings
+    def __init__(self, text=""):
+        self.parse(text)
+
+    def parse(self, text):
+        lines = text.splitlines(keepends=True)
+        values = {}
+        index = {}
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped and not stripped.startswith('#') and '=' in stripped:
+                key, value = stripped.split('=', 1)
+                key = key.strip()
+                values[key] = value.strip()
+                index[key] = i
+        self.lines = lines
+        self.index = index
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def items(self):
+        return self.values.items()
+
+    def set(self, key, value):
+        # Returns True when the document changed
+        value = str(value).lower() if isinstance(value, bool) else str(value)
+        if self.values.get(key) == value:
+            return False
+        self.values[key] = value
+        line = f"{key}={value}\n"
+        if key in self.index:
+            self.lines[self.index[key]] = line
+        else:
+            if self.lines and not self.lines[-1].endswith("\n"):
+                self.lines[-1] += "\n"
+            self.index[key] = len(self.lines)
+            self.lines.append(line)
+        return True
+
+    def render(self):
+        return "".join(self.lines)
+
+
+# "key: value  # comment" with an optionally quoted key
+YAML_KEY_RE = re.compile(r"""^(?P<indent> *)(?P<key>'(?:[^']|'')*'|"(?:[^"\\]|\\.)*"|[^\s'"#-][^:#]*?|-[^\s:#][^:#]*?)\s*:(?:\s+|$)(?P<rest>.*)$""")
+YAML_ITEM_RE = re.compile(r"^(?P<indent> *)- ?(?P<rest>.*)$")
+PLAIN_SCALAR_RE = re.compile(r"^[A-Za-z0-9_./$][A-Za-z0-9_./$ :{}()-]*$")
+INT_RE = re.compile(r"^[-+]?\d+$")
+FLOAT_RE = re.compile(r"^[-+]?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?$")
+YAML_TRUE = ("true", "True", "TRUE", "yes", "Yes", "on", "On")
+YAML_FALSE = ("false", "False", "FALSE", "no", "No", "off", "Off")
+
+
+def _split_comment(rest):
+    # Value text and the trailing comment (with its leading whitespace)
+    quote = None
+    for i, ch in enumerate(rest):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"" and (i == 0 or rest[i - 1] in " [,{"):
+            quote = ch
+        elif ch == "#" and (i == 0 or rest[i - 1] in " \t"):
+            value = rest[:i].rstrip()
+            return value, rest[len(value):]
+    return rest.rstrip(), ""
+
+
+def _unquote_key(key):
+    if len(key) >= 2 and key[0] == key[-1] == "'":
+        return key[1:-1].replace("''", "'")
+    if len(key) >= 2 and key[0] == key[-1] == '"':
+        return key[1:-1].encode().decode("unicode_escape")
+    return key
+
+
+def parse_scalar(text):
+    if text == "" or text in ("~", "null", "Null", "NULL"):
+        return None
+    if text[0] == "'" and text[-1] == "'" and len(text) > 1:
+        return text[1:-1].replace("''", "'")
+    if text[0] == '"' and text[-1] == '"' and len(text) > 1:
+        return text[1:-1].encode().decode("unicode_escape")
+    if text in YAML_TRUE:
+        return True
+    if text in YAML_FALSE:
+        return False
+    if INT_RE.match(text):
+        return int(text)
+    if FLOAT_RE.match(text):
+        return float(text)
+    if text[0] == "[" and text[-1] == "]":
+        inner = text[1:-1].strip()
+        return [parse_scalar(part.strip()) for part in inner.split(",")] if inner else []
+    if text == "{}":
+        return {}
+    return text
+
+
+def format_scalar(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(format_scalar(v) for v in value) + "]"
+    value = str(value)
+    # Plain when it reads back as the same string, single-quoted otherwise
+    if PLAIN_SCALAR_RE.match(value) and parse_scalar(value) == value and ": " not in value and not value.endswith(":"):
+        return value
+    return "'" + value.replace("'", "''") + "'"
+
+
+def join_path(path):
+    # Dotted key for a path; dots and backslashes inside a key are escaped
+    # with a backslash, so "myplugin.fly" under permissions stays one key
+    return ".".join(key.replace("\\", "\\\\").replace(".", "\\.") for key in path)
+
+
+def split_path(key):
+    path = []
+    part = []
+    chars = iter(key)
+    for ch in chars:
+        if ch == "\\":
+            part.append(next(chars, "\\"))
+        elif ch == ".":
+            path.append("".join(part))
+            part = []
+        else:
+            part.append(ch)
+    path.append("".join(part))
+    return tuple(path)
+
+
+def _format_key(key):
+    if re.match(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$", key):
+        return key
+    return "'" + key.replace("'", "''") + "'"
+
+
+class YamlDocument:
+    # The block-style YAML subset Bukkit/Spigot/Paper write: nested mappings,
+    # scalars, flow lists ([a, b]) and block lists ("- item"). Keys are
+    # addressed by path tuples or dotted strings (see join_path()). Values
+    # are typed (bool/int/float/None/str/list); block scalars (| and >) are
+    # kept verbatim as strings.
+    def __init__(self, text=""):
+        self.parse(text)
+
+    def parse(self, text):
+        lines = text.splitlines(keepends=True)
+        # path -> {"line", "indent", "end", "value", "kind"}; "end" is the line
+        # after the key's whole block
+        nodes = {}
+        stack = []  # (indent, path)
+        i = 0
+        while i < len(lines):
+            raw = lines[i].rstrip("\r\n")
+            stripped = raw.strip()
+            if not stripped or stripped.startswith("#") or stripped in ("---", "..."):
+                i += 1
+                continue
+            m = YAML_KEY_RE.match(raw)
+            if not m:
+                i += 1
+                continue
+            indent = len(m.group("indent"))
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            path = (stack[-1][1] if stack else ()) + (_unquote_key(m.group("key").strip()),)
+            value_text, _ = _split_comment(m.group("rest"))
+            node = {"line": i, "indent": indent, "end": i + 1}
+            if value_text in ("|", ">", "|-", ">-", "|+", ">+"):
+                end = self._block_end(lines, i + 1, indent, allow_items=False)
+                node.update(kind="block", value="".join(lines[i + 1:end]), end=end)
+                i = end
+            elif value_text == "":
+                # A mapping, or a block list (items may share the key's indent)
+                items, end = self._block_list(lines, i + 1, indent)
+                if items is not None:
+                    node.update(kind="list", value=items, end=end)
+                    i = end
+                else:
+                    node.update(kind="map", value=None)
+                    stack.append((indent, path))
+                    i += 1
+            else:
+                node.update(kind="scalar", value=parse_scalar(value_text))
+                i += 1
+            nodes[path] = node
+        # A mapping's block ends where its last descendant ends
+        for path, node in nodes.items():
+            for depth in range(1, len(path)):
+                parent = nodes.get(path[:depth])
+                if parent and parent["end"] < node["end"]:
+                    parent["end"] = node["end"]
+        self.lines = lines
+        self.nodes = nodes
+
+    def _block_end(self, lines, start, indent, allow_items=True):
+        end = start
+        for j in range(start, len(lines)):
+            raw = lines[j].rstrip("\r\n")
+            if not raw.strip():
+                continue
+            line_indent = len(raw) - len(raw.lstrip(" "))
+            if line_indent > indent or (allow_items and line_indent == indent and raw.lstrip().startswith("- ")):
+                end = j + 1
+            else:
+                break
+        return end
+
+    def _block_list(self, lines, start, indent):
+        items = []
+        end = start
+        item_indent = None
+        for j in range(start, len(lines)):
+            raw = lines[j].rstrip("\r\n")
+            stripped = raw.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            m = YAML_ITEM_RE.match(raw)
+            line_indent = len(raw) - len(raw.lstrip(" "))
+            if item_indent is None:
+                if not m or line_indent < indent or (line_indent == indent and not stripped.startswith("-")):
+                    return None, start
+                item_indent = line_indent
+            if m and line_indent == item_indent and (stripped == "-" or stripped.startswith("- ")):
+                value_text, _ = _split_comment(m.group("rest"))
+                items.append(parse_scalar(value_text))
+                end = j + 1
+            elif line_indent > item_indent:
+                # Nested content of an item is kept but not interpreted
+                end = j + 1
+            else:
+                break
+        return (items, end) if item_indent is not None else (None, start)
+
+    def _path(self, key):
+        if isinstance(key, tuple):
+            return key
+        if isinstance(key, list):
+            return tuple(key)
+        if (key,) in self.nodes:
+            return (key,)
+        return split_path(key)
+
+    def get(self, key, default=None):
+        node = self.nodes.get(self._path(key))
+        if node is None or node["kind"] == "map":
+            return default
+        return node["value"]
+
+    def items(self):
+        # (dotted path, value) for every leaf
+        return [(join_path(path), node["value"]) for path, node in self.nodes.items() if node["kind"] != "map"]
+
+    def set(self, key, value):
+        # Returns True when the document changed
+        path = self._path(key)
+        node = self.nodes.get(path)
+        # Text from an input field is read as YAML, so "8" is written as a
+        # number even where the old value was a string ("'8'" keeps it one);
+        # empty text stays an empty string
+        if isinstance(value, str) and value:
+            value = parse_scalar(value)
+        if node is not None and node["kind"] != "map" and node["value"] == value and type(node["value"]) is type(value):
+            return False
+        if node is None:
+            self._insert(path, value)
+        else:
+            self._replace(path, node, value)
+        self.parse("".join(self.lines))
+        return True
+
+    def _value_lines(self, indent, key_text, value, comment=""):
+        if isinstance(value, (list, tuple)) and value:
+            lines = [f"{' ' * indent}{key_text}:{comment}\n"]
+            lines += [f"{' ' * indent}- {format_scalar(v)}\n" for v in value]
+            return lines
+        return [f"{' ' * indent}{key_text}: {format_scalar(value)}{comment}\n"]
+
+    def _replace(self, path, node, value):
+        raw = self.lines[node["line"]].rstrip("\r\n")
+        m = YAML_KEY_RE.match(raw)
+        _, comment = _split_comment(m.group("rest"))
+        new = self._value_lines(node["indent"], m.group("key").strip(), value, comment)
+        self.lines[node["line"]:node["end"]] = new
+
+    def _insert(self, path, value):
+        # Deepest existing mapping on the path gets the new key(s) at the end
+        # of its block, indented like its other children
+        depth = len(path) - 1
+        while depth > 0 and self.nodes.get(path[:depth], {}).get("kind") != "map":
+            depth -= 1
+        if depth:
+            parent = self.nodes[path[:depth]]
+            at = parent["end"]
+            children = [n["indent"] for p, n in self.nodes.items() if len(p) == depth + 1 and p[:depth] == path[:depth]]
+            indent = children[0] if children else parent["indent"] + 2
+        else:
+            at = len(self.lines)
+            indent = 0
+            if self.lines and not self.lines[-1].endswith("\n"):
+                self.lines[-1] += "\n"
+        new = []
+        for key in path[depth:-1]:
+            new.append(f"{' ' * indent}{_format_key(key)}:\n")
+            indent += 2
+        new += self._value_lines(indent, _format_key(path[-1]), value)
+        self.lines[at:at] = new
+
+    def render(self):
+        return "".join(self.lines)
+
+
+def document_type(filename):
+    return YamlDocument if filename.endswith((".yml", ".yaml")) else PropertiesDocument
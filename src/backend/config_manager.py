@@ -1,105 +1,104 @@
 import os
+import threading
+from src.backend.config_formats import document_type
+from src.backend.fileutil import atomic_write, file_signature
+
+PROPERTIES_FILE = "server.properties"
+# Config files the manager edits; each is parsed on first access
+CONFIG_FILES = ("server.properties", "bukkit.yml", "spigot.yml", "commands.yml", "permissions.yml", "help.yml")
 
 class ConfigManager:
     def __init__(self, server_dir):
-        self.config_path = os.path.join(server_dir, "server.properties")
+        self.server_dir = server_dir
+        self.config_path = os.path.join(server_dir, PROPERTIES_FILE)
         self.properties = {}
+        # filename -> (signature, document); a document is re-parsed only when
+        # the file's mtime/size changed since it was read or written
+        self._documents = {}
+        self._pending = {}
+        self._lock = threading.RLock()
 
-    def load_config(self):
-        if not os.path.exists(self.config_path):
-            return {}
-        
-        self.properties = {}
-        with open(self.config_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        self.properties[key.strip()] = value.strip()
-        return self.properties
+    def files(self):
+        return [name for name in CONFIG_FILES if os.path.exists(os.path.join(self.server_dir, name))]
+
+    def document(self, filename):
+        path = os.path.join(self.server_dir, filename)
+        with self._lock:
+            signature = file_signature(path)
+            cached = self._documents.get(filename)
+            if cached and cached[0] == signature:
+                return cached[1]
+            text = ""
+            if signature is not None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            document = document_type(filename)(text)
+            self._documents[filename] = (signature, document)
+            return document
 
-    def save_config(self, new_properties):
-        # Update internal properties with new values
-        self.properties.update(new_properties)
-        
-        lines = []
-        # Read existing file to preserve comments and order if possible, 
-        # but for MVP we might just rewrite it or try to be smart.
-        # Let's try to preserve comments and order.
-        
-        if os.path.exists(self.config_path):
-            with open(self.config_path, 'r') as f:
-                existing_lines = f.readlines()
-        else:
-            existing_lines = []
+    def get_value(self, filename, key, default=None):
+        return self.document(filename).get(key, default)
 
-        # Track which keys we've written
-        written_keys = set()
-        
-        final_lines = []
-        for line in existing_lines:
-            stripped = line.strip()
-            if stripped and not stripped.startswith('#') and '=' in stripped:
-                key = stripped.split('=', 1)[0].strip()
-                if key in self.properties:
-                    final_lines.append(f"{key}={self.properties[key]}\n")
-                    written_keys.add(key)
-                else:
-                    # Property removed or not in our list? Keep it if we didn't explicitly delete it.
-                    # For this simple manager, we assume self.properties has the latest state of everything we care about.
-                    # If it's not in self.properties, maybe we should keep it as is?
-                    # But load_config loads everything. So if it's missing, it was deleted.
-                    # However, the UI might only send back changed properties.
-                    # Let's assume save_config receives the FULL dictionary of properties to save.
-                    final_lines.append(line) # Keep original if not in new_properties? No, that's risky.
-                    # Let's just rewrite the file for simplicity in MVP, but maybe keep the header.
-                    pass
-            else:
-                final_lines.append(line)
+    def save_file(self, filename, updates):
+        # Applies {key: value} to one file and writes it only if its content
+        # changed. Returns the keys that were changed.
+        path = os.path.join(self.server_dir, filename)
+        with self._lock:
+            document = self.document(filename)
+            changed = [key for key, value in updates.items() if document.set(key, value)]
+            if changed:
+                try:
+                    atomic_write(path, document.render())
+                except BaseException:
+                    self._documents.pop(filename, None)
+                    raise
+                self._documents[filename] = (file_signature(path), document)
+            return changed
 
-        # Actually, a safer approach for MVP:
-        # Just write everything out. We lose comments but it's safe.
-        # Or, better: Read file, replace lines where keys match, append new keys.
-        
-        final_lines = []
-        written_keys = set()
-        
-        if os.path.exists(self.config_path):
-            with open(self.config_path, 'r') as f:
-                for line in f:
-                    stripped = line.strip()
-                    if stripped and not stripped.startswith('#') and '=' in stripped:
-                        key = stripped.split('=', 1)[0].strip()
-                        if key in self.properties:
-                            final_lines.append(f"{key}={self.properties[key]}\n")
-                            written_keys.add(key)
-                        else:
-                            # If it's not in the new properties, do we delete it?
-                            # Usually yes. But let's assume the UI passes everything.
-                            # If the UI passes a partial update, we need to merge.
-                            # Let's assume self.properties is the source of truth.
-                            if key in self.properties:
-                                final_lines.append(f"{key}={self.properties[key]}\n")
-                                written_keys.add(key)
-                            else:
-                                # If it was in the file but not in our properties map, 
-                                # it might be a property we don't know about or one that was removed.
-                                # Let's keep it to be safe, unless we want to strictly enforce the UI state.
-                                final_lines.append(line)
-                    else:
-                        final_lines.append(line)
-        
-        # Append new keys that weren't in the file
-        for key, value in self.properties.items():
-            if key not in written_keys:
-                final_lines.append(f"{key}={value}\n")
+    def apply(self, diff):
+        # diff: {filename: {key: value}}. Returns {filename: changed keys} for
+        # the files that were actually rewritten.
+        results = {}
+        for filename, updates in diff.items():
+            changed = self.save_file(filename, updates)
+            if filename == PROPERTIES_FILE:
+                self.load_config()
+            if changed:
+                results[filename] = changed
+        return results
 
-        with open(self.config_path, 'w') as f:
-            f.writelines(final_lines)
+    def load_config(self):
+        # Re-parse only if the file changed on disk since the last load/save
+        document = self.document(PROPERTIES_FILE)
+        self.properties = dict(document.values, **self._pending)
+        return self.properties
+
+    def save_config(self, new_properties=None):
+        # Patch only the lines whose value changed; nothing is written when the
+        # content would be identical. Returns the keys that were changed.
+        updates = dict(self._pending)
+        updates.update(new_properties or {})
+        self._pending = {}
+        changed = self.save_file(PROPERTIES_FILE, updates)
+        self.load_config()
+        return changed
 
     def get_property(self, key):
         return self.properties.get(key)
 
     def set_property(self, key, value):
+        # Kept until the next save_config()
+        self._pending[key] = str(value)
         self.properties[key] = str(value)
+
+
+def apply_to_servers(config_managers, diff):
+    # Bulk edit: the same diff applied to every ConfigManager given as
+    # {name: manager}. Returns {name: {filename: changed keys}}, leaving out
+    # servers where nothing changed.
+    results = {}
+    for name, manager in config_managers.items():
+        changed = manager.apply(diff)
+        if changed:
+            results[name] = changed
+    return results
@@ -0,0 +1,61 @@
+import itertools
+import threading
+
+
+class ConsoleBuffer:
+    # Fixed-capacity ring of console lines. Every appended line gets a
+    # sequence number; `generation` is the total number of lines ever appended,
+    # so readers can tell whether anything changed without touching the data.
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def __len__(self):
+        return min(self.generation, self.capacity)
+
+    @property
+    def first_seq(self):
+        return max(0, self.generation - self.capacity)
+
+    def append(self, line):
+        with self._lock:
+            self._slots[self.generation % self.capacity] = line
+            self.generation += 1
+
+    def extend(self, lines):
+        with self._lock:
+            cap = self.capacity
+            # Only the last `capacity` lines can survive anyway
+            skipped = max(0, len(lines) - cap)
+            base = self.generation + skipped
+            for i, line in enumerate(itertools.islice(lines, skipped, None)):
+                self._slots[(base + i) % cap] = line
+            self.generation += len(lines)
+
+    def clear(self):
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self.generation = 0
+
+    def _read(self, start_seq, end_seq):
+        cap = self.capacity
+        return [self._slots[seq % cap] for seq in range(start_seq, end_seq)]
+
+    def window(self, offset, count):
+        # Lines [offset, offset + count) counted from the oldest retained line
+        with self._lock:
+            first = self.first_seq
+            start = first + max(0, offset)
+            end = min(start + max(0, count), self.generation)
+            return self._read(start, end)
+
+    def since(self, seq, limit=None):
+        # Lines appended after `seq` (a previous generation value). Lines that
+        # were already overwritten are skipped. Returns (lines, new_seq); with
+        # a limit, new_seq stops after the last line returned.
+        with self._lock:
+            start = max(seq, self.first_seq)
+            end = self.generation if limit is None else min(self.generation, start + limit)
+            return self._read(start, end), end
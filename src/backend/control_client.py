@@ -0,0 +1,65 @@
+import itertools
+import json
+import os
+import socket
+
+from src.backend.control_server import DEFAULT_SOCKET, DEFAULT_HOST, DEFAULT_PORT
+
+# Commands that can take much longer than the default timeout on big worlds
+# or lists; the client waits for them without a time limit
+LONG_COMMANDS = ("backup.create", "backup.restore", "ipbans.import")
+
+
+class ControlClient:
+    # Minimal blocking client for the ControlServer protocol
+    def __init__(self, socket_path=None, host=DEFAULT_HOST, port=None, timeout=30):
+        if port is None and os.name != "nt":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path or DEFAULT_SOCKET)
+        else:
+            self.sock = socket.create_connection((host, port or DEFAULT_PORT), timeout=timeout)
+        self.timeout = timeout
+        self._file = self.sock.makefile("rb")
+        self._ids = itertools.count(1)
+
+    def _send(self, cmd, params):
+        request = dict(params, cmd=cmd, id=next(self._ids))
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+
+    def _receive(self):
+        raw = self._file.readline()
+        if not raw:
+            raise ConnectionError("Control server closed the connection")
+        return json.loads(raw)
+
+    def request(self, cmd, **params):
+        return self._call(cmd, params, None if cmd in LONG_COMMANDS else self.timeout)
+
+    def _call(self, cmd, params, timeout):
+        # timeout applies to this request and to anything read after it
+        self.sock.settimeout(timeout)
+        self._send(cmd, params)
+        response = self._receive()
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Request failed"))
+        return response.get("result")
+
+    def tail(self, server, lines=100, follow=True):
+        # Yields console lines; with follow=True this only ends when the
+        # connection is closed
+        self._call("tail", {"server": server, "lines": lines, "follow": follow}, None if follow else self.timeout)
+        while True:
+            raw = self._file.readline()
+            if not raw:
+                return
+            yield json.loads(raw)["line"]
+
+    def close(self):
+        # Shutting down first also ends a tail() running on another thread
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._file.close()
+        self.sock.close()
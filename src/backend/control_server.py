@@ -0,0 +1,430 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from src.backend.backup import BackupError
+from src.backend.line_reader import decode_line
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "mcmanager.sock")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 25580
+
+
+class ControlError(Exception):
+    pass
+
+
+class ControlServer:
+    # Local control API for a Supervisor. Clients connect over a Unix domain
+    # socket (or localhost TCP) and exchange newline-delimited JSON:
+    #   -> {"id": 1, "cmd": "status", "server": "lobby"}
+    #   <- {"id": 1, "ok": true, "result": "Online"}
+    # Everything runs on one asyncio loop, so clients do not cost a thread
+    # each; blocking backend calls go to the default executor, serialized per
+    # server. "tail" streams console lines, each client reading the shared
+    # console buffer through its own cursor.
+    def __init__(self, supervisor, socket_path=None, host=DEFAULT_HOST, port=None,
+                 pump_interval=0.05, sample_interval=1.0):
+        self.supervisor = supervisor
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.pump_interval = pump_interval
+        self.sample_interval = sample_interval
+        self._server = None
+        self.address = None
+        self._server_locks = {}
+        self._output_event = None
+        self._tasks = []
+        self.clients = 0
+        self.handlers = {
+            "servers": self.cmd_servers,
+            "status": self.cmd_status,
+            "start": self.cmd_start,
+            "stop": self.cmd_stop,
+            "kill": self.cmd_kill,
+            "send": self.cmd_send,
+            "properties.get": self.cmd_properties_get,
+            "properties.set": self.cmd_properties_set,
+            "config.files": self.cmd_config_files,
+            "config.get": self.cmd_config_get,
+            "config.apply": self.cmd_config_apply,
+            "launch.get": self.cmd_launch_get,
+            "launch.set": self.cmd_launch_set,
+            "backup.create": self.cmd_backup_create,
+            "backup.list": self.cmd_backup_list,
+            "backup.restore": self.cmd_backup_restore,
+            "backup.prune": self.cmd_backup_prune,
+            "whitelist.list": self.cmd_whitelist_list,
+            "whitelist.add": self.cmd_whitelist_add,
+            "whitelist.remove": self.cmd_whitelist_remove,
+            "bans.list": self.cmd_bans_list,
+            "bans.add": self.cmd_bans_add,
+            "bans.remove": self.cmd_bans_remove,
+            "ipbans.list": self.cmd_ipbans_list,
+            "ipbans.add": self.cmd_ipbans_add,
+            "ipbans.remove": self.cmd_ipbans_remove,
+            "ipbans.check": self.cmd_ipbans_check,
+            "ipbans.import": self.cmd_ipbans_import,
+            "ops.list": self.cmd_ops_list,
+            "ops.add": self.cmd_ops_add,
+            "ops.remove": self.cmd_ops_remove,
+            "metrics": self.cmd_metrics,
+            "telemetry": self.cmd_telemetry,
+            "logs.search": self.cmd_logs_search,
+            "events": self.cmd_events,
+        }
+
+    async def start(self):
+        self._output_event = asyncio.Event()
+        if self.port is None and os.name != "nt":
+            path = self.socket_path or DEFAULT_SOCKET
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = await asyncio.start_unix_server(self._handle_client, path=path)
+            os.chmod(path, 0o600)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port or DEFAULT_PORT)
+            self.address = f"{self.host}:{self._server.sockets[0].getsockname()[1]}"
+        self._tasks = [
+            asyncio.ensure_future(self._pump_loop()),
+            asyncio.ensure_future(self._metrics_loop()),
+        ]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.port is None and os.name != "nt":
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    async def _pump_loop(self):
+        # Moves server output into the console buffers and wakes tailing clients
+        while True:
+            if self.supervisor.pump_all():
+                event, self._output_event = self._output_event, asyncio.Event()
+                event.set()
+            await asyncio.sleep(self.pump_interval)
+
+    async def _metrics_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self.supervisor.sample_metrics)
+            await asyncio.sleep(self.sample_interval)
+
+    def _manager(self, request):
+        name = request.get("server")
+        if name not in self.supervisor.servers:
+            raise ControlError(f"Unknown server: {name}")
+        return name
+
+    async def _blocking(self, name, fn, *args):
+        # Run a blocking backend call off the loop, one at a time per server
+        lock = self._server_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def _handle_client(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                try:
+                    request = json.loads(raw)
+                except ValueError:
+                    await self._send(writer, {"ok": False, "error": "Invalid JSON"})
+                    continue
+                if request.get("cmd") == "tail":
+                    await self._tail(request, reader, writer)
+                    break
+                await self._send(writer, await self._dispatch(request))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _dispatch(self, request):
+        response = {"id": request.get("id")}
+        handler = self.handlers.get(request.get("cmd"))
+        try:
+            if handler is None:
+                raise ControlError(f"Unknown command: {request.get('cmd')}")
+            response["result"] = await handler(request)
+            response["ok"] = True
+        except ControlError as e:
+            response.update(ok=False, error=str(e))
+        except Exception as e:
+            response.update(ok=False, error=f"{type(e).__name__}: {e}")
+        return response
+
+    async def _send(self, writer, message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    async def _tail(self, request, reader, writer):
+        try:
+            name = self._manager(request)
+        except ControlError as e:
+            await self._send(writer, {"id": request.get("id"), "ok": False, "error": str(e)})
+            return
+        backlog = max(0, int(request.get("lines", 100)))
+        sub = self.supervisor.servers[name].log_bus.subscribe(f"tail-{request.get('id')}", backlog)
+        follow = request.get("follow", True)
+        await self._send(writer, {"id": request.get("id"), "ok": True, "result": "tailing"})
+
+        # Closing the connection ends a follow; watch for it while waiting
+        disconnected = asyncio.ensure_future(reader.read(1))
+        try:
+            while True:
+                # A client that falls behind skips lines the ring overwrote
+                lines = sub.poll()
+                if lines:
+                    payload = "".join(
+                        json.dumps({"id": request.get("id"), "line": decode_line(line)}) + "\n" for line in lines
+                    )
+                    writer.write(payload.encode())
+                    await writer.drain()
+                if not follow:
+                    return
+                changed = asyncio.ensure_future(self._output_event.wait())
+                done, _ = await asyncio.wait({changed, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    changed.cancel()
+                    return
+        finally:
+            disconnected.cancel()
+            sub.close()
+
+    # Commands
+
+    async def cmd_servers(self, request):
+        return self.supervisor.get_fleet_status()
+
+    async def cmd_status(self, request):
+        name = self._manager(request)
+        manager = self.supervisor.servers[name]
+        return {
+            "status": manager.get_status(),
+            "state": manager.state,
+            "output": manager.get_output_stats(),
+            "subscribers": manager.log_bus.subscribers(),
+        }
+
+    async def cmd_start(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.servers[name].start_server)
+
+    async def cmd_stop(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.servers[name].stop_server, request.get("timeout"))
+
+    async def cmd_kill(self, request):
+        name = self._manager(request)
+        await self._blocking(name, self.supervisor.servers[name].kill_server)
+        return True
+
+    async def cmd_send(self, request):
+        name = self._manager(request)
+        command = request.get("command")
+        if not command:
+            raise ControlError("Missing 'command'")
+        self.supervisor.servers[name].send_command(command)
+        return True
+
+    async def cmd_properties_get(self, request):
+        name = self._manager(request)
+        return dict(await self._blocking(name, self.supervisor.configs[name].load_config))
+
+    async def cmd_properties_set(self, request):
+        name = self._manager(request)
+        properties = request.get("properties")
+        if not isinstance(properties, dict):
+            raise ControlError("'properties' must be an object")
+        return await self._blocking(name, self.supervisor.configs[name].save_config, properties)
+
+    async def cmd_config_files(self, request):
+        name = self._manager(request)
+        return self.supervisor.configs[name].files()
+
+    async def cmd_config_get(self, request):
+        name = self._manager(request)
+        filename = request.get("file", "server.properties")
+        document = await self._blocking(name, self.supervisor.configs[name].document, filename)
+        return dict(document.items())
+
+    async def cmd_config_apply(self, request):
+        # {"diff": {filename: {key: value}}, "servers": [...]} (all servers
+        # when "servers" is missing); only files whose content changes are
+        # written
+        diff = request.get("diff")
+        if not isinstance(diff, dict) or not all(isinstance(v, dict) for v in diff.values()):
+            raise ControlError("'diff' must map file names to {key: value} objects")
+        names = request.get("servers") or self.supervisor.names()
+        for name in names:
+            if name not in self.supervisor.servers:
+                raise ControlError(f"Unknown server: {name}")
+        return await asyncio.get_running_loop().run_in_executor(None, self.supervisor.apply_config, diff, names)
+
+    async def cmd_launch_get(self, request):
+        # Launch profile and the resolved command line (a dry run of "start")
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.launch_info, name)
+
+    async def cmd_launch_set(self, request):
+        name = self._manager(request)
+        profile = request.get("profile")
+        if not isinstance(profile, dict):
+            raise ControlError("'profile' must be an object")
+        try:
+            return await self._blocking(name, self.supervisor.set_launch_profile, name, profile)
+        except ValueError as e:
+            raise ControlError(str(e))
+
+    async def cmd_backup_create(self, request):
+        # Runs outside the server lock: it waits on the server's own console
+        # output, and other commands (send, status, ...) keep working meanwhile
+        name = self._manager(request)
+        backups = self.supervisor.backups[name]
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, backups.backup, request.get("label"))
+        except BackupError as e:
+            raise ControlError(str(e))
+
+    async def cmd_backup_list(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.backups[name].snapshots)
+
+    async def cmd_backup_restore(self, request):
+        name = self._manager(request)
+        snapshot = request.get("snapshot")
+        if not snapshot:
+            raise ControlError("Missing 'snapshot'")
+        try:
+            return await self._blocking(name, self.supervisor.backups[name].restore, snapshot)
+        except BackupError as e:
+            raise ControlError(str(e))
+
+    async def cmd_backup_prune(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.backups[name].prune)
+
+    async def cmd_whitelist_list(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].get_whitelist)
+
+    async def cmd_whitelist_add(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].add_to_whitelist, request.get("name", ""))
+
+    async def cmd_whitelist_remove(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].remove_from_whitelist, request.get("name", ""))
+
+    async def cmd_bans_list(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].get_banned_players)
+
+    async def cmd_bans_add(self, request):
+        name = self._manager(request)
+        reason = request.get("reason", "Banned by operator")
+        return await self._blocking(name, self.supervisor.players[name].ban_player, request.get("name", ""), reason)
+
+    async def cmd_bans_remove(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].unban_player, request.get("name", ""))
+
+    async def cmd_ipbans_list(self, request):
+        # Lists can be huge; only the first `limit` entries are returned
+        name = self._manager(request)
+        players = self.supervisor.players[name]
+        limit = request.get("limit", 1000)
+        return await self._blocking(
+            name, lambda: {"count": len(players.banned_ips), "entries": players.get_banned_ips(limit)})
+
+    async def cmd_ipbans_add(self, request):
+        name = self._manager(request)
+        reason = request.get("reason", "Banned by operator")
+        return await self._blocking(name, self.supervisor.players[name].ban_ip, request.get("address", ""), reason)
+
+    async def cmd_ipbans_remove(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].unban_ip, request.get("address", ""))
+
+    async def cmd_ipbans_check(self, request):
+        name = self._manager(request)
+        address = request.get("address", "")
+        try:
+            banned = await self._blocking(name, self.supervisor.players[name].is_ip_banned, address)
+        except ValueError as e:
+            raise ControlError(str(e))
+        return {"address": address, "banned": banned}
+
+    async def cmd_ipbans_import(self, request):
+        name = self._manager(request)
+        path = request.get("path")
+        if not path:
+            raise ControlError("Missing 'path'")
+        reason = request.get("reason", "Banned by operator")
+        try:
+            added, already, invalid = await self._blocking(
+                name, self.supervisor.players[name].import_ip_blocklist, path, reason)
+        except OSError as e:
+            raise ControlError(f"Could not read {path}: {e}")
+        return {"added": added, "already_banned": already, "invalid": invalid}
+
+    async def cmd_ops_list(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].get_ops)
+
+    async def cmd_ops_add(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].op_player, request.get("name", ""),
+                                    request.get("level", 4), request.get("bypasses_player_limit", False))
+
+    async def cmd_ops_remove(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.players[name].deop_player, request.get("name", ""))
+
+    async def cmd_metrics(self, request):
+        name = self._manager(request)
+        now = time.time()
+        start = now - float(request.get("seconds", 300))
+        field = request.get("field", "cpu")
+        if field not in self.supervisor.metrics[name].fields:
+            raise ControlError(f"Unknown metric: {field}")
+        ts, mins, avgs, maxs = self.supervisor.metrics[name].query(field, start, now)
+        return {"time": ts, "min": mins, "avg": avgs, "max": maxs}
+
+    async def cmd_telemetry(self, request):
+        name = self._manager(request)
+        return await self._blocking(name, self.supervisor.telemetry[name].sample)
+
+    async def cmd_logs_search(self, request):
+        name = self._manager(request)
+        archive = self.supervisor.archives.get(name)
+        if archive is None:
+            raise ControlError(f"Console archive is disabled for {name}")
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: archive.search(
+                request.get("start"), request.get("end"), request.get("contains"),
+                request.get("pattern"), request.get("limit", 1000),
+            )
+        )
+        return [{"time": ts, "line": line} for ts, line in results]
+
+    async def cmd_events(self, request):
+        # Console events after `since`; pass the returned seq back to poll
+        name = self._manager(request)
+        events, seq = self.supervisor.events[name].recent(request.get("since", 0), request.get("severities"))
+        return {"seq": seq, "events": [event.to_dict() for event in events]}
@@ -0,0 +1,109 @@
+import os
+import selectors
+import threading
+
+from src.backend.line_reader import LineSplitter, READ_CHUNK_SIZE
+
+
+class OutputMultiplexer:
+    # One thread watching the stdout pipes of many servers with a selector,
+    # instead of one blocking reader thread per server. Pipes cannot be
+    # selected on Windows, so callers should only use this where
+    # OutputMultiplexer.supported is True.
+    supported = os.name != "nt"
+
+    def __init__(self, chunk_size=READ_CHUNK_SIZE, reap_interval=0.5):
+        self.chunk_size = chunk_size
+        self.reap_interval = reap_interval
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._to_register = []
+        self._exiting = []
+        self._closed = False
+        # Self-pipe so register()/close() can wake the selector from other threads
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self.thread = threading.Thread(target=self._run, daemon=True, name="output-multiplexer")
+        self.thread.start()
+
+    def register(self, manager):
+        with self._lock:
+            self._to_register.append(manager)
+        self._wake()
+
+    def close(self):
+        self._closed = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def _run(self):
+        while not self._closed:
+            events = self._selector.select(self.reap_interval if self._exiting else None)
+            for key, _ in events:
+                if key.data is None:
+                    self._drain_wakeups()
+                else:
+                    # An error for one server must not stop output for every
+                    # server; its pipe keeps being read
+                    try:
+                        self._read(key)
+                    except Exception as e:
+                        print(f"Output multiplexer: handling output of {key.data[0].server_dir} failed: {e}")
+            self._reap()
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _drain_wakeups(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            pending, self._to_register = self._to_register, []
+        for manager in pending:
+            try:
+                fd = manager.process.stdout.fileno()
+                self._selector.register(fd, selectors.EVENT_READ, (manager, LineSplitter()))
+            except Exception as e:
+                print(f"Output multiplexer: could not watch {manager.server_dir}: {e}")
+
+    def _read(self, key):
+        manager, splitter = key.data
+        try:
+            data = os.read(key.fd, self.chunk_size)
+        except OSError:
+            data = b""
+        if data:
+            lines = splitter.feed(data)
+            if lines:
+                manager._on_output(lines)
+            return
+
+        # EOF: the process closed stdout and is exiting
+        self._selector.unregister(key.fd)
+        self._exiting.append(manager)
+        tail = splitter.flush()
+        if tail:
+            manager._on_output(tail)
+
+    def _reap(self):
+        if not self._exiting:
+            return
+        still_exiting = []
+        for manager in self._exiting:
+            try:
+                if manager.process.poll() is None:
+                    still_exiting.append(manager)
+                else:
+                    manager._on_exit()
+            except Exception as e:
+                print(f"Output multiplexer: exit handling for {manager.server_dir} failed: {e}")
+        self._exiting = still_exiting
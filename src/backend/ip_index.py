@@ -0,0 +1,163 @@
+import socket
+from array import array
+from bisect import bisect_left, bisect_right
+
+BITS = {4: 32, 6: 128}
+FAMILIES = {4: socket.AF_INET, 6: socket.AF_INET6}
+
+# IPv4 bounds are kept in a machine array (4 bytes per value instead of a
+# Python int object); IPv6 values do not fit one and use plain lists
+IPV4_TYPECODE = "I" if array("I").itemsize >= 4 else "L"
+
+# add_many() with fewer ranges than this inserts them one by one; more are
+# sorted and merged with the existing intervals in one pass
+BULK_MERGE = 1000
+
+
+def parse_address(text):
+    # "1.2.3.4" or an IPv6 address -> (version, integer value)
+    version = 6 if ":" in text else 4
+    try:
+        return version, int.from_bytes(socket.inet_pton(FAMILIES[version], text), "big")
+    except (OSError, ValueError):
+        raise ValueError(f"Invalid IP address: {text!r}") from None
+
+
+def format_address(version, value):
+    return socket.inet_ntop(FAMILIES[version], value.to_bytes(BITS[version] // 8, "big"))
+
+
+def _canonical_address(version, value, text):
+    # inet_pton only accepts the canonical dotted quad, so IPv4 text that
+    # parsed can be kept as it is; IPv6 has several spellings
+    return text if version == 4 else format_address(version, value)
+
+
+def parse_range(text):
+    # A single address, a CIDR prefix ("10.0.0.0/8") or a first-last range
+    # ("10.0.0.1-10.0.0.9") -> (version, first, last, canonical text).
+    # Host bits of a prefix are cleared, so "10.1.2.3/8" becomes "10.0.0.0/8".
+    text = text.strip()
+    if "/" in text:
+        address, _, prefix = text.partition("/")
+        version, value = parse_address(address)
+        bits = BITS[version]
+        length = int(prefix) if prefix.isdigit() else -1
+        if not 0 <= length <= bits:
+            raise ValueError(f"Invalid prefix length: {text!r}")
+        host_bits = bits - length
+        first = value >> host_bits << host_bits
+        last = first | ((1 << host_bits) - 1)
+        if host_bits == 0:
+            return version, first, last, _canonical_address(version, first, address)
+        if first != value:
+            address = format_address(version, first)
+        return version, first, last, f"{_canonical_address(version, first, address)}/{length}"
+    if "-" in text:
+        start, _, end = (part.strip() for part in text.partition("-"))
+        version, first = parse_address(start)
+        end_version, last = parse_address(end)
+        if end_version != version or last < first:
+            raise ValueError(f"Invalid address range: {text!r}")
+        if first == last:
+            return version, first, last, _canonical_address(version, first, start)
+        return (version, first, last,
+                f"{_canonical_address(version, first, start)}-{_canonical_address(version, last, end)}")
+    version, value = parse_address(text)
+    return version, value, value, _canonical_address(version, value, text)
+
+
+def read_blocklist(filepath):
+    # Addresses and ranges from a blocklist file, one per line. Anything after
+    # the first whitespace, '#' or ';' is ignored, which covers plain lists,
+    # FireHOL .netset and Spamhaus DROP files.
+    ranges = []
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.split("#", 1)[0].split(";", 1)[0].strip()
+            if line:
+                ranges.append(line.split()[0])
+    return ranges
+
+
+class IpIndex:
+    # Address ranges as sorted, disjoint [first, last] intervals, one pair of
+    # arrays per IP version. Ranges that overlap or touch are merged when
+    # added, so a lookup is a single binary search over the starts. Ranges
+    # cannot be taken out again (the merged intervals do not remember what
+    # they were built from); rebuild() with the remaining ones instead.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._starts = {4: array(IPV4_TYPECODE), 6: []}
+        self._ends = {4: array(IPV4_TYPECODE), 6: []}
+
+    def __len__(self):
+        return len(self._starts[4]) + len(self._starts[6])
+
+    def _sequence(self, version, values):
+        return array(IPV4_TYPECODE, values) if version == 4 else list(values)
+
+    def contains(self, version, value):
+        return self.covers(version, value, value)
+
+    def covers(self, version, first, last):
+        # Whether the whole range lies inside the indexed ranges
+        starts = self._starts[version]
+        i = bisect_right(starts, first) - 1
+        return i >= 0 and self._ends[version][i] >= last
+
+    def add(self, version, first, last):
+        starts, ends = self._starts[version], self._ends[version]
+        # The intervals overlapping or adjacent to [first, last] are replaced
+        # by a single one spanning all of them
+        lo = bisect_left(ends, first - 1)
+        hi = bisect_right(starts, last + 1)
+        if lo < hi:
+            first = min(first, starts[lo])
+            last = max(last, ends[hi - 1])
+        starts[lo:hi] = self._sequence(version, (first,))
+        ends[lo:hi] = self._sequence(version, (last,))
+
+    def add_many(self, ranges):
+        # ranges: (version, first, last) tuples
+        ranges = list(ranges)
+        if len(ranges) < BULK_MERGE:
+            for version, first, last in ranges:
+                self.add(version, first, last)
+            return
+        for version, bits in BITS.items():
+            # Packed into one int per range, which sorts much faster than
+            # tuples and orders by first, then last
+            keys = [first << bits | last for v, first, last in ranges if v == version]
+            if not keys:
+                continue
+            keys.extend(first << bits | last for first, last in zip(self._starts[version], self._ends[version]))
+            keys.sort()
+            self._starts[version], self._ends[version] = self._merge(version, keys, bits)
+
+    def _merge(self, version, keys, bits):
+        mask = (1 << bits) - 1
+        starts = []
+        ends = []
+        current_first = keys[0] >> bits
+        current_last = keys[0] & mask
+        for key in keys:
+            first = key >> bits
+            if first <= current_last + 1:
+                last = key & mask
+                if last > current_last:
+                    current_last = last
+                continue
+            starts.append(current_first)
+            ends.append(current_last)
+            current_first = first
+            current_last = key & mask
+        starts.append(current_first)
+        ends.append(current_last)
+        return self._sequence(version, starts), self._sequence(version, ends)
+
+    def rebuild(self, ranges):
+        self.clear()
+        self.add_many(ranges)
@@ -0,0 +1,115 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class Job:
+    def __init__(self, job_id, key, label, fn, args, kwargs, on_done):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.state = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.progress = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def finished_ok(self):
+        return self.state == JOB_DONE
+
+
+class JobExecutor:
+    # Runs blocking backend calls on a thread pool. Jobs that share a key (the
+    # server name) run one at a time in submission order; different keys run
+    # in parallel. Completion callbacks are not run on the worker: they are
+    # queued and run by whoever calls run_callbacks() (the render loop), so
+    # they can safely touch the UI.
+    def __init__(self, max_workers=4, history=50):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._busy = set()
+        self._callbacks = queue.SimpleQueue()
+        self._history = deque(maxlen=history)
+        # Bumped on every state change so the UI can skip redraws
+        self.generation = 0
+
+    def submit(self, key, label, fn, *args, on_done=None, **kwargs):
+        job = Job(next(self._ids), key, label, fn, args, kwargs, on_done)
+        with self._lock:
+            self._history.append(job)
+            self.generation += 1
+            if key in self._busy:
+                self._queues.setdefault(key, deque()).append(job)
+                return job
+            self._busy.add(key)
+        self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        while job:
+            job.state = JOB_RUNNING
+            job.started = time.time()
+            with self._lock:
+                self.generation += 1
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+                job.state = JOB_DONE
+            except Exception as e:
+                job.error = e
+                job.state = JOB_FAILED
+            job.finished = time.time()
+            self._callbacks.put(job)
+
+            # Keep the worker on this key until its queue is empty
+            with self._lock:
+                self.generation += 1
+                pending = self._queues.get(job.key)
+                if pending:
+                    job = pending.popleft()
+                else:
+                    self._queues.pop(job.key, None)
+                    self._busy.discard(job.key)
+                    job = None
+
+    def run_callbacks(self, limit=100):
+        # Call from the UI thread; returns how many callbacks ran
+        ran = 0
+        while ran < limit:
+            try:
+                job = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            ran += 1
+            if job.on_done:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    print(f"Job callback for '{job.label}' failed: {e}")
+        return ran
+
+    def jobs(self):
+        with self._lock:
+            return list(self._history)
+
+    def active(self):
+        return [job for job in self.jobs() if job.state in (JOB_QUEUED, JOB_RUNNING)]
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+import subprocess
+
+from src.backend.fileutil import atomic_write
+
+# Per-server profile, inside the server's .mcmanager directory
+PROFILE_FILE = "launch.json"
+
+GC_AIKAR = "aikar"
+GC_G1 = "g1"
+GC_ZGC = "zgc"
+GC_NONE = "none"
+GC_PRESETS = (GC_AIKAR, GC_G1, GC_ZGC, GC_NONE)
+
+# Share of an instance's memory given to the heap; the rest is left for
+# metaspace, thread stacks, direct buffers and the JIT
+HEAP_FRACTION = 0.8
+# Automatic heap sizes are rounded down to this (MB)
+HEAP_STEP = 256
+# Aikar's flags switch to a larger young generation and regions above this heap size (MB)
+LARGE_HEAP = 12 * 1024
+
+# Aikar's G1 flags (https://docs.papermc.io/paper/aikars-flags); the values
+# that differ for large heaps are filled in by gc_flags()
+AIKAR_FLAGS = (
+    "-XX:+UseG1GC",
+    "-XX:+ParallelRefProcEnabled",
+    "-XX:MaxGCPauseMillis={pause}",
+    "-XX:+UnlockExperimentalVMOptions",
+    "-XX:+DisableExplicitGC",
+    "-XX:+AlwaysPreTouch",
+    "-XX:G1NewSizePercent={new_size}",
+    "-XX:G1MaxNewSizePercent={max_new_size}",
+    "-XX:G1HeapRegionSize={region}M",
+    "-XX:G1ReservePercent={reserve}",
+    "-XX:G1HeapWastePercent=5",
+    "-XX:G1MixedGCCountTarget=4",
+    "-XX:InitiatingHeapOccupancyPercent={ihop}",
+    "-XX:G1MixedGCLiveThresholdPercent=90",
+    "-XX:G1RSetUpdatingPauseTimePercent=5",
+    "-XX:SurvivorRatio=32",
+    "-XX:+PerfDisableSharedMem",
+    "-XX:MaxTenuringThreshold=1",
+    "-Dusing.aikars.flags=https://mcflags.emc.gs",
+    "-Daikars.new.flags=true",
+)
+AIKAR_SMALL = {"new_size": 30, "max_new_size": 40, "region": 8, "reserve": 20, "ihop": 15}
+AIKAR_LARGE = {"new_size": 40, "max_new_size": 50, "region": 16, "reserve": 15, "ihop": 20}
+
+ZGC_FLAGS = ("-XX:+UseZGC", "-XX:+AlwaysPreTouch", "-XX:+DisableExplicitGC")
+# Generational ZGC has to be asked for on Java 21 and 22; older JVMs refuse
+# to start with the flag and newer ones use it by default
+ZGC_GENERATIONAL = "-XX:+ZGenerational"
+ZGC_GENERATIONAL_JAVA = (21, 22)
+
+# Major version per java executable, probed once
+_java_versions = {}
+
+CGROUP_LIMITS = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes")
+
+
+def parse_size(value):
+    # "4G", "4096M", "512m" or a plain number of MB -> MB
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid size: {value!r}")
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper()
+    scale = 1
+    if text.endswith("G"):
+        text, scale = text[:-1], 1024
+    elif text.endswith("M"):
+        text = text[:-1]
+    try:
+        return int(float(text) * scale)
+    except ValueError:
+        raise ValueError(f"Invalid size: {value!r}") from None
+
+
+def host_memory_mb():
+    # Physical memory, or the container's limit when that is lower
+    import psutil
+    total = psutil.virtual_memory().total
+    for path in CGROUP_LIMITS:
+        try:
+            with open(path) as f:
+                limit = f.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit():
+            total = min(total, int(limit))
+        break
+    return total // (1024 * 1024)
+
+
+def java_version(java_path):
+    # Major version of a java executable (8, 17, 21, ...), or None when it
+    # cannot be run
+    if java_path not in _java_versions:
+        version = None
+        try:
+            result = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=10)
+            match = re.search(r'version "(?:1\.)?(\d+)', result.stderr)
+            version = int(match.group(1)) if match else None
+        except (OSError, subprocess.SubprocessError):
+            pass
+        _java_versions[java_path] = version
+    return _java_versions[java_path]
+
+
+def gc_flags(preset, heap_mb, pause_ms=200, java=None):
+    # java: major Java version, if known
+    if preset == GC_AIKAR:
+        values = AIKAR_LARGE if heap_mb > LARGE_HEAP else AIKAR_SMALL
+        return [flag.format(pause=pause_ms, **values) for flag in AIKAR_FLAGS]
+    if preset == GC_G1:
+        return ["-XX:+UseG1GC", f"-XX:MaxGCPauseMillis={pause_ms}", "-XX:+DisableExplicitGC"]
+    if preset == GC_ZGC:
+        if java in ZGC_GENERATIONAL_JAVA:
+            return [ZGC_FLAGS[0], ZGC_GENERATIONAL, *ZGC_FLAGS[1:]]
+        return list(ZGC_FLAGS)
+    return []
+
+
+class LaunchProfile:
+    # How a server's JVM is started. heap is a size or "auto": the host's
+    # memory minus `reserve`, split between the servers sharing the host and
+    # clamped to [min_heap, max_heap]. Xms always equals Xmx, so the heap is
+    # committed up front. affinity (CPU numbers) and nice are applied to the
+    # process after it starts.
+    def __init__(self, heap="auto", min_heap="1G", max_heap="12G", reserve="2G", gc=GC_AIKAR, pause_ms=200,
+                 java=None, jvm_args=(), server_args=("nogui",), affinity=None, nice=None):
+        if gc not in GC_PRESETS:
+            raise ValueError(f"Unknown GC preset '{gc}' (one of {', '.join(GC_PRESETS)})")
+        if heap != "auto":
+            parse_size(heap)
+        for size in (min_heap, max_heap, reserve):
+            parse_size(size)
+        if affinity is not None and not all(isinstance(cpu, int) and cpu >= 0 for cpu in affinity):
+            raise ValueError("'affinity' must be a list of CPU numbers")
+        if nice is not None and not isinstance(nice, int):
+            raise ValueError("'nice' must be an integer")
+        self.heap = heap
+        self.min_heap = min_heap
+        self.max_heap = max_heap
+        self.reserve = reserve
+        self.gc = gc
+        self.pause_ms = int(pause_ms)
+        self.java = java
+        self.jvm_args = [str(arg) for arg in jvm_args]
+        self.server_args = [str(arg) for arg in server_args]
+        self.affinity = list(affinity) if affinity is not None else None
+        self.nice = nice
+
+    def to_dict(self):
+        return {
+            "heap": self.heap,
+            "min_heap": self.min_heap,
+            "max_heap": self.max_heap,
+            "reserve": self.reserve,
+            "gc": self.gc,
+            "pause_ms": self.pause_ms,
+            "java": self.java,
+            "jvm_args": list(self.jvm_args),
+            "server_args": list(self.server_args),
+            "affinity": self.affinity,
+            "nice": self.nice,
+        }
+
+    def updated(self, changes):
+        # A new profile with some settings changed
+        return profile_from_dict(dict(self.to_dict(), **changes))
+
+    def heap_mb(self, instances=1, host_mb=None):
+        if self.heap != "auto":
+            return parse_size(self.heap)
+        if host_mb is None:
+            host_mb = host_memory_mb()
+        share = (host_mb - parse_size(self.reserve)) / max(1, instances)
+        heap = int(share * HEAP_FRACTION) // HEAP_STEP * HEAP_STEP
+        return max(parse_size(self.min_heap), min(parse_size(self.max_heap), heap))
+
+    def command(self, java_path, jar_name, instances=1, host_mb=None):
+        heap = self.heap_mb(instances, host_mb)
+        java_path = self.java or java_path
+        # Only the ZGC preset depends on the Java version
+        java = java_version(java_path) if self.gc == GC_ZGC else None
+        return ([java_path, f"-Xms{heap}M", f"-Xmx{heap}M"]
+                + gc_flags(self.gc, heap, self.pause_ms, java)
+                + self.jvm_args
+                + ["-jar", jar_name]
+                + self.server_args)
+
+    def apply_to_process(self, pid):
+        # Returns a message for every setting that could not be applied
+        if self.affinity is None and self.nice is None:
+            return []
+        import psutil
+        problems = []
+        try:
+            proc = psutil.Process(pid)
+            if self.affinity is not None:
+                if hasattr(proc, "cpu_affinity"):
+                    proc.cpu_affinity(self.affinity)
+                else:
+                    problems.append("CPU affinity is not supported on this platform")
+            if self.nice is not None:
+                if os.name == "nt":
+                    # Windows has priority classes instead of nice values
+                    proc.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if self.nice > 0
+                              else psutil.ABOVE_NORMAL_PRIORITY_CLASS if self.nice < 0
+                              else psutil.NORMAL_PRIORITY_CLASS)
+                else:
+                    proc.nice(self.nice)
+        except (psutil.Error, OSError, ValueError) as e:
+            problems.append(f"Could not apply launch profile to process {pid}: {e}")
+        return problems
+
+
+def profile_from_dict(data):
+    if not isinstance(data, dict):
+        raise ValueError("A launch profile must be a JSON object")
+    try:
+        return LaunchProfile(**data)
+    except TypeError as e:
+        raise ValueError(f"Invalid launch profile: {e}") from None
+
+
+def load_profile(path):
+    # A missing file means the default profile
+    try:
+        with open(path, "r") as f:
+            return profile_from_dict(json.load(f))
+    except FileNotFoundError:
+        return LaunchProfile()
+
+
+def save_profile(path, profile):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, json.dumps(profile.to_dict(), indent=2) + "\n")
@@ -0,0 +1,49 @@
+import os
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def decode_line(line):
+    # Console lines stay raw bytes until something actually needs the text
+    if isinstance(line, bytes):
+        return line.decode("utf-8", errors="replace")
+    return line
+
+
+class LineSplitter:
+    # Splits a byte stream into lines without decoding. A trailing partial line
+    # is carried over to the next chunk; runaway lines are cut at max_line.
+    def __init__(self, max_line=64 * 1024):
+        self.max_line = max_line
+        self._partial = b""
+
+    def feed(self, data):
+        if self._partial:
+            data = self._partial + data
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n")
+        lines = data.split(b"\n")
+        self._partial = lines.pop()
+        if len(self._partial) > self.max_line:
+            lines.append(self._partial)
+            self._partial = b""
+        return lines
+
+    def flush(self):
+        partial, self._partial = self._partial, b""
+        return [partial] if partial else []
+
+
+def read_line_batches(fd, chunk_size=READ_CHUNK_SIZE, stop_event=None):
+    # Yields lists of raw lines, one list per os.read() on the pipe
+    splitter = LineSplitter()
+    while stop_event is None or not stop_event.is_set():
+        data = os.read(fd, chunk_size)
+        if not data:
+            break
+        lines = splitter.feed(data)
+        if lines:
+            yield lines
+    tail = splitter.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,340 @@
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+
+from src.backend.line_reader import decode_line
+
+# Raw lines per compressed block, and the raw size at which a block is cut early
+BLOCK_LINES = 2000
+BLOCK_BYTES = 256 * 1024
+# Compressed size at which a new segment file is started
+SEGMENT_BYTES = 8 * 1024 * 1024
+# Retention: whole segments are deleted once either limit is exceeded
+MAX_BYTES = 256 * 1024 * 1024
+MAX_AGE = 30 * 24 * 3600
+
+# One index record per block: first ts, last ts, offset, compressed length, lines
+INDEX_RECORD = struct.Struct("<ddQII")
+
+
+class Segment:
+    # One data file of zlib blocks plus its sparse index (one record per block)
+    def __init__(self, data_dir, name):
+        self.name = name
+        self.path = os.path.join(data_dir, name + ".log")
+        self.index_path = os.path.join(data_dir, name + ".idx")
+        self.blocks = []
+        self.size = 0
+        self._data = None
+        self._index = None
+
+    def load(self):
+        if not os.path.exists(self.path) or not os.path.exists(self.index_path):
+            return False
+        self.size = os.path.getsize(self.path)
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        for i in range(len(data) // INDEX_RECORD.size):
+            block = INDEX_RECORD.unpack_from(data, i * INDEX_RECORD.size)
+            # A block whose data never made it to disk (crash) is ignored
+            if block[2] + block[3] <= self.size:
+                self.blocks.append(block)
+        return bool(self.blocks)
+
+    @property
+    def first_ts(self):
+        return self.blocks[0][0] if self.blocks else None
+
+    @property
+    def last_ts(self):
+        return max(block[1] for block in self.blocks) if self.blocks else None
+
+    def append(self, first_ts, last_ts, payload, lines):
+        if self._data is None:
+            self._data = open(self.path, "ab")
+            self._index = open(self.index_path, "ab")
+        block = (first_ts, last_ts, self.size, len(payload), lines)
+        self._data.write(payload)
+        self._data.flush()
+        # The index only points at data that is already written
+        self._index.write(INDEX_RECORD.pack(*block))
+        self._index.flush()
+        self.size += len(payload)
+        self.blocks.append(block)
+
+    def read_block(self, block):
+        with open(self.path, "rb") as f:
+            f.seek(block[2])
+            return zlib.decompress(f.read(block[3]))
+
+    def close(self):
+        if self._data:
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+
+    def delete(self):
+        self.close()
+        for path in (self.path, self.index_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _encode_block(records):
+    # "<timestamp>\t<line>\n" per line, then zlib
+    parts = []
+    for ts, line in records:
+        if isinstance(line, str):
+            line = line.encode("utf-8", errors="replace")
+        parts.append(b"%.3f\t%s\n" % (ts, line))
+    return b"".join(parts)
+
+
+class ArchiveWriter:
+    # Background thread that turns queued output into compressed blocks for
+    # any number of archives, so archiving adds one thread in total rather
+    # than one per server.
+    def __init__(self, flush_interval=5.0):
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._deadlines = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def submit(self, archive, ts, lines):
+        self._queue.put((archive, ts, lines))
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="log-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.drain()
+
+    def drain(self, touched=None):
+        # Move everything queued into the archives' pending blocks
+        try:
+            while True:
+                item = self._queue.get_nowait()
+                if item:
+                    self._take(item, touched)
+        except queue.Empty:
+            pass
+
+    def _take(self, item, touched):
+        archive, ts, lines = item
+        archive._take(ts, lines)
+        if archive.block_full():
+            archive._write_block()
+        if touched is not None:
+            touched.add(archive)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            timeout = min(self._deadlines.values(), default=now + self.flush_interval) - now
+            touched = set()
+            try:
+                item = self._queue.get(timeout=max(0.0, timeout))
+                if item:
+                    self._take(item, touched)
+                self.drain(touched)
+            except queue.Empty:
+                pass
+            # Full blocks are written as they fill up; a partial block once its
+            # oldest line has waited flush_interval
+            now = time.monotonic()
+            for archive in touched:
+                self._deadlines.setdefault(archive, now + self.flush_interval)
+            for archive, deadline in list(self._deadlines.items()):
+                if archive._pending and now >= deadline:
+                    archive._write_block()
+                if not archive._pending:
+                    del self._deadlines[archive]
+
+
+class LogArchive:
+    # Persistent console history for one server: every output line with the
+    # time it was read, in zlib-compressed blocks inside rotated segment
+    # files. Each segment has a sparse index (one record per block), so a
+    # time-range search only decompresses the blocks that overlap the range.
+    # The reader thread only queues each batch; an ArchiveWriter (shared, or
+    # a private one when none is given) groups them into blocks.
+    def __init__(self, data_dir, writer=None, block_lines=BLOCK_LINES, block_bytes=BLOCK_BYTES,
+                 segment_bytes=SEGMENT_BYTES, max_bytes=MAX_BYTES, max_age=MAX_AGE, level=6):
+        self.data_dir = data_dir
+        self.block_lines = block_lines
+        self.block_bytes = block_bytes
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.level = level
+        self._own_writer = writer is None
+        self.writer = writer or ArchiveWriter()
+        self._lock = threading.Lock()
+        self._segments = []
+        self._current = None
+        # (ts, line) read but not yet compressed; searched from memory
+        self._pending = []
+        self._pending_bytes = 0
+        self.stats = {"lines": 0, "blocks": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        os.makedirs(data_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        names = sorted(f[:-4] for f in os.listdir(self.data_dir) if f.startswith("console-") and f.endswith(".idx"))
+        for name in names:
+            segment = Segment(self.data_dir, name)
+            if segment.load():
+                self._segments.append(segment)
+            else:
+                segment.delete()
+
+    def attach(self, server_manager):
+        server_manager.add_output_listener(self.observe)
+        self.writer.start()
+
+    def observe(self, lines):
+        # Called on the reader thread: stamp and hand off, nothing else
+        self.writer.submit(self, time.time(), lines)
+
+    def _take(self, ts, lines):
+        with self._lock:
+            for line in lines:
+                self._pending.append((ts, line))
+                self._pending_bytes += len(line)
+            self.stats["lines"] += len(lines)
+
+    def block_full(self):
+        return len(self._pending) >= self.block_lines or self._pending_bytes >= self.block_bytes
+
+    def _write_block(self):
+        # Done under the lock so a search never misses lines mid-write
+        with self._lock:
+            records, self._pending, self._pending_bytes = self._pending, [], 0
+            if not records:
+                return
+            raw = _encode_block(records)
+            payload = zlib.compress(raw, self.level)
+            first_ts = min(r[0] for r in records)
+            last_ts = max(r[0] for r in records)
+            if self._current is None or self._current.size >= self.segment_bytes:
+                self._rotate(first_ts)
+            self._current.append(first_ts, last_ts, payload, len(records))
+            self.stats["blocks"] += 1
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["compressed_bytes"] += len(payload)
+            self._enforce_retention()
+
+    def _rotate(self, ts):
+        if self._current:
+            self._current.close()
+        name = f"console-{int(ts * 1000):015d}"
+        while any(s.name == name for s in self._segments):
+            name += "_"
+        self._current = Segment(self.data_dir, name)
+        self._segments.append(self._current)
+
+    def _enforce_retention(self):
+        cutoff = time.time() - self.max_age
+        total = sum(s.size for s in self._segments)
+        while len(self._segments) > 1 and self._segments[0] is not self._current:
+            oldest = self._segments[0]
+            if total <= self.max_bytes and (oldest.last_ts or 0) >= cutoff:
+                break
+            total -= oldest.size
+            oldest.delete()
+            self._segments.pop(0)
+
+    def flush(self):
+        # Compress everything read so far now
+        self.writer.drain()
+        self._write_block()
+
+    def close(self):
+        if self._own_writer:
+            self.writer.stop()
+        self.flush()
+        with self._lock:
+            if self._current:
+                self._current.close()
+
+    def search(self, start=None, end=None, contains=None, pattern=None, limit=None):
+        # Lines read between start and end (epoch seconds, inclusive) that
+        # contain `contains` and/or match the regex `pattern`, oldest first.
+        # Returns [(ts, line)].
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+        needle = contains.encode("utf-8") if isinstance(contains, str) else contains
+        regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+        with self._lock:
+            candidates = [
+                (segment, block)
+                for segment in self._segments
+                for block in segment.blocks
+                if block[1] >= start and block[0] <= end
+            ]
+            pending = [r for r in self._pending if start <= r[0] <= end]
+
+        results = []
+        gone = set()
+        for segment, block in candidates:
+            if segment in gone:
+                continue
+            try:
+                data = segment.read_block(block)
+            except OSError:
+                # Deleted by retention since the candidates were collected
+                gone.add(segment)
+                continue
+            # Cheap whole-block check before splitting into lines
+            if needle and needle not in data:
+                continue
+            for raw in data.split(b"\n"):
+                if not raw:
+                    continue
+                ts, _, line = raw.partition(b"\t")
+                ts = float(ts)
+                if ts < start or ts > end or (needle and needle not in line):
+                    continue
+                text = decode_line(line)
+                if regex and not regex.search(text):
+                    continue
+                results.append((ts, text))
+                if limit and len(results) >= limit:
+                    return results
+        for ts, line in pending:
+            if isinstance(line, str):
+                line = line.encode("utf-8", errors="replace")
+            if needle and needle not in line:
+                continue
+            text = decode_line(line)
+            if regex and not regex.search(text):
+                continue
+            results.append((ts, text))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            return dict(
+                self.stats,
+                segments=len(self._segments),
+                disk_bytes=sum(s.size for s in self._segments),
+                pending=len(self._pending),
+            )
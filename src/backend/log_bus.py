@@ -0,0 +1,92 @@
+import itertools
+import threading
+
+from src.backend.console_buffer import ConsoleBuffer
+
+
+class Subscription:
+    # A reader of the bus. It only holds a cursor into the shared buffer, so
+    # subscribing costs the same no matter how much output there is.
+    def __init__(self, bus, name, cursor):
+        self.bus = bus
+        self.name = name
+        self.cursor = cursor
+        # Lines this subscriber never saw because the ring overwrote them
+        self.skipped = 0
+        self.closed = False
+
+    @property
+    def lag(self):
+        return self.bus.buffer.generation - self.cursor
+
+    def poll(self, limit=None):
+        # New lines since the last poll. A subscriber that fell more than the
+        # buffer's capacity behind jumps to the oldest retained line.
+        first = self.bus.buffer.first_seq
+        if self.cursor < first:
+            self.skipped += first - self.cursor
+            self.cursor = first
+        lines, self.cursor = self.bus.buffer.since(self.cursor, limit)
+        return lines
+
+    def wait(self, timeout=None):
+        # Block until there is something to poll; returns False on timeout
+        return self.bus.wait_for(self.cursor, timeout)
+
+    def seek_end(self):
+        self.cursor = self.bus.buffer.generation
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class LogBus:
+    # Publish/subscribe over a server's console output. Lines are stored once
+    # in an append-only ring (ConsoleBuffer); every subscriber (the GUI, log
+    # writers, remote tails, ...) reads it through its own cursor. Publishing
+    # never waits on subscribers: one that cannot keep up simply skips the
+    # lines that were overwritten.
+    def __init__(self, buffer=None, capacity=5000):
+        self.buffer = buffer if buffer is not None else ConsoleBuffer(capacity)
+        self._subscribers = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def subscribe(self, name=None, backlog=0):
+        # backlog: how many already published lines the subscriber starts with
+        cursor = max(self.buffer.first_seq, self.buffer.generation - max(0, backlog))
+        with self._lock:
+            sub_id = next(self._ids)
+            sub = Subscription(self, name or f"subscriber-{sub_id}", cursor)
+            self._subscribers[sub_id] = sub
+            sub.id = sub_id
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.pop(sub.id, None)
+            sub.closed = True
+
+    def publish(self, lines):
+        if not lines:
+            return 0
+        self.buffer.extend(lines)
+        with self._changed:
+            self._changed.notify_all()
+        return len(lines)
+
+    def wait_for(self, seq, timeout=None):
+        with self._changed:
+            return self._changed.wait_for(lambda: self.buffer.generation > seq, timeout)
+
+    def clear(self):
+        self.buffer.clear()
+        with self._lock:
+            for sub in self._subscribers.values():
+                sub.cursor = 0
+
+    def subscribers(self):
+        with self._lock:
+            subs = list(self._subscribers.values())
+        return [{"name": s.name, "lag": s.lag, "skipped": s.skipped} for s in subs]
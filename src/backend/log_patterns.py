@@ -0,0 +1,310 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+SEVERITY_INFO = "info"
+SEVERITY_WARNING = "warning"
+SEVERITY_CRITICAL = "critical"
+ALERT_SEVERITIES = (SEVERITY_WARNING, SEVERITY_CRITICAL)
+
+FIELD_TYPES = {"str": str, "int": int, "float": float}
+
+# Shortest literal worth using as a prefilter keyword
+MIN_KEYWORD = 3
+
+
+class Rule:
+    # One console pattern. Named groups become the fields of the event; a
+    # group listed in `types` is converted (int/float). The keyword is a
+    # literal every match must contain; it is derived from the pattern when
+    # not given.
+    def __init__(self, name, pattern, event=None, severity=SEVERITY_INFO, keyword=None, types=None):
+        self.name = name
+        self.pattern = pattern
+        self.event = event or name
+        self.severity = severity
+        self.regex = re.compile(pattern.encode() if isinstance(pattern, str) else pattern)
+        if keyword is None:
+            keyword = required_literal(self.regex)
+        elif isinstance(keyword, str):
+            keyword = keyword.encode()
+        self.keyword = keyword or None
+        self.types = {}
+        for key, value in (types or {}).items():
+            if isinstance(value, str):
+                if value not in FIELD_TYPES:
+                    raise ValueError(f"Rule '{name}': unknown type '{value}' for field '{key}' "
+                                     f"(one of {', '.join(FIELD_TYPES)})")
+                value = FIELD_TYPES[value]
+            elif not callable(value):
+                raise ValueError(f"Rule '{name}': type for field '{key}' must be a type name")
+            self.types[key] = value
+
+    def fields(self, match):
+        fields = {}
+        for key, value in match.groupdict().items():
+            if value is None:
+                continue
+            value = value.decode("utf-8", errors="replace")
+            convert = self.types.get(key)
+            if convert:
+                try:
+                    value = convert(value)
+                except (ValueError, TypeError):
+                    pass
+            fields[key] = value
+        return fields
+
+
+def required_literal(regex):
+    # Longest run of literal bytes that every match of `regex` must contain,
+    # or None. Only plain sequences and groups are followed; anything
+    # optional, repeated, alternated or case-insensitive ends a run.
+    if regex.flags & re.IGNORECASE:
+        return None
+    best = b""
+    run = bytearray()
+
+    def walk(items):
+        nonlocal best, run
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                run.append(av)
+                continue
+            # A scoped (?i:...) group matches other cases than its literals
+            if op is sre_constants.SUBPATTERN and not av[1] & sre_constants.SRE_FLAG_IGNORECASE:
+                walk(av[-1])
+                continue
+            if op is sre_constants.AT:
+                continue
+            if len(run) > len(best):
+                best = bytes(run)
+            run = bytearray()
+
+    try:
+        walk(sre_parse.parse(regex.pattern, regex.flags))
+    except Exception:
+        return None
+    if len(run) > len(best):
+        best = bytes(run)
+    return best if len(best) >= MIN_KEYWORD else None
+
+
+def _trie_regex(words):
+    # Alternation of the words factored into a trie (shared prefixes are
+    # matched once), with longer words preferred at the same position
+    trie = {}
+    for word in words:
+        node = trie
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def emit(node):
+        branches = [re.escape(bytes([b])) + emit(child) for b, child in sorted(
+            (k, v) for k, v in node.items() if k is not None)]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        return b"(?:" + body + b")?" if None in node else body
+
+    return emit(trie)
+
+
+class LogEvent:
+    __slots__ = ("seq", "time", "event", "severity", "rule", "fields", "line")
+
+    def __init__(self, seq, ts, rule, fields, line):
+        self.seq = seq
+        self.time = ts
+        self.event = rule.event
+        self.severity = rule.severity
+        self.rule = rule.name
+        self.fields = fields
+        self.line = line
+
+    def to_dict(self):
+        return {
+            "seq": self.seq,
+            "time": self.time,
+            "event": self.event,
+            "severity": self.severity,
+            "rule": self.rule,
+            "fields": self.fields,
+            "line": self.line.decode("utf-8", errors="replace"),
+        }
+
+
+DEFAULT_RULES = (
+    Rule("player_uuid", r"UUID of player (?P<name>\w{1,16}) is (?P<uuid>[0-9a-f]{8}-[0-9a-f-]{27})"),
+    # "Steve[/1.2.3.4:51234] logged in with entity id ..."; IPv6 addresses are
+    # bracketed and may carry a scope
+    Rule("player_login", r"\]: (?P<name>\w{1,16})\[/\[?(?P<address>[0-9A-Fa-f.:]+)(?:%[^\]]*)?\]?:\d+\] "
+                         r"logged in with entity id"),
+    Rule("player_joined", r"\]: (?P<name>\w{1,16}) joined the game"),
+    Rule("player_left", r"\]: (?P<name>\w{1,16}) left the game"),
+    Rule("server_started", r"Done \((?P<seconds>[\d.]+)s\)!", types={"seconds": "float"}),
+    Rule("server_stopping", r"\]: Stopping (?:the )?server"),
+    Rule("lag", r"Can't keep up!.*?Running (?P<ms>\d+)ms or (?P<ticks>\d+) ticks behind",
+         severity=SEVERITY_WARNING, types={"ms": "int", "ticks": "int"}),
+    Rule("out_of_memory", r"java\.lang\.OutOfMemoryError(?:: (?P<detail>.+))?", severity=SEVERITY_CRITICAL),
+    Rule("crash_report", r"This crash report has been saved to: (?P<path>.+)", severity=SEVERITY_CRITICAL),
+    Rule("crash", r"Encountered an unexpected exception", severity=SEVERITY_CRITICAL),
+    Rule("watchdog", r"A single server tick took (?P<seconds>[\d.]+) seconds", severity=SEVERITY_CRITICAL,
+         types={"seconds": "float"}),
+)
+
+
+def load_rules(path):
+    # User rules: a JSON list of {"name", "pattern", "event", "severity",
+    # "keyword", "types"}; a missing file means no extra rules
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    return [
+        Rule(r["name"], r["pattern"], r.get("event"), r.get("severity", SEVERITY_INFO), r.get("keyword"),
+             r.get("types"))
+        for r in data
+    ]
+
+
+class PatternEngine:
+    # Matches every rule against the console stream in one pass. All rule
+    # keywords are compiled into a single trie-shaped regex (shared prefixes
+    # are matched once, unlike a flat alternation) that is run over a whole
+    # batch at once; only lines where a keyword occurs are tried against the
+    # rules owning that keyword. Rules without a usable keyword
+    # are tried on every line. Matches become LogEvents, kept in a bounded
+    # history and passed to listeners.
+    def __init__(self, rules=DEFAULT_RULES, history=500):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=history)
+        self.listeners = []
+        self.seq = 0
+        self.counts = {}
+        self.stats = {"lines": 0, "candidates": 0, "events": 0}
+        # Name -> UUID from login lines, attached to join events
+        self._uuids = {}
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        rules = list(rules)
+        by_keyword = {}
+        always = []
+        for rule in rules:
+            if rule.keyword:
+                by_keyword.setdefault(rule.keyword, []).append(rule)
+            else:
+                always.append(rule)
+        # A keyword found at some position hides shorter keywords that are
+        # its prefixes, so those rules are tried as well
+        order = {id(rule): i for i, rule in enumerate(rules)}
+        candidates = {}
+        for keyword in by_keyword:
+            found = [r for i in range(1, len(keyword) + 1) for r in by_keyword.get(keyword[:i], ())]
+            candidates[keyword] = sorted(found, key=lambda r: order[id(r)])
+        finder = scanner = None
+        if by_keyword:
+            trie = _trie_regex(sorted(by_keyword))
+            finder = re.compile(trie)
+            # Zero-width version that reports a keyword at every position
+            scanner = re.compile(b"(?=(" + trie + b"))")
+        with self._lock:
+            self.rules = rules
+            self._candidates = candidates
+            self._always = always
+            self._finder = finder
+            self._scanner = scanner
+            self._order = order
+
+    def match_lines(self, lines):
+        # Returns [(rule, match, line)] for every rule that matched a line
+        finder, scanner = self._finder, self._scanner
+        candidates, always = self._candidates, self._always
+        lines = [line.encode("utf-8", errors="replace") if isinstance(line, str) else line for line in lines]
+        hits = []
+        if finder is not None:
+            # One scan of the whole batch finds the lines holding any keyword;
+            # only those are scanned again for all (possibly overlapping)
+            # keywords and tried against the owning rules
+            blob = b"\n".join(lines)
+            pos = 0
+            while True:
+                m = finder.search(blob, pos)
+                if m is None:
+                    break
+                line_start = blob.rfind(b"\n", 0, m.start()) + 1
+                pos = blob.find(b"\n", m.start())
+                if pos < 0:
+                    pos = len(blob)
+                line = blob[line_start:pos]
+                keywords = {k.group(1) for k in scanner.finditer(line)}
+                hits.extend(self._try(candidates, keywords, line))
+        if always:
+            for line in lines:
+                for rule in always:
+                    match = rule.regex.search(line)
+                    if match:
+                        hits.append((rule, match, line))
+        return hits
+
+    def _try(self, candidates, keywords, line):
+        self.stats["candidates"] += 1
+        rules = candidates[next(iter(keywords))] if len(keywords) == 1 else sorted(
+            {id(r): r for k in keywords for r in candidates[k]}.values(), key=lambda r: self._order[id(r)])
+        for rule in rules:
+            match = rule.regex.search(line)
+            if match:
+                yield rule, match, line
+
+    def observe(self, lines):
+        # Output listener: called with every batch of raw console lines
+        self.stats["lines"] += len(lines)
+        hits = self.match_lines(lines)
+        if not hits:
+            return
+        now = time.time()
+        events = []
+        with self._lock:
+            for rule, match, line in hits:
+                fields = rule.fields(match)
+                if rule.event == "player_uuid":
+                    self._uuids[fields.get("name")] = fields.get("uuid")
+                elif rule.event == "player_joined" and fields.get("name") in self._uuids:
+                    fields["uuid"] = self._uuids.pop(fields["name"])
+                self.seq += 1
+                event = LogEvent(self.seq, now, rule, fields, line)
+                self._events.append(event)
+                self.counts[rule.event] = self.counts.get(rule.event, 0) + 1
+                events.append(event)
+            self.stats["events"] += len(events)
+        for event in events:
+            for listener in self.listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    print(f"Event listener failed: {e}")
+
+    def recent(self, since=0, severities=None):
+        # Events with seq > since (oldest first) and the current seq
+        with self._lock:
+            events = [e for e in self._events if e.seq > since]
+            seq = self.seq
+        if severities:
+            events = [e for e in events if e.severity in severities]
+        return events, seq
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, rules=len(self.rules), always=len(self._always), counts=dict(self.counts))
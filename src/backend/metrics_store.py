@@ -0,0 +1,215 @@
+import os
+import struct
+import threading
+from array import array
+
+FIELDS = ("cpu", "ram")
+
+# (bucket seconds, buckets kept in memory): one hour of 1s buckets, a week of
+# 1m buckets and about a year of 1h buckets
+ROLLUPS = ((1, 3600), (60, 7 * 24 * 60), (3600, 400 * 24))
+
+LIVE_CAPACITY = 600
+
+
+class RingSeries:
+    # Fixed number of fixed-width float records in one preallocated array.
+    # Records are appended in timestamp order; column 0 is the timestamp.
+    def __init__(self, width, capacity):
+        self.width = width
+        self.capacity = capacity
+        self.data = array("d", bytes(8 * width * capacity))
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, record):
+        base = (self.total % self.capacity) * self.width
+        self.data[base:base + self.width] = array("d", record)
+        self.total += 1
+
+    def _slot(self, i):
+        # i-th retained record, oldest first
+        first = self.total - len(self)
+        return ((first + i) % self.capacity) * self.width
+
+    def timestamp(self, i):
+        return self.data[self._slot(i)]
+
+    def oldest(self):
+        return self.timestamp(0) if len(self) else None
+
+    def _bisect(self, ts):
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, start, end):
+        records = []
+        for i in range(self._bisect(start), len(self)):
+            base = self._slot(i)
+            if self.data[base] > end:
+                break
+            records.append(self.data[base:base + self.width])
+        return records
+
+
+class _Bucket:
+    def __init__(self, start, values):
+        self.start = start
+        self.count = 1
+        self.mins = list(values)
+        self.maxs = list(values)
+        self.sums = list(values)
+
+    def add(self, values):
+        self.count += 1
+        for i, v in enumerate(values):
+            if v < self.mins[i]:
+                self.mins[i] = v
+            if v > self.maxs[i]:
+                self.maxs[i] = v
+            self.sums[i] += v
+
+    def record(self):
+        record = [self.start]
+        for i in range(len(self.sums)):
+            record += (self.mins[i], self.sums[i] / self.count, self.maxs[i])
+        return record
+
+
+class RollupFile:
+    # Append-only file of packed rollup records. It is compacted back down to
+    # `keep` records once it grows past twice that, so disk use stays bounded.
+    def __init__(self, path, width, keep):
+        self.path = path
+        self.record = struct.Struct("<" + "d" * width)
+        self.keep = keep
+        self.count = os.path.getsize(path) // self.record.size if os.path.exists(path) else 0
+        self._file = None
+
+    def read_tail(self, n):
+        if not self.count:
+            return []
+        n = min(n, self.count)
+        with open(self.path, "rb") as f:
+            f.seek((self.count - n) * self.record.size)
+            data = f.read(n * self.record.size)
+        return [self.record.unpack_from(data, i * self.record.size) for i in range(len(data) // self.record.size)]
+
+    def append(self, record):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(self.record.pack(*record))
+        self._file.flush()
+        self.count += 1
+        if self.count > 2 * self.keep:
+            self._compact()
+
+    def _compact(self):
+        self.close()
+        tail = self.read_tail(self.keep)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for record in tail:
+                f.write(self.record.pack(*record))
+        os.replace(tmp_path, self.path)
+        self.count = len(tail)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class MetricsStore:
+    # Time-series store for one server's performance samples: a ring of raw
+    # samples for the live view plus min/avg/max rollups at several
+    # resolutions. Rollups are persisted when data_dir is given, and memory is
+    # bounded by the ring sizes no matter how long the server runs.
+    def __init__(self, data_dir=None, fields=FIELDS, rollups=ROLLUPS, live_capacity=LIVE_CAPACITY):
+        self.fields = fields
+        self._lock = threading.Lock()
+        self.live = RingSeries(1 + len(fields), live_capacity)
+        self.rollups = []
+        width = 1 + 3 * len(fields)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+        for seconds, capacity in rollups:
+            series = RingSeries(width, capacity)
+            store = None
+            if data_dir:
+                store = RollupFile(os.path.join(data_dir, f"metrics-{seconds}s.bin"), width, capacity)
+                for record in store.read_tail(capacity):
+                    series.append(record)
+            self.rollups.append({"seconds": seconds, "series": series, "file": store, "bucket": None})
+
+    def add(self, ts, values):
+        values = [float(values[f]) for f in self.fields] if isinstance(values, dict) else list(values)
+        with self._lock:
+            self.live.append([ts] + values)
+            for rollup in self.rollups:
+                start = ts - ts % rollup["seconds"]
+                bucket = rollup["bucket"]
+                if bucket and bucket.start == start:
+                    bucket.add(values)
+                    continue
+                if bucket:
+                    self._close_bucket(rollup)
+                rollup["bucket"] = _Bucket(start, values)
+
+    def _close_bucket(self, rollup):
+        record = rollup["bucket"].record()
+        rollup["series"].append(record)
+        if rollup["file"]:
+            rollup["file"].append(record)
+
+    def flush(self):
+        # Persist partially filled buckets (e.g. on shutdown)
+        with self._lock:
+            for rollup in self.rollups:
+                if rollup["bucket"]:
+                    self._close_bucket(rollup)
+                    rollup["bucket"] = None
+
+    def close(self):
+        self.flush()
+        for rollup in self.rollups:
+            if rollup["file"]:
+                rollup["file"].close()
+
+    def query(self, field, start, end):
+        # Returns (timestamps, mins, avgs, maxs) for `field`, using the finest
+        # resolution that still covers `start` (or the one reaching furthest back)
+        col = self.fields.index(field)
+        candidates = [self.live] + [rollup["series"] for rollup in self.rollups]
+        chosen, chosen_oldest = self.live, None
+        with self._lock:
+            for series in candidates:
+                oldest = series.oldest()
+                if oldest is None:
+                    continue
+                if oldest <= start:
+                    chosen = series
+                    break
+                if chosen_oldest is None or oldest < chosen_oldest:
+                    chosen, chosen_oldest = series, oldest
+
+            records = chosen.range(start, end)
+        timestamps = [r[0] for r in records]
+        if chosen is self.live:
+            values = [r[1 + col] for r in records]
+            return timestamps, values, values, values
+        base = 1 + 3 * col
+        return (
+            timestamps,
+            [r[base] for r in records],
+            [r[base + 1] for r in records],
+            [r[base + 2] for r in records],
+        )
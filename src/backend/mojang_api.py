@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+MOJANG_API = "https://api.mojang.com"
+# The bulk endpoint accepts at most this many names per request
+BATCH_SIZE = 10
+
+
+def format_uuid(raw_uuid):
+    # Insert hyphens into UUID
+    raw_uuid = raw_uuid.replace("-", "")
+    return f"{raw_uuid[:8]}-{raw_uuid[8:12]}-{raw_uuid[12:16]}-{raw_uuid[16:20]}-{raw_uuid[20:]}"
+
+
+class TokenBucket:
+    # Allows `rate` requests per second on average with bursts up to `capacity`
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class MojangClient:
+    # Name -> UUID lookups against the Mojang API with one pooled HTTP session,
+    # timeouts, a shared rate limit and batched, concurrent bulk resolution.
+    # base_url can point at a local stub server.
+    def __init__(self, base_url=MOJANG_API, timeout=5, workers=4, rate=5, burst=10, max_retries=3):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.workers = workers
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            if resp.status_code != 429 or attempt == self.max_retries:
+                return resp
+            # Rate limited: honour Retry-After if given, else back off
+            try:
+                delay = float(resp.headers.get("Retry-After", ""))
+            except ValueError:
+                delay = 2 ** attempt
+            time.sleep(delay)
+        return resp
+
+    def lookup(self, username, raise_errors=False):
+        # Returns (uuid, canonical name), or None if the name does not exist.
+        # Network/API failures also give None unless raise_errors is set.
+        try:
+            resp = self._request("GET", f"{self.base_url}/users/profiles/minecraft/{username}")
+            if resp.status_code in (204, 404):
+                return None
+            resp.raise_for_status()
+            data = resp.json()
+            return format_uuid(data["id"]), data.get("name", username)
+        except (requests.RequestException, ValueError, KeyError):
+            if raise_errors:
+                raise
+        return None
+
+    def lookup_batch(self, usernames):
+        # Up to BATCH_SIZE names in one POST; returns {lowercased name: (uuid, name)}
+        resp = self._request("POST", f"{self.base_url}/profiles/minecraft", json=list(usernames))
+        resp.raise_for_status()
+        return {
+            profile["name"].lower(): (format_uuid(profile["id"]), profile["name"])
+            for profile in resp.json()
+        }
+
+    def resolve_many(self, usernames):
+        # Resolves any number of names with concurrent batch requests. Returns
+        # ({lowercased name: (uuid, name)}, [names that do not exist],
+        #  [names whose request failed])
+        unique = list({name.lower(): name for name in usernames if name}.values())
+        batches = [unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE)]
+        resolved = {}
+        failed = []
+
+        def run(batch):
+            try:
+                return batch, self.lookup_batch(batch)
+            except (requests.RequestException, ValueError, KeyError):
+                return batch, None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for batch, result in pool.map(run, batches):
+                if result is None:
+                    failed.extend(batch)
+                else:
+                    resolved.update(result)
+
+        failed_keys = {name.lower() for name in failed}
+        unknown = [name for name in unique if name.lower() not in resolved and name.lower() not in failed_keys]
+        return resolved, unknown, failed
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,61 @@
+import threading
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+
+
+class OutputChannel:
+    # Bounded hand-off between the stdout reader thread and whoever consumes
+    # console output. Producers add whole batches under one lock acquisition and
+    # the consumer swaps the pending batch out in one step.
+    def __init__(self, capacity=10000, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self._pending = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._last_line = None
+        self._repeats = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def put(self, line):
+        self.put_many((line,))
+
+    def put_many(self, lines):
+        with self._lock:
+            pending = self._pending
+            coalesce = self.policy == COALESCE
+            for line in lines:
+                if coalesce:
+                    if line == self._last_line:
+                        self._repeats += 1
+                        self.coalesced += 1
+                        continue
+                    self._flush_repeats()
+                    self._last_line = line
+                if len(pending) == self.capacity:
+                    self.dropped += 1
+                pending.append(line)
+
+    def _flush_repeats(self):
+        if self._repeats:
+            if len(self._pending) == self.capacity:
+                self.dropped += 1
+            self._pending.append(f"Last message repeated {self._repeats} times")
+            self._repeats = 0
+
+    def drain(self):
+        with self._lock:
+            self._flush_repeats()
+            batch = self._pending
+            self._pending = deque(maxlen=self.capacity)
+            return batch
+
+    def __len__(self):
+        return len(self._pending)
+
+    def get_stats(self):
+        return {"pending": len(self._pending), "dropped": self.dropped, "coalesced": self.coalesced}
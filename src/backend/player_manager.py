@@ -1,102 +1,508 @@
+import csv
+import itertools
 import json
 import os
+import threading
+import time
 import uuid
-import requests
+from src.backend.fileutil import atomic_write, file_signature
+from src.backend.ip_index import IpIndex, parse_address, parse_range, read_blocklist
+from src.backend.uuid_cache import UuidResolver
+
+# Larger files are written compactly: indented output goes through the much
+# slower pure-Python JSON encoder
+PRETTY_PRINT_LIMIT = 5000
+
+class PlayerList:
+    # One JSON player file (whitelist, bans, ...) held in memory and indexed
+    # by lowercased name and by UUID. The file is re-read only when its
+    # mtime/size changes. Changes are written behind: they are batched and
+    # written atomically shortly after the last change (or on flush()).
+    def __init__(self, filepath, write_delay=0.5):
+        self.filepath = filepath
+        self.write_delay = write_delay
+        self._entries = {}
+        self._by_name = {}
+        self._signature = None
+        self._pending_ops = []
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def _key(self, entry):
+        return entry.get('uuid') or 'name:' + entry.get('name', '').lower()
+
+    def _index(self, entries):
+        self._entries = {}
+        self._by_name = {}
+        for entry in entries:
+            self._insert(entry)
+
+    def _insert(self, entry):
+        key = self._key(entry)
+        self._entries[key] = entry
+        name = entry.get('name')
+        if name:
+            self._by_name[name.lower()] = key
+
+    def _delete(self, key):
+        entry = self._entries.pop(key, None)
+        if entry and entry.get('name'):
+            self._by_name.pop(entry['name'].lower(), None)
+        return entry
+
+    def _refresh(self):
+        signature = file_signature(self.filepath)
+        if signature == self._signature:
+            return
+        entries = []
+        if signature is not None:
+            try:
+                with open(self.filepath, 'r') as f:
+                    entries = json.load(f)
+            except json.JSONDecodeError:
+                entries = []
+        self._index(entries if isinstance(entries, list) else [])
+        self._signature = signature
+        # Someone else changed the file while we had unsaved changes: keep
+        # theirs and re-apply ours on top
+        for op, arg in self._pending_ops:
+            if op == 'add':
+                self._insert(arg)
+            else:
+                self._delete(arg)
+
+    def entries(self, limit=None):
+        with self._lock:
+            self._refresh()
+            if limit is not None:
+                return list(itertools.islice(self._entries.values(), limit))
+            return list(self._entries.values())
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def get(self, name):
+        with self._lock:
+            self._refresh()
+            key = self._by_name.get(name.lower())
+            return self._entries.get(key) if key else None
+
+    def get_by_uuid(self, player_uuid):
+        with self._lock:
+            self._refresh()
+            return self._entries.get(player_uuid)
+
+    def add(self, entry):
+        return self.add_many([entry]) == 1
+
+    def add_many(self, entries):
+        # Adds entries whose name and UUID are not present yet; returns how
+        # many were added
+        added = 0
+        with self._lock:
+            self._refresh()
+            for entry in entries:
+                name = entry.get('name', '').lower()
+                if name in self._by_name or self._key(entry) in self._entries:
+                    continue
+                self._insert(entry)
+                self._pending_ops.append(('add', entry))
+                added += 1
+            if added:
+                self._schedule_write()
+        return added
+
+    def remove(self, name):
+        return self.remove_many([name]) == 1
+
+    def remove_many(self, names):
+        removed = 0
+        with self._lock:
+            self._refresh()
+            for name in names:
+                key = self._by_name.get(name.lower())
+                if key and self._delete(key):
+                    self._pending_ops.append(('remove', key))
+                    removed += 1
+            if removed:
+                self._schedule_write()
+        return removed
+
+    def _schedule_write(self):
+        if self.write_delay <= 0:
+            self.flush()
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending_ops:
+                return False
+            # Pick up external edits before overwriting the file
+            self._refresh()
+            entries = list(self._entries.values())
+            indent = 2 if len(entries) <= PRETTY_PRINT_LIMIT else None
+            atomic_write(self.filepath, json.dumps(entries, indent=indent))
+            self._signature = file_signature(self.filepath)
+            self._pending_ops = []
+            return True
+
+class IpBanList(PlayerList):
+    # banned-ips.json. Entries are keyed by their address or range ("1.2.3.4",
+    # "1.2.3.0/24" or "1.2.3.4-1.2.3.9"; the server itself only understands
+    # single addresses) and also kept in an IpIndex, so checking an address
+    # against thousands of ranges is a binary search. Removing an entry marks
+    # the index stale; it is rebuilt from the remaining entries on the next
+    # lookup.
+    def __init__(self, filepath, write_delay=0.5):
+        super().__init__(filepath, write_delay)
+        self.index = IpIndex()
+        self._stale = False
+        # Ranges of entries inserted by add_parsed()/_index(), indexed together
+        self._added = None
+
+    def _canonical(self, text):
+        try:
+            return parse_range(text)[3]
+        except ValueError:
+            return text.strip()
+
+    def _index(self, entries):
+        self._added = []
+        super()._index(entries)
+        self.index.rebuild(self._added)
+        self._added = None
+        self._stale = False
+
+    def _insert(self, entry, parsed=None):
+        # parsed: the parse_range() result for the entry, if the caller has it
+        if parsed is None:
+            try:
+                parsed = parse_range(entry.get('ip', ''))
+            except ValueError:
+                # Kept in the file, but matches nothing
+                self._entries[entry.get('ip', '').strip()] = entry
+                return
+        version, first, last, key = parsed
+        self._entries[key] = entry
+        if self._added is not None:
+            self._added.append((version, first, last))
+        elif not self._stale:
+            self.index.add(version, first, last)
+
+    def _delete(self, key):
+        entry = super()._delete(key)
+        if entry:
+            self._stale = True
+        return entry
+
+    def _lookup_index(self):
+        if self._stale:
+            ranges = []
+            for key in self._entries:
+                try:
+                    ranges.append(parse_range(key)[:3])
+                except ValueError:
+                    pass
+            self.index.rebuild(ranges)
+            self._stale = False
+        return self.index
+
+    def contains(self, address):
+        # Whether the address is banned by any entry; ValueError if it is not
+        # an IP address
+        version, value = parse_address(address)
+        with self._lock:
+            self._refresh()
+            return self._lookup_index().contains(version, value)
+
+    def covers(self, version, first, last):
+        with self._lock:
+            self._refresh()
+            return self._lookup_index().covers(version, first, last)
+
+    def get(self, address):
+        with self._lock:
+            self._refresh()
+            return self._entries.get(self._canonical(address))
+
+    def add_many(self, entries):
+        items = []
+        for entry in entries:
+            try:
+                items.append((entry, parse_range(entry.get('ip', ''))))
+            except ValueError:
+                continue
+        return self.add_parsed(items)
+
+    def add_parsed(self, items):
+        # items: (entry, parse_range() result) pairs. Entries already present
+        # or inside an existing ban are skipped; the rest are indexed together.
+        # Returns how many were added.
+        added = 0
+        with self._lock:
+            self._refresh()
+            index = self._lookup_index()
+            self._added = []
+            try:
+                for entry, parsed in items:
+                    version, first, last, key = parsed
+                    if key in self._entries or index.covers(version, first, last):
+                        continue
+                    self._insert(entry, parsed)
+                    self._pending_ops.append(('add', entry))
+                    added += 1
+            finally:
+                ranges, self._added = self._added, None
+                index.add_many(ranges)
+            if added:
+                self._schedule_write()
+        return added
+
+    def remove_many(self, addresses):
+        removed = 0
+        with self._lock:
+            self._refresh()
+            for address in addresses:
+                key = self._canonical(address)
+                if self._delete(key):
+                    self._pending_ops.append(('remove', key))
+                    removed += 1
+            if removed:
+                self._schedule_write()
+        return removed
+
+def read_names(filepath):
+    # Player names from a text file (one per line) or CSV (first column).
+    # Blank lines, '#' comments and a "name"/"username" header are skipped.
+    names = []
+    with open(filepath, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            name = row[0].strip()
+            if not name or name.startswith('#') or name.lower() in ('name', 'username'):
+                continue
+            names.append(name)
+    return names
 
 class PlayerManager:
-    def __init__(self, server_dir):
+    def __init__(self, server_dir, write_delay=0.5, resolver=None):
         self.server_dir = server_dir
+        # UuidResolver, normally shared by all servers
+        self._resolver = resolver
         self.whitelist_file = os.path.join(server_dir, "whitelist.json")
         self.banned_players_file = os.path.join(server_dir, "banned-players.json")
+        self.banned_ips_file = os.path.join(server_dir, "banned-ips.json")
+        self.ops_file = os.path.join(server_dir, "ops.json")
+        self.whitelist = PlayerList(self.whitelist_file, write_delay)
+        self.banned_players = PlayerList(self.banned_players_file, write_delay)
+        self.banned_ips = IpBanList(self.banned_ips_file, write_delay)
+        self.ops = PlayerList(self.ops_file, write_delay)
 
-    def _load_json(self, filepath):
-        if not os.path.exists(filepath):
-            return []
-        try:
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-    def _save_json(self, filepath, data):
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+    def flush(self):
+        self.whitelist.flush()
+        self.banned_players.flush()
+        self.banned_ips.flush()
+        self.ops.flush()
 
     def get_whitelist(self):
-        return self._load_json(self.whitelist_file)
+        return self.whitelist.entries()
+
+    def is_whitelisted(self, username):
+        return self.whitelist.get(username) is not None
 
     def add_to_whitelist(self, username):
+        if self.whitelist.get(username):
+            return False, "Player already whitelisted"
+
         # Need to resolve UUID
-        # For MVP, we might just add the name if UUID resolution fails or is skipped?
-        # Minecraft requires UUIDs usually.
         player_uuid = self._get_uuid(username)
         if not player_uuid:
             return False, "Could not resolve UUID"
 
-        whitelist = self.get_whitelist()
-        # Check if already exists
-        for entry in whitelist:
-            if entry.get('name', '').lower() == username.lower():
-                return False, "Player already whitelisted"
-
-        whitelist.append({
-            "uuid": player_uuid,
-            "name": username
-        })
-        self._save_json(self.whitelist_file, whitelist)
+        if not self.whitelist.add({"uuid": player_uuid, "name": username}):
+            return False, "Player already whitelisted"
         return True, "Player added"
 
     def remove_from_whitelist(self, username):
-        whitelist = self.get_whitelist()
-        new_whitelist = [p for p in whitelist if p.get('name', '').lower() != username.lower()]
-        if len(whitelist) == len(new_whitelist):
+        if not self.whitelist.remove(username):
             return False, "Player not found"
-        
-        self._save_json(self.whitelist_file, new_whitelist)
         return True, "Player removed"
 
     def get_banned_players(self):
-        return self._load_json(self.banned_players_file)
+        return self.banned_players.entries()
 
-    def ban_player(self, username, reason="Banned by operator"):
-        player_uuid = self._get_uuid(username)
-        if not player_uuid:
-            return False, "Could not resolve UUID"
-
-        bans = self.get_banned_players()
-        for entry in bans:
-            if entry.get('name', '').lower() == username.lower():
-                return False, "Player already banned"
+    def is_banned(self, username):
+        return self.banned_players.get(username) is not None
 
-        bans.append({
+    def _ban_entry(self, player_uuid, username, reason):
+        return {
             "uuid": player_uuid,
             "name": username,
-            "created": "2024-01-01 00:00:00 +0000", # TODO: Real timestamp
+            "created": time.strftime("%Y-%m-%d %H:%M:%S %z"),
             "source": "Console",
             "expires": "forever",
             "reason": reason
-        })
-        self._save_json(self.banned_players_file, bans)
+        }
+
+    def ban_player(self, username, reason="Banned by operator"):
+        if self.banned_players.get(username):
+            return False, "Player already banned"
+
+        player_uuid = self._get_uuid(username)
+        if not player_uuid:
+            return False, "Could not resolve UUID"
+
+        if not self.banned_players.add(self._ban_entry(player_uuid, username, reason)):
+            return False, "Player already banned"
         return True, "Player banned"
 
     def unban_player(self, username):
-        bans = self.get_banned_players()
-        new_bans = [p for p in bans if p.get('name', '').lower() != username.lower()]
-        if len(bans) == len(new_bans):
+        if not self.banned_players.remove(username):
             return False, "Player not found"
-        
-        self._save_json(self.banned_players_file, new_bans)
         return True, "Player unbanned"
 
-    def _get_uuid(self, username):
+    def get_banned_ips(self, limit=None):
+        return self.banned_ips.entries(limit)
+
+    def is_ip_banned(self, address):
+        return self.banned_ips.contains(address)
+
+    def _ip_ban_entry(self, ip, reason, created=None):
+        return {
+            "ip": ip,
+            "created": created or time.strftime("%Y-%m-%d %H:%M:%S %z"),
+            "source": "Console",
+            "expires": "forever",
+            "reason": reason
+        }
+
+    def ban_ip(self, address, reason="Banned by operator"):
+        # A single address, CIDR prefix or first-last range
         try:
-            resp = requests.get(f"https://api.mojang.com/users/profiles/minecraft/{username}")
-            if resp.status_code == 200:
-                data = resp.json()
-                # Insert hyphens into UUID
-                raw_uuid = data['id']
-                formatted_uuid = f"{raw_uuid[:8]}-{raw_uuid[8:12]}-{raw_uuid[12:16]}-{raw_uuid[16:20]}-{raw_uuid[20:]}"
-                return formatted_uuid
-        except Exception:
-            pass
-        return None
+            parsed = parse_range(address)
+        except ValueError as e:
+            return False, str(e)
+        if not self.banned_ips.add_parsed([(self._ip_ban_entry(parsed[3], reason), parsed)]):
+            return False, "Address already banned"
+        return True, "Address banned"
+
+    def unban_ip(self, address):
+        # Only removes the exact entry; an address inside a banned range stays
+        # banned until the range is removed
+        if not self.banned_ips.remove(address):
+            return False, "Address not found"
+        return True, "Address unbanned"
+
+    def import_ip_blocklist(self, filepath, reason="Banned by operator"):
+        # Bans every address and range in a blocklist file with a single write.
+        # Returns (added, already_banned, invalid lines).
+        created = time.strftime("%Y-%m-%d %H:%M:%S %z")
+        items = []
+        invalid = []
+        for text in read_blocklist(filepath):
+            try:
+                parsed = parse_range(text)
+            except ValueError:
+                invalid.append(text)
+                continue
+            items.append((self._ip_ban_entry(parsed[3], reason, created), parsed))
+        added = self.banned_ips.add_parsed(items)
+        self.banned_ips.flush()
+        return added, len(items) - added, invalid
+
+    def get_ops(self):
+        return self.ops.entries()
+
+    def is_op(self, username):
+        return self.ops.get(username) is not None
+
+    def _op_entry(self, player_uuid, username, level=4, bypasses_player_limit=False):
+        return {
+            "uuid": player_uuid,
+            "name": username,
+            "level": level,
+            "bypassesPlayerLimit": bypasses_player_limit
+        }
+
+    def op_player(self, username, level=4, bypasses_player_limit=False):
+        if level not in (1, 2, 3, 4):
+            return False, "Level must be between 1 and 4"
+        if self.ops.get(username):
+            return False, "Player is already an operator"
+
+        player_uuid = self._get_uuid(username)
+        if not player_uuid:
+            return False, "Could not resolve UUID"
+
+        if not self.ops.add(self._op_entry(player_uuid, username, level, bypasses_player_limit)):
+            return False, "Player is already an operator"
+        return True, "Player is now an operator"
+
+    def deop_player(self, username):
+        if not self.ops.remove(username):
+            return False, "Player not found"
+        return True, "Player is no longer an operator"
+
+    @property
+    def resolver(self):
+        if self._resolver is None:
+            self._resolver = UuidResolver()
+            self._resolver.seed_from_usercache(self.server_dir)
+        return self._resolver
+
+    def _get_uuid(self, username):
+        result = self.resolver.resolve(username)
+        return result[0] if result else None
+
+    def _target_list(self, target):
+        if target == "whitelist":
+            return self.whitelist
+        if target == "bans":
+            return self.banned_players
+        if target == "ops":
+            return self.ops
+        raise ValueError(f"Unknown player list: {target}")
+
+    def bulk_import(self, usernames, target="whitelist", reason="Banned by operator"):
+        # Resolves all names concurrently in batches and applies the result
+        # with a single write. Returns (added, already_present, unresolved).
+        player_list = self._target_list(target)
+        missing = [name for name in usernames if not player_list.get(name)]
+        already = len(usernames) - len(missing)
+        resolved, unknown, failed = self.resolver.resolve_many(missing)
+        unresolved = unknown + failed
+
+        entries = []
+        for player_uuid, name in resolved.values():
+            if target == "bans":
+                entries.append(self._ban_entry(player_uuid, name, reason))
+            elif target == "ops":
+                entries.append(self._op_entry(player_uuid, name))
+            else:
+                entries.append({"uuid": player_uuid, "name": name})
+        added = player_list.add_many(entries)
+        player_list.flush()
+        return added, already + len(entries) - added, unresolved
+
+    def import_file(self, filepath, target="whitelist", reason="Banned by operator"):
+        return self.bulk_import(read_names(filepath), target, reason)
+
+    def import_from_server(self, other_server_dir, target="whitelist"):
+        # Copies entries from another server's list; they already carry UUIDs,
+        # so nothing needs resolving
+        other = PlayerManager(other_server_dir)._target_list(target)
+        player_list = self._target_list(target)
+        entries = other.entries()
+        added = player_list.add_many(entries)
+        player_list.flush()
+        return added, len(entries) - added, []
@@ -1,74 +1,220 @@
 import subprocess
 import threading
-import queue
-import psutil
 import os
-import time
+from src.backend.console_buffer import ConsoleBuffer
+from src.backend.launch_profile import LaunchProfile
+from src.backend.log_bus import LogBus
+from src.backend.output_channel import OutputChannel, DROP_OLDEST
+from src.backend.line_reader import read_line_batches, decode_line, READ_CHUNK_SIZE
+
+# "chunked" reads the raw pipe with os.read and splits bytes; "line" is the
+# plain readline() loop
+READER_CHUNKED = "chunked"
+READER_LINE = "line"
+
+# Lifecycle: Offline -> Running -> Stopping -> Saving -> Stopped (or Killed)
+STATE_OFFLINE = "Offline"
+STATE_RUNNING = "Running"
+STATE_STOPPING = "Stopping"
+STATE_SAVING = "Saving"
+STATE_STOPPED = "Stopped"
+STATE_KILLED = "Killed"
+
+# Console markers the server prints while shutting down
+SAVE_STARTED_MARKERS = (b"Saving worlds", b"Saving chunks")
+SAVE_FINISHED_MARKERS = (b"All dimensions are saved", b"ThreadedAnvilChunkStorage: All chunks are saved")
+
+def detect_jar(server_dir, default="server.jar"):
+    # Use the first .jar found in the server directory
+    if os.path.exists(server_dir):
+        for f in sorted(os.listdir(server_dir)):
+            if f.endswith(".jar"):
+                return f
+    return default
 
 class ServerManager:
-    def __init__(self, server_dir, jar_name="server.jar", java_path="java"):
+    def __init__(self, server_dir, jar_name="server.jar", java_path="java", console_capacity=5000,
+                 output_capacity=10000, overflow_policy=DROP_OLDEST,
+                 reader_mode=READER_CHUNKED, read_chunk_size=READ_CHUNK_SIZE,
+                 stop_timeout=120, multiplexer=None, launch_profile=None):
         self.server_dir = server_dir
         self.jar_name = jar_name
         self.java_path = java_path
+        self.launch_profile = launch_profile or LaunchProfile()
+        # Servers sharing this host; an automatic heap size is split between them
+        self.instances = 1
         self.process = None
-        self.output_queue = queue.Queue()
+        self.console_buffer = ConsoleBuffer(console_capacity)
+        # Consumers of the console subscribe here instead of draining a queue
+        self.log_bus = LogBus(self.console_buffer)
+        self._console_sub = self.log_bus.subscribe("console")
+        self.output_channel = OutputChannel(output_capacity, overflow_policy)
+        self.reader_mode = reader_mode
+        self.read_chunk_size = read_chunk_size
         self.is_running = False
         self.stop_event = threading.Event()
         self.monitor_thread = None
+        self.stop_timeout = stop_timeout
+        # Shared OutputMultiplexer; when set, no per-server reader thread is started
+        self.multiplexer = multiplexer
+        self.state = STATE_OFFLINE
+        self.save_finished = False
+        self._state_lock = threading.Lock()
+        # Held from the is_running check until the process is up, so two
+        # callers (UI jobs, control socket) cannot launch two JVMs
+        self._start_lock = threading.Lock()
+        self._stop_timer = None
+        self.exited = threading.Event()
+        # Callables that get every batch of raw output lines, on the reader
+        # thread. The list is replaced, never changed in place, so the reader
+        # can loop over it while listeners come and go.
+        self.output_listeners = []
+        self._listeners_lock = threading.Lock()
+        # psutil handle of the running process, kept between samples because
+        # cpu_percent() measures since the previous call on the same handle
+        self._ps_process = None
 
     def start_server(self):
+        with self._start_lock:
+            return self._start_server()
+
+    def _start_server(self):
         if self.is_running:
             return False
 
         jar_path = os.path.join(self.server_dir, self.jar_name)
         if not os.path.exists(jar_path):
-            self.output_queue.put(f"Error: {self.jar_name} not found in {self.server_dir}")
+            self.output_channel.put(f"Error: {self.jar_name} not found in {self.server_dir}")
             return False
 
         try:
             # Start the process
             self.process = subprocess.Popen(
-                [self.java_path, "-Xmx1024M", "-Xms1024M", "-jar", self.jar_name, "nogui"],
+                self.command_line(),
                 cwd=self.server_dir,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
             )
+            for problem in self.launch_profile.apply_to_process(self.process.pid):
+                self.output_channel.put(problem)
             self.is_running = True
             self.stop_event.clear()
+            self.exited.clear()
+            self.save_finished = False
+            self.state = STATE_RUNNING
             
-            # Start monitoring thread
-            self.monitor_thread = threading.Thread(target=self._monitor_output, daemon=True)
-            self.monitor_thread.start()
+            if self.multiplexer:
+                self.multiplexer.register(self)
+            else:
+                # Start monitoring thread
+                self.monitor_thread = threading.Thread(target=self._monitor_output, daemon=True)
+                self.monitor_thread.start()
             return True
         except Exception as e:
-            self.output_queue.put(f"Failed to start server: {str(e)}")
+            self.output_channel.put(f"Failed to start server: {str(e)}")
             return False
 
+    def command_line(self):
+        return self.launch_profile.command(self.java_path, self.jar_name, self.instances)
+
     def _monitor_output(self):
-        while not self.stop_event.is_set() and self.process and self.process.poll() is None:
-            line = self.process.stdout.readline()
-            if line:
-                self.output_queue.put(line.strip())
-        
+        if self.reader_mode == READER_CHUNKED:
+            fd = self.process.stdout.fileno()
+            for lines in read_line_batches(fd, self.read_chunk_size, self.stop_event):
+                self._on_output(lines)
+        else:
+            while not self.stop_event.is_set() and self.process and self.process.poll() is None:
+                line = self.process.stdout.readline()
+                if line:
+                    self._on_output((line.rstrip(),))
+
+        # stdout hit EOF, so the process is on its way out
+        if self.process and not self.stop_event.is_set():
+            self.process.wait()
         if self.process and self.process.poll() is not None:
-            self.is_running = False
-            self.output_queue.put("Server stopped.")
+            self._on_exit()
 
-    def stop_server(self):
-        if self.is_running and self.process:
-            self.send_command("stop")
-            # Wait a bit for graceful shutdown
-            time.sleep(5)
-            if self.process.poll() is None:
-                self.kill_server()
-            self.is_running = False
+    def add_output_listener(self, listener):
+        with self._listeners_lock:
+            self.output_listeners = self.output_listeners + [listener]
+
+    def remove_output_listener(self, listener):
+        with self._listeners_lock:
+            self.output_listeners = [l for l in self.output_listeners if l is not listener]
+
+    def _on_output(self, lines):
+        self.output_channel.put_many(lines)
+        for listener in tuple(self.output_listeners):
+            # A failing listener must not stop the reader: an unread pipe
+            # blocks the server once it fills up
+            try:
+                listener(lines)
+            except Exception as e:
+                print(f"Output listener failed: {e}")
+        # Only look for save markers while a shutdown is in progress
+        if self.state in (STATE_STOPPING, STATE_SAVING):
+            self._track_shutdown(lines)
+
+    def _track_shutdown(self, lines):
+        for line in lines:
+            if any(marker in line for marker in SAVE_STARTED_MARKERS):
+                self._set_state(STATE_SAVING, STATE_STOPPING)
+            elif any(marker in line for marker in SAVE_FINISHED_MARKERS):
+                self._set_state(STATE_SAVING, STATE_STOPPING)
+                self.save_finished = True
+
+    def _set_state(self, new_state, *from_states):
+        # Transition only if we are in one of from_states (any state if none given)
+        with self._state_lock:
+            if from_states and self.state not in from_states:
+                return False
+            self.state = new_state
+            return True
+
+    def _on_exit(self):
+        self._cancel_stop_timer()
+        self.is_running = False
+        self._ps_process = None
+        if self._set_state(STATE_STOPPED, STATE_RUNNING, STATE_STOPPING, STATE_SAVING):
+            self.output_channel.put("Server stopped.")
+        self.exited.set()
+
+    def _cancel_stop_timer(self):
+        if self._stop_timer:
+            self._stop_timer.cancel()
+            self._stop_timer = None
+
+    def stop_server(self, timeout=None):
+        # Non-blocking: asks the server to stop and returns immediately. The
+        # process exit (seen by the reader thread) completes the shutdown; if it
+        # has not exited after the grace period the server is killed.
+        if not (self.is_running and self.process):
+            return False
+        if not self._set_state(STATE_STOPPING, STATE_RUNNING):
+            return False
+        self.send_command("stop")
+        grace = self.stop_timeout if timeout is None else timeout
+        self._stop_timer = threading.Timer(grace, self._on_stop_deadline, args=(grace,))
+        self._stop_timer.daemon = True
+        self._stop_timer.start()
+        return True
+
+    def _on_stop_deadline(self, grace):
+        if self.process and self.process.poll() is None:
+            self.output_channel.put(f"Server did not stop within {grace}s, killing it.")
+            self.kill_server()
+
+    def wait_for_exit(self, timeout=None):
+        return self.exited.wait(timeout)
 
     def kill_server(self):
         if self.process:
+            self._cancel_stop_timer()
+            self._set_state(STATE_KILLED)
+            # psutil is only imported once something needs it (startup time)
+            import psutil
             try:
                 parent = psutil.Process(self.process.pid)
                 for child in parent.children(recursive=True):
@@ -77,23 +223,32 @@ class ServerManager:
             except psutil.NoSuchProcess:
                 pass
             self.is_running = False
-            self.output_queue.put("Server killed.")
+            self.output_channel.put("Server killed.")
 
     def send_command(self, command):
         if self.is_running and self.process:
             try:
-                self.process.stdin.write(command + "\n")
+                self.process.stdin.write((command + "\n").encode())
                 self.process.stdin.flush()
             except Exception as e:
-                self.output_queue.put(f"Error sending command: {str(e)}")
+                self.output_channel.put(f"Error sending command: {str(e)}")
+
+    def pump_output(self):
+        # Publish everything the reader produced to the log bus in one step
+        return self.log_bus.publish(self.output_channel.drain())
+
+    def get_output_stats(self):
+        return self.output_channel.get_stats()
 
     def get_console_output(self):
-        lines = []
-        while not self.output_queue.empty():
-            lines.append(self.output_queue.get())
-        return lines
+        # Lines appended since the previous call. Other readers have their own
+        # subscriptions, so this no longer takes lines away from anyone.
+        self.pump_output()
+        return [decode_line(line) for line in self._console_sub.poll()]
 
     def get_status(self):
+        if self.state in (STATE_STOPPING, STATE_SAVING):
+            return self.state
         if self.is_running:
             return "Online"
         return "Offline"
@@ -101,9 +256,12 @@ class ServerManager:
     def get_performance_stats(self):
         if not self.is_running or not self.process:
             return {"cpu": 0, "ram": 0}
-        
+
+        import psutil
         try:
-            proc = psutil.Process(self.process.pid)
+            proc = self._ps_process
+            if proc is None or proc.pid != self.process.pid:
+                proc = self._ps_process = psutil.Process(self.process.pid)
             with proc.oneshot():
                 cpu_percent = proc.cpu_percent(interval=None)
                 memory_info = proc.memory_info()
@@ -0,0 +1,248 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.backend.backup import BackupManager, load_settings as load_backup_settings
+from src.backend.config_manager import ConfigManager, apply_to_servers
+from src.backend.io_multiplexer import OutputMultiplexer
+from src.backend.launch_profile import PROFILE_FILE, load_profile, save_profile
+from src.backend.log_archive import ArchiveWriter, LogArchive
+from src.backend.log_patterns import DEFAULT_RULES, PatternEngine, load_rules
+from src.backend.metrics_store import MetricsStore
+from src.backend.server_manager import ServerManager, detect_jar
+from src.backend.player_manager import PlayerManager
+from src.backend.telemetry import TelemetryCollector
+from src.backend.uuid_cache import UuidResolver
+
+
+# Per-server data kept by the manager (metrics, ...) lives in this subdirectory
+MANAGER_DATA_DIR = ".mcmanager"
+
+# Kick message for players joining from a banned range
+IP_BAN_MESSAGE = "Your IP address is banned from this server."
+
+# Every subdirectory of SERVERS_ROOT is managed as its own server; without it
+# the manager falls back to the single example server.
+SERVERS_ROOT = "servers"
+DEFAULT_SERVER_DIR = "exampleserver"
+
+
+def manager_data_path(server_dir, *parts):
+    return os.path.join(server_dir, MANAGER_DATA_DIR, *parts)
+
+
+def looks_like_server_dir(path):
+    if not os.path.isdir(path):
+        return False
+    return any(f == "server.properties" or f.endswith(".jar") for f in os.listdir(path))
+
+
+class Supervisor:
+    # Owns one ServerManager (plus config, player, metrics, telemetry, console
+    # event, console archive and backup managers) per server directory. All instances share a single
+    # OutputMultiplexer so the number of manager threads does not grow with the
+    # number of servers, and one UuidResolver.
+    def __init__(self, use_multiplexer=True, persist_metrics=True, archive_logs=True, telemetry_interval=5.0,
+                 resolver=None, **manager_options):
+        self.servers = {}
+        self.configs = {}
+        self.players = {}
+        self.resolver = resolver or UuidResolver()
+        self.metrics = {}
+        self.telemetry = {}
+        self.archives = {}
+        self.events = {}
+        self.backups = {}
+        self.archive_logs = archive_logs
+        self.archive_writer = ArchiveWriter() if archive_logs else None
+        self.telemetry_interval = telemetry_interval
+        self.persist_metrics = persist_metrics
+        self.manager_options = manager_options
+        # Login checks may re-read and re-index banned-ips.json, so they run
+        # here instead of on the thread that reads the servers' output
+        self.login_checks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="login-check")
+        self.multiplexer = None
+        if use_multiplexer and OutputMultiplexer.supported:
+            self.multiplexer = OutputMultiplexer()
+
+    def add_server(self, name, server_dir, jar_name=None, **options):
+        if name in self.servers:
+            raise ValueError(f"Server '{name}' is already registered")
+        merged = dict(self.manager_options, **options)
+        # JVM settings from the server's .mcmanager/launch.json
+        profile_path = manager_data_path(server_dir, PROFILE_FILE)
+        try:
+            merged.setdefault("launch_profile", load_profile(profile_path))
+        except ValueError as e:
+            print(f"Ignoring {profile_path}: {e}")
+        manager = ServerManager(
+            server_dir,
+            jar_name=jar_name or detect_jar(server_dir),
+            multiplexer=self.multiplexer,
+            **merged,
+        )
+        self.servers[name] = manager
+        self._count_instances()
+        self.configs[name] = ConfigManager(server_dir)
+        self.players[name] = PlayerManager(server_dir, resolver=self.resolver)
+        # The server's usercache.json seeds the shared UUID cache
+        self.resolver.seed_from_usercache(server_dir)
+        data_dir = manager_data_path(server_dir, "metrics") if self.persist_metrics else None
+        self.metrics[name] = MetricsStore(data_dir)
+        self.telemetry[name] = TelemetryCollector(manager, self.telemetry_interval)
+        # Built-in console rules plus the server's own .mcmanager/rules.json
+        rules_path = manager_data_path(server_dir, "rules.json")
+        try:
+            rules = list(DEFAULT_RULES) + load_rules(rules_path)
+        except (ValueError, KeyError, TypeError, re.error) as e:
+            print(f"Ignoring {rules_path}: {e}")
+            rules = DEFAULT_RULES
+        self.events[name] = PatternEngine(rules)
+        manager.add_output_listener(self.events[name].observe)
+        self.events[name].listeners.append(lambda event, name=name: self._queue_login_check(name, event))
+        if self.archive_logs:
+            archive = LogArchive(manager_data_path(server_dir, "console"), self.archive_writer)
+            archive.attach(manager)
+            self.archives[name] = archive
+        settings_path = manager_data_path(server_dir, "backup.json")
+        try:
+            settings = load_backup_settings(settings_path)
+        except ValueError as e:
+            print(f"Ignoring {settings_path}: {e}")
+            settings = {}
+        store = settings.pop("store", None) or manager_data_path(server_dir, "backups")
+        self.backups[name] = BackupManager(manager, self.configs[name], store, **settings)
+        return manager
+
+    def discover(self, root):
+        # Every subdirectory of root that looks like a server becomes an instance
+        added = []
+        if not os.path.isdir(root):
+            return added
+        for entry in sorted(os.listdir(root)):
+            path = os.path.join(root, entry)
+            if entry not in self.servers and looks_like_server_dir(path):
+                self.add_server(entry, path)
+                added.append(entry)
+        return added
+
+    def load_servers(self, root=SERVERS_ROOT, default_dir=DEFAULT_SERVER_DIR):
+        if not self.discover(root):
+            self.add_server(os.path.basename(default_dir), default_dir)
+        return self.names()
+
+    def remove_server(self, name):
+        manager = self.servers[name]
+        if manager.is_running:
+            raise RuntimeError(f"Server '{name}' is still running")
+        del self.servers[name]
+        self._count_instances()
+        del self.configs[name]
+        self.players.pop(name).flush()
+        self.metrics.pop(name).close()
+        self.telemetry.pop(name).stop()
+        del self.events[name]
+        del self.backups[name]
+        if name in self.archives:
+            self.archives.pop(name).close()
+
+    def _queue_login_check(self, name, event):
+        # Called on the output reader thread
+        if event.event == "player_login":
+            self.login_checks.submit(self._check_login, name, event)
+
+    def _check_login(self, name, event):
+        # The server only enforces single addresses from banned-ips.json, so
+        # players joining from a banned range are kicked here
+        players = self.players.get(name)
+        if players is None:
+            return
+        try:
+            banned = players.is_ip_banned(event.fields.get("address", ""))
+            if banned:
+                self.servers[name].send_command(f"kick {event.fields['name']} {IP_BAN_MESSAGE}")
+        except ValueError:
+            return
+        except Exception as e:
+            print(f"Login check on {name} failed: {e}")
+
+    def _count_instances(self):
+        # Automatic heap sizes split the host's memory between all servers
+        for manager in self.servers.values():
+            manager.instances = len(self.servers)
+
+    def launch_info(self, name):
+        # The profile and the command line the server would be started with
+        manager = self.servers[name]
+        return {"profile": manager.launch_profile.to_dict(), "command": manager.command_line()}
+
+    def set_launch_profile(self, name, changes):
+        # Takes effect on the next start
+        manager = self.servers[name]
+        profile = manager.launch_profile.updated(changes)
+        save_profile(manager_data_path(manager.server_dir, PROFILE_FILE), profile)
+        manager.launch_profile = profile
+        return self.launch_info(name)
+
+    def get(self, name):
+        return self.servers[name]
+
+    def names(self):
+        return list(self.servers)
+
+    def start_all(self):
+        return {name: manager.start_server() for name, manager in self.servers.items()}
+
+    def stop_all(self):
+        return {name: manager.stop_server() for name, manager in self.servers.items()}
+
+    def kill_all(self):
+        for manager in self.servers.values():
+            if manager.is_running:
+                manager.kill_server()
+
+    def pump_all(self):
+        # Move pending output of every instance into its console buffer
+        return sum(manager.pump_output() for manager in self.servers.values())
+
+    def sample_metrics(self, ts=None):
+        # Record one performance sample for every running server
+        ts = time.time() if ts is None else ts
+        for name, manager in self.servers.items():
+            if manager.is_running:
+                self.metrics[name].add(ts, manager.get_performance_stats())
+        return ts
+
+    def apply_config(self, diff, names=None):
+        # Same {filename: {key: value}} edit on several servers (all by default)
+        names = self.names() if names is None else names
+        return apply_to_servers({name: self.configs[name] for name in names}, diff)
+
+    def get_fleet_status(self):
+        fleet = []
+        for name, manager in self.servers.items():
+            stats = manager.get_output_stats()
+            fleet.append({
+                "name": name,
+                "status": manager.get_status(),
+                "pid": manager.process.pid if manager.is_running and manager.process else None,
+                "lines": manager.console_buffer.generation,
+                "dropped": stats["dropped"],
+            })
+        return fleet
+
+    def shutdown(self):
+        self.login_checks.shutdown(wait=False, cancel_futures=True)
+        self.kill_all()
+        for store in self.metrics.values():
+            store.close()
+        if self.archive_writer:
+            self.archive_writer.stop()
+        for archive in self.archives.values():
+            archive.close()
+        for players in self.players.values():
+            players.flush()
+        self.resolver.flush()
+        if self.multiplexer:
+            self.multiplexer.close()
@@ -0,0 +1,196 @@
+import re
+import threading
+import time
+
+# "Can't keep up! Is the server overloaded? Running 5012ms or 100 ticks behind"
+LAG_RE = re.compile(rb"Can't keep up!.*?Running (\d+)ms or (\d+) ticks behind")
+# Spigot/Paper /tps: "TPS from last 1m, 5m, 15m: 20.0, *19.98, 19.9" (may carry colour codes)
+TPS_RE = re.compile(rb"TPS from last 1m, 5m, 15m: (?:\xc2?\xa7.)?\*?([\d.]+),\s*(?:\xc2?\xa7.)?\*?([\d.]+),\s*(?:\xc2?\xa7.)?\*?([\d.]+)")
+# Unified JVM logging (-Xlog:gc): "[gc] GC(12) Pause Young (Normal) (G1 Evacuation Pause) 24M->8M(256M) 3.456ms"
+GC_RE = re.compile(rb"GC\(\d+\) (Pause [^(]+?)\s*(?:\(.*\))?\s+\d+[KMG]->\d+[KMG]\(\d+[KMG]\) ([\d.]+)ms")
+
+TOP_THREADS = 5
+
+
+class LogTelemetry:
+    # Turns lag warnings, TPS reports and GC log lines from the console
+    # stream into counters. Lines are only run through a regex after a cheap
+    # substring check, so ordinary output costs almost nothing.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.lag_warnings = 0
+        self.ticks_behind = 0
+        self.last_lag = None
+        self.tps = None
+        self.gc_pauses = 0
+        self.gc_pause_ms = 0.0
+        self.gc_max_pause_ms = 0.0
+        self.last_gc = None
+
+    def observe(self, lines):
+        for line in lines:
+            if b"keep up" in line:
+                match = LAG_RE.search(line)
+                if match:
+                    with self._lock:
+                        self.lag_warnings += 1
+                        self.ticks_behind += int(match.group(2))
+                        self.last_lag = {"time": time.time(), "ms": int(match.group(1)), "ticks": int(match.group(2))}
+            elif b"TPS from" in line:
+                match = TPS_RE.search(line)
+                if match:
+                    with self._lock:
+                        self.tps = {"1m": float(match.group(1)), "5m": float(match.group(2)),
+                                    "15m": float(match.group(3)), "time": time.time()}
+            elif b"GC(" in line:
+                match = GC_RE.search(line)
+                if match:
+                    pause = float(match.group(2))
+                    with self._lock:
+                        self.gc_pauses += 1
+                        self.gc_pause_ms += pause
+                        self.gc_max_pause_ms = max(self.gc_max_pause_ms, pause)
+                        self.last_gc = {"time": time.time(), "kind": match.group(1).decode(), "ms": pause}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "lag_warnings": self.lag_warnings,
+                "ticks_behind": self.ticks_behind,
+                "last_lag": self.last_lag,
+                "tps": self.tps,
+                "gc_pauses": self.gc_pauses,
+                "gc_pause_ms": self.gc_pause_ms,
+                "gc_max_pause_ms": self.gc_max_pause_ms,
+                "last_gc": self.last_gc,
+            }
+
+
+class TelemetryCollector:
+    # Extended process telemetry for one ServerManager. Everything psutil
+    # offers is read inside a single oneshot() per sample; the time a sample
+    # takes is tracked so the overhead is visible.
+    def __init__(self, server_manager, interval=5.0):
+        self.server_manager = server_manager
+        self.interval = interval
+        self.logs = LogTelemetry()
+        server_manager.add_output_listener(self.logs.observe)
+        self._proc = None
+        self._last_threads = {}
+        self._last_time = None
+        self._snapshot = {}
+        self.samples = 0
+        self.sample_cost_total = 0.0
+        self.last_sample_cost = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _process(self):
+        process = self.server_manager.process
+        if not self.server_manager.is_running or not process:
+            self._proc = None
+            return None
+        if self._proc is None or self._proc.pid != process.pid:
+            # Imported on first use: a server that never runs never loads psutil
+            import psutil
+            self._proc = psutil.Process(process.pid)
+            self._last_threads = {}
+            self._last_time = None
+        return self._proc
+
+    def sample(self):
+        started = time.perf_counter()
+        proc = self._process()
+        process_stats = None
+        if proc:
+            import psutil
+            try:
+                process_stats = self._sample_process(proc)
+            except psutil.NoSuchProcess:
+                self._proc = None
+
+        self.last_sample_cost = time.perf_counter() - started
+        self.sample_cost_total += self.last_sample_cost
+        self.samples += 1
+        self._snapshot = {
+            "time": time.time(),
+            "process": process_stats,
+            "logs": self.logs.snapshot(),
+            "sample_cost_ms": self.last_sample_cost * 1000,
+        }
+        return self._snapshot
+
+    def _sample_process(self, proc):
+        import psutil
+        now = time.monotonic()
+        with proc.oneshot():
+            cpu_times = proc.cpu_times()
+            stats = {
+                "cpu_percent": proc.cpu_percent(interval=None),
+                "cpu_user": cpu_times.user,
+                "cpu_system": cpu_times.system,
+                "rss_mb": proc.memory_info().rss / 1024 / 1024,
+                "num_threads": proc.num_threads(),
+                "ctx_switches_voluntary": None,
+                "ctx_switches_involuntary": None,
+                "open_fds": None,
+                "io": None,
+            }
+            ctx = proc.num_ctx_switches()
+            stats["ctx_switches_voluntary"] = ctx.voluntary
+            stats["ctx_switches_involuntary"] = ctx.involuntary
+            # Not every platform has these
+            if hasattr(proc, "num_fds"):
+                stats["open_fds"] = proc.num_fds()
+            elif hasattr(proc, "num_handles"):
+                stats["open_fds"] = proc.num_handles()
+            if hasattr(proc, "io_counters"):
+                try:
+                    io = proc.io_counters()
+                    stats["io"] = {"read_bytes": io.read_bytes, "write_bytes": io.write_bytes,
+                                   "read_count": io.read_count, "write_count": io.write_count}
+                except psutil.AccessDenied:
+                    pass
+            threads = proc.threads()
+
+        stats["top_threads"] = self._thread_usage(threads, now)
+        return stats
+
+    def _thread_usage(self, threads, now):
+        # Per-thread CPU % since the previous sample, hottest first
+        current = {t.id: t.user_time + t.system_time for t in threads}
+        usage = []
+        if self._last_time is not None:
+            elapsed = now - self._last_time
+            if elapsed > 0:
+                for tid, total in current.items():
+                    previous = self._last_threads.get(tid)
+                    if previous is not None:
+                        usage.append({"id": tid, "cpu_percent": (total - previous) / elapsed * 100})
+        usage.sort(key=lambda entry: entry["cpu_percent"], reverse=True)
+        self._last_threads = current
+        self._last_time = now
+        return usage[:TOP_THREADS]
+
+    def snapshot(self):
+        return self._snapshot or self.sample()
+
+    def get_overhead(self):
+        average = self.sample_cost_total / self.samples if self.samples else 0.0
+        return {"samples": self.samples, "last_ms": self.last_sample_cost * 1000, "average_ms": average * 1000}
+
+    def start(self):
+        # Optional background sampling for headless use
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="telemetry")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.backend.fileutil import atomic_write
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".mcmanager", "uuid-cache.json")
+
+# Names change rarely; unknown names get re-checked much sooner
+TTL = 30 * 24 * 3600
+NEGATIVE_TTL = 3600
+
+
+class UuidResolver:
+    # Layered name -> UUID resolution:
+    #   1. an in-process LRU with per-entry expiry,
+    #   2. a persistent cache on disk shared by every managed server (seeded
+    #      from each server's usercache.json),
+    #   3. the Mojang API, only when both caches miss.
+    # Unknown names are cached too (negative entries), so repeated typos do
+    # not hit the network. Results: (uuid, name) or None.
+    def __init__(self, client=None, cache_path=DEFAULT_CACHE_PATH, lru_size=4096,
+                 ttl=TTL, negative_ttl=NEGATIVE_TTL, write_delay=2.0):
+        self._client = client
+        self.cache_path = cache_path
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.write_delay = write_delay
+        self._lru = OrderedDict()
+        # lowercased name -> [uuid or None, name, fetched_at]
+        self._disk = {}
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+        self.stats = {"lru_hits": 0, "disk_hits": 0, "negative_hits": 0, "network": 0, "misses": 0}
+        self._load()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from src.backend.mojang_api import MojangClient
+            self._client = MojangClient()
+        return self._client
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._disk = data
+        except (OSError, json.JSONDecodeError):
+            self._disk = {}
+
+    def seed_from_usercache(self, server_dir):
+        # usercache.json holds every player the server has seen
+        path = os.path.join(server_dir, "usercache.json")
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        now = time.time()
+        seeded = 0
+        with self._lock:
+            for entry in entries:
+                name, player_uuid = entry.get("name"), entry.get("uuid")
+                if not name or not player_uuid:
+                    continue
+                key = name.lower()
+                current = self._disk.get(key)
+                if current is None or current[0] != player_uuid:
+                    self._disk[key] = [player_uuid, name, now]
+                    self._lru.pop(key, None)
+                    seeded += 1
+            if seeded:
+                self._mark_dirty()
+        return seeded
+
+    def _expired(self, record, now):
+        ttl = self.ttl if record[0] else self.negative_ttl
+        return now - record[2] > ttl
+
+    def _remember(self, key, record):
+        self._lru[key] = record
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _cached(self, key, now):
+        # Returns the cached record for key, or None on a miss
+        record = self._lru.get(key)
+        if record is not None and not self._expired(record, now):
+            self._lru.move_to_end(key)
+            self.stats["lru_hits"] += 1
+            return record
+        record = self._disk.get(key)
+        if record is not None and not self._expired(record, now):
+            self._remember(key, record)
+            self.stats["disk_hits"] += 1
+            return record
+        self.stats["misses"] += 1
+        return None
+
+    def _store(self, key, player_uuid, name, now):
+        record = [player_uuid, name, now]
+        self._disk[key] = record
+        self._remember(key, record)
+        self._mark_dirty()
+
+    def _result(self, record):
+        if record[0] is None:
+            self.stats["negative_hits"] += 1
+            return None
+        return record[0], record[1]
+
+    def resolve(self, username):
+        key = username.lower()
+        now = time.time()
+        with self._lock:
+            record = self._cached(key, now)
+            if record is not None:
+                return self._result(record)
+
+        self.stats["network"] += 1
+        try:
+            result = self.client.lookup(username, raise_errors=True)
+        except Exception:
+            # Offline or API trouble: fall back to a stale entry if there is one
+            with self._lock:
+                stale = self._disk.get(key)
+            return (stale[0], stale[1]) if stale and stale[0] else None
+
+        with self._lock:
+            if result:
+                self._store(key, result[0], result[1], now)
+            else:
+                self._store(key, None, username, now)
+        return result
+
+    def resolve_many(self, usernames):
+        # Same contract as MojangClient.resolve_many, but only cache misses go
+        # to the network (in batches)
+        now = time.time()
+        resolved = {}
+        unknown = []
+        to_fetch = []
+        with self._lock:
+            for name in {n.lower(): n for n in usernames if n}.values():
+                record = self._cached(name.lower(), now)
+                if record is None:
+                    to_fetch.append(name)
+                elif record[0] is None:
+                    self.stats["negative_hits"] += 1
+                    unknown.append(name)
+                else:
+                    resolved[name.lower()] = (record[0], record[1])
+
+        failed = []
+        if to_fetch:
+            self.stats["network"] += 1
+            fetched, fetched_unknown, failed = self.client.resolve_many(to_fetch)
+            with self._lock:
+                for key, (player_uuid, name) in fetched.items():
+                    self._store(key, player_uuid, name, now)
+                for name in fetched_unknown:
+                    self._store(name.lower(), None, name, now)
+                # Offline or API trouble: like resolve(), fall back to stale entries
+                still_failed = []
+                for name in failed:
+                    stale = self._disk.get(name.lower())
+                    if stale and stale[0]:
+                        resolved[name.lower()] = (stale[0], stale[1])
+                    else:
+                        still_failed.append(name)
+                failed = still_failed
+            resolved.update(fetched)
+            unknown.extend(fetched_unknown)
+        return resolved, unknown, failed
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if not self.cache_path:
+            return
+        if self.write_delay <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty or not self.cache_path:
+                return False
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            atomic_write(self.cache_path, json.dumps(self._disk))
+            self._dirty = False
+            return True
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, lru_size=len(self._lru), disk_size=len(self._disk))
@@ -0,0 +1,73 @@
+import os
+import threading
+
+from src.backend import config_manager
+
+# The files the config editor manages, as a set for matching changed names
+CONFIG_FILES = frozenset(config_manager.CONFIG_FILES)
+PLAYER_FILES = {"whitelist.json", "banned-players.json", "banned-ips.json", "ops.json"}
+WATCHED_FILES = CONFIG_FILES | PLAYER_FILES
+
+
+class _DebouncedHandler:
+    # Observers only call dispatch(), so this needs no watchdog base class and
+    # the file sets above can be imported without loading watchdog
+    def __init__(self, watcher, name):
+        self.watcher = watcher
+        self.name = name
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+        # Atomic saves show up as a move of a temp file onto the real name
+        path = getattr(event, "dest_path", None) or event.src_path
+        filename = os.path.basename(path)
+        if filename in WATCHED_FILES:
+            self.watcher._touch(self.name, filename)
+
+
+class ServerDirWatcher:
+    # Watches server directories for changes to the files the managers cache.
+    # Bursts of events (editors and the server often write a file several
+    # times) are collapsed: on_change(name, filenames) runs once, `debounce`
+    # seconds after the last event for that server.
+    def __init__(self, on_change, debounce=0.5):
+        self.on_change = on_change
+        self.debounce = debounce
+        from watchdog.observers import Observer
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._pending = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def watch(self, name, server_dir):
+        self._observer.schedule(_DebouncedHandler(self, name), server_dir, recursive=False)
+
+    def start(self):
+        self._observer.start()
+
+    def stop(self):
+        self._observer.stop()
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def _touch(self, name, filename):
+        with self._lock:
+            self._pending.setdefault(name, set()).add(filename)
+            timer = self._timers.get(name)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(self.debounce, self._flush, args=(name,))
+            timer.daemon = True
+            self._timers[name] = timer
+            timer.start()
+
+    def _flush(self, name):
+        with self._lock:
+            filenames = self._pending.pop(name, set())
+            self._timers.pop(name, None)
+        if filenames:
+            self.on_change(name, filenames)
@@ -1,35 +1,114 @@
 import dearpygui.dearpygui as dpg
-import threading
 import time
-from src.backend.server_manager import ServerManager
-from src.backend.config_manager import ConfigManager
-from src.backend.player_manager import PlayerManager
+from src.backend.console_buffer import ConsoleBuffer
+from src.backend.jobs import JobExecutor, JOB_FAILED
+from src.ui.console_view import ConsoleView
+from src.ui.properties_view import PropertiesView
+from src.backend.config_manager import PROPERTIES_FILE
+from src.ui.update_scheduler import UpdateScheduler
+from src.backend.watcher import ServerDirWatcher, CONFIG_FILES, PLAYER_FILES
 import os
 
+PERF_SAMPLE_INTERVAL = 1.0
+JOB_LIST_SIZE = 6
+ALERT_LIST_SIZE = 5
+PERF_RANGES = {"Last 5 minutes": 300, "Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}
+SEARCH_RANGES = {"Last 15 minutes": 900, "Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}
+SEARCH_LIMIT = 500
+# IP ban lists can hold millions of ranges; only the first ones are listed
+IP_LIST_LIMIT = 500
+
+STATUS_COLORS = {"Online": (0, 255, 0), "Stopping": (255, 200, 0), "Saving": (255, 200, 0)}
+
 class App:
+    # Startup is staged so the window shows up as early as possible:
+    #   1. only the UI modules are imported and the window is built and drawn
+    #      with placeholders,
+    #   2. the backend (Supervisor and everything it imports) is created and
+    #      the server directories are scanned on a job thread,
+    #   3. the fleet, the polls and the file watcher are set up on the render
+    #      thread, and the selected server's config and player files are read
+    #      by further jobs and filled in as they finish.
     def __init__(self):
-        self.server_dir = "exampleserver" # Hardcoded for MVP
-        
-        # Auto-detect jar
-        jar_name = "server.jar"
-        if os.path.exists(self.server_dir):
-            for f in os.listdir(self.server_dir):
-                if f.endswith(".jar"):
-                    jar_name = f
-                    break
-        
-        self.server_manager = ServerManager(self.server_dir, jar_name=jar_name)
-        self.config_manager = ConfigManager(self.server_dir)
-        self.player_manager = PlayerManager(self.server_dir)
-        
-        self.console_log = ""
-        self.update_interval = 0.5
-        
+        self.supervisor = None
+        self.scheduler = None
+        self.watcher = None
+        self.jobs = JobExecutor()
+        self.jobs_drawn = None
+
+        self.fleet_status = {}
+        self.console_view = None
+        self.perf_range = "Last 5 minutes"
+        self.properties_file = PROPERTIES_FILE
+        self.current_server = None
+        self.server_manager = None
+        self.config_manager = None
+        self.player_manager = None
+
         dpg.create_context()
         self.setup_font()
         self.setup_ui()
         self.setup_theme()
-        
+        self.run()
+
+    def load_backend(self):
+        # Job thread: the backend modules are only imported here
+        from src.backend.supervisor import Supervisor
+        supervisor = Supervisor()
+        supervisor.load_servers()
+        return supervisor
+
+    def _after_load_backend(self, job):
+        if not job.finished_ok:
+            dpg.set_value("loading_text", f"Loading servers failed: {job.error}")
+            return
+        self.supervisor = job.result
+        for name in self.supervisor.names():
+            self.add_fleet_row(name)
+        self.select_server(self.supervisor.names()[0])
+        self.setup_scheduler()
+        dpg.hide_item("loading_text")
+        dpg.show_item("Content")
+        self.jobs.submit("startup", "Watch server folders", self.start_watcher)
+
+    def select_server(self, name):
+        self.current_server = name
+        self.server_manager = self.supervisor.get(name)
+        self.server_dir = self.server_manager.server_dir
+        self.config_manager = self.supervisor.configs[name]
+        self.player_manager = self.supervisor.players[name]
+
+        dpg.set_value("selected_server_text", name)
+        self.console_view.set_buffer(self.server_manager.console_buffer)
+        if self.scheduler:
+            self.scheduler.invalidate()
+        self.update_performance()
+        # The previous server's values are cleared right away; the files are
+        # read by a job and shown when it finishes
+        self.properties_view.load({}, reset=True)
+        self.show_players([], [], [], [], 0)
+        self.run_job("Load config and players", self.read_server_data, self.config_manager, self.player_manager,
+                     self.properties_file, on_done=lambda job: self._after_read_server_data(job, name))
+
+    def read_server_data(self, config_manager, player_manager, filename):
+        # Job thread: parses the files so the refreshes below hit the caches
+        files = config_manager.files() or [PROPERTIES_FILE]
+        config_manager.document(filename if filename in files else files[0])
+        return self.read_players(player_manager)
+
+    def read_players(self, player_manager):
+        return (player_manager.get_whitelist(), player_manager.get_banned_players(), player_manager.get_ops(),
+                player_manager.get_banned_ips(IP_LIST_LIMIT), len(player_manager.banned_ips))
+
+    def _after_read_server_data(self, job, name):
+        if name != self.current_server:
+            return
+        if not job.finished_ok:
+            dpg.set_value("properties_status", f"Load failed: {job.error}")
+            return
+        self.refresh_properties(reset=True)
+        self.show_players(*job.result)
+
     def setup_font(self):
         # Try to load a system font for a better look
         font_path = "C:/Windows/Fonts/segoeui.ttf"
@@ -85,12 +164,31 @@ class App:
                     dpg.add_button(label="Console", width=-1, callback=lambda: self.show_tab("Console"))
                     dpg.add_button(label="Properties", width=-1, callback=lambda: self.show_tab("Properties"))
                     dpg.add_button(label="Players", width=-1, callback=lambda: self.show_tab("Players"))
+                    dpg.add_spacer(height=20)
+                    dpg.add_text("Jobs")
+                    dpg.add_separator()
+                    dpg.add_text("", tag="jobs_text", wrap=180)
                 
-                # Main Content Area
-                with dpg.child_window(tag="Content", border=False):
+                # Main Content Area, shown once the servers are loaded
+                dpg.add_text("Loading servers...", tag="loading_text")
+                with dpg.child_window(tag="Content", border=False, show=False):
                     # Dashboard Tab
                     with dpg.group(tag="Dashboard_Group"):
-                        dpg.add_text("Server Status")
+                        dpg.add_text("Fleet")
+                        with dpg.group(horizontal=True):
+                            dpg.add_button(label="Start All", callback=self.start_all)
+                            dpg.add_button(label="Stop All", callback=self.stop_all)
+                        with dpg.table(tag="fleet_table", header_row=True, height=150, scrollY=True,
+                                       borders_innerH=True, borders_outerH=True):
+                            dpg.add_table_column(label="Server")
+                            dpg.add_table_column(label="Status")
+                            dpg.add_table_column(label="Lines")
+                            dpg.add_table_column(label="")
+                        dpg.add_separator()
+
+                        with dpg.group(horizontal=True):
+                            dpg.add_text("Server Status:")
+                            dpg.add_text("", tag="selected_server_text")
                         dpg.add_text("Offline", tag="status_text", color=(255, 0, 0))
                         dpg.add_separator()
                         
@@ -98,37 +196,57 @@ class App:
                             dpg.add_button(label="Start Server", tag="btn_start", callback=self.start_server, width=100, height=50)
                             dpg.add_button(label="Stop Server", tag="btn_stop", callback=self.stop_server, width=100, height=50, show=False)
                             dpg.add_button(label="Kill Server", tag="btn_kill", callback=self.kill_server, width=100, height=50, show=False)
+                            dpg.add_button(label="Back Up", callback=self.backup_server, width=100, height=50)
+                        dpg.add_text("", tag="backup_text")
                         
                         dpg.add_spacer(height=20)
-                        dpg.add_text("Performance")
+                        with dpg.group(horizontal=True):
+                            dpg.add_text("Performance")
+                            dpg.add_combo(list(PERF_RANGES), default_value=self.perf_range, width=150,
+                                          callback=self.set_perf_range)
+                        dpg.add_text("", tag="telemetry_text")
+                        dpg.add_text("", tag="alerts_text", color=(255, 200, 0))
                         with dpg.plot(label="CPU Usage", height=200, width=-1):
                             dpg.add_plot_legend()
-                            dpg.add_plot_axis(dpg.mvXAxis, label="Time", no_tick_labels=True, tag="cpu_x_axis")
+                            dpg.add_plot_axis(dpg.mvXAxis, label="Seconds ago", tag="cpu_x_axis")
                             with dpg.plot_axis(dpg.mvYAxis, label="%", tag="cpu_y_axis"):
                                 dpg.set_axis_limits(dpg.last_item(), 0, 100)
                                 dpg.add_line_series([], [], label="CPU", tag="cpu_series")
                                 
                         with dpg.plot(label="RAM Usage (MB)", height=200, width=-1):
                             dpg.add_plot_legend()
-                            dpg.add_plot_axis(dpg.mvXAxis, label="Time", no_tick_labels=True, tag="ram_x_axis")
+                            dpg.add_plot_axis(dpg.mvXAxis, label="Seconds ago", tag="ram_x_axis")
                             with dpg.plot_axis(dpg.mvYAxis, label="MB", tag="ram_y_axis"):
                                 dpg.add_line_series([], [], label="RAM", tag="ram_series")
 
                     # Console Tab
                     with dpg.group(tag="Console_Group", show=False):
                         dpg.add_text("Server Console")
-                        dpg.add_input_text(multiline=True, readonly=True, tag="console_output", width=-1, height=-50)
+                        # Shows an empty buffer until a server is selected
+                        self.console_view = ConsoleView(ConsoleBuffer(1), parent="Console_Group", height=-230)
                         with dpg.group(horizontal=True):
                             dpg.add_input_text(tag="console_input", width=-100, on_enter=True, callback=self.send_console_command)
                             dpg.add_button(label="Send", width=90, callback=self.send_console_command)
+                        # Search the on-disk console archive
+                        with dpg.group(horizontal=True):
+                            dpg.add_input_text(tag="console_search", hint="Search history", width=-260, on_enter=True,
+                                               callback=self.search_console)
+                            dpg.add_combo(list(SEARCH_RANGES), default_value="Last hour", width=150,
+                                          tag="console_search_range")
+                            dpg.add_button(label="Search", width=90, callback=self.search_console)
+                        with dpg.child_window(height=-1, tag="console_search_results"):
+                            dpg.add_text("", tag="console_search_text")
 
                     # Properties Tab
                     with dpg.group(tag="Properties_Group", show=False):
-                        dpg.add_text("Server Properties")
-                        dpg.add_button(label="Save Changes", callback=self.save_properties)
+                        with dpg.group(horizontal=True):
+                            dpg.add_text("Config file")
+                            dpg.add_combo([PROPERTIES_FILE], default_value=PROPERTIES_FILE, width=200,
+                                          tag="properties_file", callback=self.select_properties_file)
+                            dpg.add_button(label="Save Changes", callback=self.save_properties)
+                            dpg.add_text("", tag="properties_status")
                         dpg.add_separator()
-                        with dpg.child_window(tag="Properties_List", border=False):
-                            pass # Will be populated dynamically
+                        self.properties_view = PropertiesView(parent="Properties_Group")
 
                     # Players Tab
                     with dpg.group(tag="Players_Group", show=False):
@@ -139,6 +257,10 @@ class App:
                                 dpg.add_separator()
                                 dpg.add_listbox(tag="whitelist_list", width=-1, num_items=10)
                                 dpg.add_button(label="Remove Selected", callback=self.remove_whitelist)
+                                dpg.add_separator()
+                                dpg.add_input_text(label="Names file (.txt/.csv) or server folder", tag="whitelist_import_path")
+                                dpg.add_button(label="Import", callback=lambda: self.import_players("whitelist"))
+                                dpg.add_text("", tag="whitelist_import_result")
                             
                             with dpg.tab(label="Bans"):
                                 dpg.add_input_text(label="Username", tag="ban_input")
@@ -147,28 +269,72 @@ class App:
                                 dpg.add_separator()
                                 dpg.add_listbox(tag="ban_list", width=-1, num_items=10)
                                 dpg.add_button(label="Unban Selected", callback=self.unban_player)
+                                dpg.add_separator()
+                                dpg.add_input_text(label="Names file (.txt/.csv) or server folder", tag="bans_import_path")
+                                dpg.add_button(label="Import", callback=lambda: self.import_players("bans"))
+                                dpg.add_text("", tag="bans_import_result")
+
+                            with dpg.tab(label="IP Bans"):
+                                dpg.add_input_text(label="Address, CIDR range or first-last", tag="ip_ban_input")
+                                dpg.add_input_text(label="Reason", tag="ip_ban_reason", default_value="Banned by operator")
+                                dpg.add_button(label="Ban Address", callback=self.ban_ip)
+                                dpg.add_separator()
+                                dpg.add_text("", tag="ip_ban_count")
+                                dpg.add_listbox(tag="ip_ban_list", width=-1, num_items=10)
+                                dpg.add_button(label="Unban Selected", callback=self.unban_ip)
+                                dpg.add_separator()
+                                dpg.add_input_text(label="Check address", tag="ip_check_input")
+                                dpg.add_button(label="Check", callback=self.check_ip)
+                                dpg.add_text("", tag="ip_check_result")
+                                dpg.add_separator()
+                                dpg.add_input_text(label="Blocklist file (one address or range per line)", tag="ip_bans_import_path")
+                                dpg.add_button(label="Import", callback=self.import_ip_blocklist)
+                                dpg.add_text("", tag="ip_bans_import_result")
+
+                            with dpg.tab(label="Operators"):
+                                dpg.add_input_text(label="Username", tag="op_input")
+                                dpg.add_slider_int(label="Level", tag="op_level", default_value=4, min_value=1, max_value=4)
+                                dpg.add_button(label="Make Operator", callback=self.op_player)
+                                dpg.add_separator()
+                                dpg.add_listbox(tag="ops_list", width=-1, num_items=10)
+                                dpg.add_button(label="Remove Selected", callback=self.deop_player)
+                                dpg.add_separator()
+                                dpg.add_input_text(label="Names file (.txt/.csv) or server folder", tag="ops_import_path")
+                                dpg.add_button(label="Import", callback=lambda: self.import_players("ops"))
+                                dpg.add_text("", tag="ops_import_result")
 
         dpg.setup_dearpygui()
         dpg.show_viewport()
         dpg.set_primary_window("Primary Window", True)
 
-        # Initial Data Load
-        self.refresh_properties()
-        self.refresh_players()
+    def run(self):
+        # The first frame is drawn before any server data is touched
+        dpg.render_dearpygui_frame()
+        loading = self.jobs.submit("startup", "Load servers", self.load_backend, on_done=self._after_load_backend)
 
-        # Start update loop
-        self.cpu_data_x = []
-        self.cpu_data_y = []
-        self.ram_data_x = []
-        self.ram_data_y = []
-        self.tick_count = 0
-        
         while dpg.is_dearpygui_running():
             self.update_loop()
             dpg.render_dearpygui_frame()
 
+        if self.scheduler:
+            self.scheduler.stop()
+        self.jobs.shutdown()
+        # After the jobs, since a job starts the watcher
+        if self.watcher:
+            self.watcher.stop()
+        # Closed while still loading: the backend exists but was never handed over
+        supervisor = self.supervisor or (loading.result if loading.finished_ok else None)
+        if supervisor:
+            supervisor.shutdown()
         dpg.destroy_context()
 
+    def add_fleet_row(self, name):
+        with dpg.table_row(parent="fleet_table"):
+            dpg.add_text(name)
+            dpg.add_text("Offline", tag=f"fleet_status_{name}", color=(255, 0, 0))
+            dpg.add_text("0", tag=f"fleet_lines_{name}")
+            dpg.add_button(label="Select", user_data=name, callback=lambda s, a, u: self.select_server(u))
+
     def show_tab(self, tab_name):
         dpg.hide_item("Dashboard_Group")
         dpg.hide_item("Console_Group")
@@ -177,69 +343,202 @@ class App:
         
         dpg.show_item(f"{tab_name}_Group")
 
-    def update_loop(self):
-        # Update Status
-        status = self.server_manager.get_status()
+    def setup_scheduler(self):
+        # Backend polls run on wall-clock intervals off the render thread;
+        # update_loop only applies what changed
+        self.scheduler = UpdateScheduler()
+        self.scheduler.every(0.05, "output", self.supervisor.pump_all)
+        self.scheduler.every(0.25, "status", lambda: self.server_manager.get_status())
+        self.scheduler.every(0.5, "fleet", self.read_fleet)
+        self.scheduler.every(PERF_SAMPLE_INTERVAL, "perf", self.supervisor.sample_metrics)
+        self.scheduler.every(self.supervisor.telemetry_interval, "telemetry",
+                             lambda: self.supervisor.telemetry[self.current_server].sample())
+        self.scheduler.every(0.5, "alerts", lambda: self.supervisor.events[self.current_server].seq)
+        self.scheduler.start()
+
+    def start_watcher(self):
+        # Job thread (this imports watchdog). File changes made by the server
+        # or other tools reach the UI as events.
+        watcher = ServerDirWatcher(
+            lambda name, files: self.scheduler.publish("files", (name, files), coalesce=False)
+        )
+        for name, manager in self.supervisor.servers.items():
+            if os.path.isdir(manager.server_dir):
+                watcher.watch(name, manager.server_dir)
+        watcher.start()
+        self.watcher = watcher
+
+    def set_perf_range(self, sender, value):
+        self.perf_range = value
+        self.update_performance()
+
+    def read_fleet(self):
+        return tuple((e["name"], e["status"], e["lines"]) for e in self.supervisor.get_fleet_status())
+
+    def update_fleet(self, fleet):
+        # Only touch rows whose values changed
+        for name, status, lines in fleet:
+            if self.fleet_status.get(name) == (status, lines):
+                continue
+            self.fleet_status[name] = (status, lines)
+            dpg.set_value(f"fleet_status_{name}", status)
+            dpg.configure_item(f"fleet_status_{name}", color=STATUS_COLORS.get(status, (255, 0, 0)))
+            dpg.set_value(f"fleet_lines_{name}", str(lines))
+
+    def update_status(self, status):
         dpg.set_value("status_text", status)
         if status == "Online":
             dpg.configure_item("status_text", color=(0, 255, 0))
             dpg.hide_item("btn_start")
             dpg.show_item("btn_stop")
             dpg.show_item("btn_kill")
+        elif status in ("Stopping", "Saving"):
+            # Shutdown in progress; only killing makes sense now
+            dpg.configure_item("status_text", color=(255, 200, 0))
+            dpg.hide_item("btn_start")
+            dpg.hide_item("btn_stop")
+            dpg.show_item("btn_kill")
         else:
             dpg.configure_item("status_text", color=(255, 0, 0))
             dpg.show_item("btn_start")
             dpg.hide_item("btn_stop")
             dpg.hide_item("btn_kill")
 
-        # Update Console
-        new_lines = self.server_manager.get_console_output()
-        if new_lines:
-            current_text = dpg.get_value("console_output")
-            for line in new_lines:
-                current_text += line + "\n"
-            # Keep only last 1000 lines to prevent lag
-            lines = current_text.split('\n')
-            if len(lines) > 1000:
-                current_text = '\n'.join(lines[-1000:])
-            dpg.set_value("console_output", current_text)
-            
-            # Auto scroll? DPG doesn't have easy auto-scroll for input_text, 
-            # but we can try to set y_scroll if we used a child window.
-            # For now, input_text is okay.
-
-        # Update Performance
-        if self.tick_count % 10 == 0: # Every ~10 frames
-            stats = self.server_manager.get_performance_stats()
-            self.cpu_data_y.append(stats['cpu'])
-            self.ram_data_y.append(stats['ram'])
-            self.cpu_data_x.append(self.tick_count)
-            self.ram_data_x.append(self.tick_count)
-            
-            if len(self.cpu_data_x) > 100:
-                self.cpu_data_x.pop(0)
-                self.cpu_data_y.pop(0)
-                self.ram_data_x.pop(0)
-                self.ram_data_y.pop(0)
-                
-            dpg.set_value("cpu_series", [self.cpu_data_x, self.cpu_data_y])
-            dpg.set_value("ram_series", [self.ram_data_x, self.ram_data_y])
-            
-            # Auto-fit axes
-            dpg.fit_axis_data("cpu_x_axis")
-            dpg.fit_axis_data("ram_x_axis")
-            dpg.fit_axis_data("ram_y_axis")
+    def update_performance(self):
+        # Plots show a time range queried from the metrics store, as seconds
+        # relative to now
+        now = time.time()
+        store = self.supervisor.metrics[self.current_server]
+        start = now - PERF_RANGES[self.perf_range]
+        ts, _, cpu, _ = store.query("cpu", start, now)
+        ram_ts, _, ram, _ = store.query("ram", start, now)
+        dpg.set_value("cpu_series", [[t - now for t in ts], cpu])
+        dpg.set_value("ram_series", [[t - now for t in ram_ts], ram])
 
-        self.tick_count += 1
+        # Auto-fit axes
+        dpg.fit_axis_data("cpu_x_axis")
+        dpg.fit_axis_data("ram_x_axis")
+        dpg.fit_axis_data("ram_y_axis")
+
+    def update_telemetry(self, snapshot):
+        parts = []
+        proc = snapshot["process"]
+        if proc:
+            parts.append(f"Threads: {proc['num_threads']}")
+            if proc["open_fds"] is not None:
+                parts.append(f"Open files: {proc['open_fds']}")
+            if proc["io"]:
+                parts.append(f"Disk R/W: {proc['io']['read_bytes'] / 1048576:.0f}/{proc['io']['write_bytes'] / 1048576:.0f} MB")
+        logs = snapshot["logs"]
+        if logs["tps"]:
+            parts.append(f"TPS: {logs['tps']['1m']:.1f}")
+        if logs["lag_warnings"]:
+            parts.append(f"Lag warnings: {logs['lag_warnings']} ({logs['ticks_behind']} ticks)")
+        if logs["gc_pauses"]:
+            parts.append(f"GC pauses: {logs['gc_pauses']} (max {logs['gc_max_pause_ms']:.0f} ms)")
+        dpg.set_value("telemetry_text", "   ".join(parts))
+
+    def update_alerts(self):
+        from src.backend.log_patterns import ALERT_SEVERITIES
+        events, _ = self.supervisor.events[self.current_server].recent(0, ALERT_SEVERITIES)
+        lines = []
+        for event in events[-ALERT_LIST_SIZE:]:
+            details = ", ".join(f"{k}={v}" for k, v in event.fields.items())
+            lines.append(f"{time.strftime('%H:%M:%S', time.localtime(event.time))} {event.event}"
+                         + (f" ({details})" if details else ""))
+        dpg.set_value("alerts_text", "\n".join(lines))
+
+    def apply_file_changes(self, events):
+        # Only the managers whose files changed are reloaded, on job threads,
+        # and only the selected server's widgets are rebuilt once they finish
+        for name, files in events:
+            if name not in self.supervisor.configs:
+                continue
+            if files & CONFIG_FILES:
+                self.jobs.submit(name, f"{name}: Reload config", self.reload_config, self.supervisor.configs[name],
+                                 on_done=lambda job, name=name: self._after_reload_config(job, name))
+            if files & PLAYER_FILES and name == self.current_server:
+                self.jobs.submit(name, f"{name}: Reload players", self.read_players, self.supervisor.players[name],
+                                 on_done=lambda job, name=name: self._after_reload_players(job, name))
+
+    def reload_config(self, config_manager):
+        # Job thread: re-reads the changed files so the refresh below hits the caches
+        config_manager.load_config()
+        for filename in config_manager.files():
+            config_manager.document(filename)
+
+    def _after_reload_config(self, job, name):
+        if job.finished_ok and name == self.current_server:
+            self.refresh_properties()
+
+    def _after_reload_players(self, job, name):
+        if job.finished_ok and name == self.current_server:
+            self.show_players(*job.result)
+
+    def update_loop(self):
+        # Nothing is polled until the backend has loaded
+        changes = self.scheduler.take_changes() if self.scheduler else {}
+        if "status" in changes:
+            self.update_status(changes["status"])
+        if "fleet" in changes:
+            self.update_fleet(changes["fleet"])
+        if "perf" in changes:
+            self.update_performance()
+        if "telemetry" in changes:
+            self.update_telemetry(changes["telemetry"])
+        if "alerts" in changes:
+            self.update_alerts()
+        if "files" in changes:
+            self.apply_file_changes(changes["files"])
+
+        # Results of finished backend jobs are applied here, on the UI thread
+        self.jobs.run_callbacks()
+        self.update_jobs()
+
+        # Update Console (only redraws when new lines arrived or the view scrolled)
+        self.console_view.update()
+        self.properties_view.update()
+
+    def run_job(self, label, fn, *args, on_done=None, **kwargs):
+        # Blocking backend work goes to the job executor, serialized per server;
+        # on_done(job) runs back on the render thread
+        return self.jobs.submit(self.current_server, f"{self.current_server}: {label}", fn, *args,
+                                on_done=on_done, **kwargs)
 
     def start_server(self):
-        self.server_manager.start_server()
+        self.run_job("Start server", self.server_manager.start_server)
+
+    def start_all(self):
+        # One job per server under its own key, so these queue behind (and
+        # never overlap) that server's other jobs
+        for name, manager in self.supervisor.servers.items():
+            self.jobs.submit(name, f"{name}: Start server", manager.start_server, on_done=self._after_fleet_job)
+
+    def stop_all(self):
+        for name, manager in self.supervisor.servers.items():
+            self.jobs.submit(name, f"{name}: Stop server", manager.stop_server, on_done=self._after_fleet_job)
+
+    def _after_fleet_job(self, job):
+        self.update_fleet(self.read_fleet())
 
     def stop_server(self):
-        self.server_manager.stop_server()
+        self.run_job("Stop server", self.server_manager.stop_server)
 
     def kill_server(self):
-        self.server_manager.kill_server()
+        self.run_job("Kill server", self.server_manager.kill_server)
+
+    def backup_server(self):
+        backups = self.supervisor.backups[self.current_server]
+        self.run_job("Back up worlds", backups.backup, on_done=self._after_backup)
+        dpg.set_value("backup_text", "Backing up...")
+
+    def _after_backup(self, job):
+        if not job.finished_ok:
+            dpg.set_value("backup_text", f"Backup failed: {job.error}")
+            return
+        result = job.result
+        dpg.set_value("backup_text", f"Backup {result['id']}: {result['changed_files']} of {result['files']} files "
+                                     f"changed, {result['stored_bytes'] / 1048576:.1f} MB added")
 
     def send_console_command(self):
         cmd = dpg.get_value("console_input")
@@ -247,83 +546,220 @@ class App:
             self.server_manager.send_command(cmd)
             dpg.set_value("console_input", "")
 
-    def refresh_properties(self):
-        dpg.delete_item("Properties_List", children_only=True)
-        props = self.config_manager.load_config()
-        
-        # Sort keys
-        sorted_keys = sorted(props.keys())
-        
-        for key in sorted_keys:
-            val = props[key]
-            with dpg.group(horizontal=True, parent="Properties_List"):
-                dpg.add_text(f"{key}:")
-                # Determine type? For now just text input
-                if val.lower() in ['true', 'false']:
-                    dpg.add_checkbox(default_value=val.lower() == 'true', tag=f"prop_{key}")
-                elif val.isdigit():
-                    dpg.add_input_int(default_value=int(val), width=200, tag=f"prop_{key}")
-                else:
-                    dpg.add_input_text(default_value=val, width=200, tag=f"prop_{key}")
+    def search_console(self):
+        archive = self.supervisor.archives.get(self.current_server)
+        if archive is None:
+            dpg.set_value("console_search_text", "Console archive is disabled.")
+            return
+        text = dpg.get_value("console_search").strip()
+        start = time.time() - SEARCH_RANGES[dpg.get_value("console_search_range")]
+        self.run_job(f"Search console for '{text}'", archive.search, start, None, text or None, limit=SEARCH_LIMIT,
+                     on_done=self._after_search)
+        dpg.set_value("console_search_text", "Searching...")
+
+    def _after_search(self, job):
+        if not job.finished_ok:
+            dpg.set_value("console_search_text", f"Search failed: {job.error}")
+            return
+        lines = [f"{time.strftime('%m-%d %H:%M:%S', time.localtime(ts))}  {line}" for ts, line in job.result]
+        if len(lines) >= SEARCH_LIMIT:
+            lines.append(f"(first {SEARCH_LIMIT} matches)")
+        dpg.set_value("console_search_text", "\n".join(lines) or "No matches.")
+
+    def update_jobs(self):
+        if self.jobs.generation == self.jobs_drawn:
+            return
+        self.jobs_drawn = self.jobs.generation
+        lines = []
+        for job in reversed(self.jobs.jobs()[-JOB_LIST_SIZE:]):
+            state = job.state
+            if job.state == JOB_FAILED:
+                state = f"failed: {job.error}"
+            elif job.finished:
+                state = f"{job.state} ({job.finished - job.started:.1f}s)"
+            lines.append(f"{job.label}\n  {state}")
+        dpg.set_value("jobs_text", "\n".join(lines))
+
+    def select_properties_file(self, sender, value):
+        self.properties_file = value
+        self.refresh_properties(reset=True)
+
+    def refresh_properties(self, reset=False):
+        # The document is cached per file, so this only re-parses after a
+        # change on disk; the view then updates just the keys that differ
+        files = self.config_manager.files() or [PROPERTIES_FILE]
+        if self.properties_file not in files:
+            self.properties_file = files[0]
+            reset = True
+        dpg.configure_item("properties_file", items=files)
+        dpg.set_value("properties_file", self.properties_file)
+        document = self.config_manager.document(self.properties_file)
+        self.properties_view.load(dict(document.items()), reset)
+        dirty = len(self.properties_view.model.edits)
+        dpg.set_value("properties_status", f"{dirty} unsaved" if dirty else "")
 
     def save_properties(self):
-        props = self.config_manager.load_config() # Get current keys
-        new_props = {}
-        for key in props:
-            # Check if tag exists (it should)
-            tag = f"prop_{key}"
-            if dpg.does_item_exist(tag):
-                val = dpg.get_value(tag)
-                new_props[key] = str(val).lower() if isinstance(val, bool) else str(val)
-        
-        self.config_manager.save_config(new_props)
-        # Show notification?
+        # Only the fields that were edited are sent
+        changes = self.properties_view.model.dirty()
+        if not changes:
+            dpg.set_value("properties_status", "No changes")
+            return
+        filename = self.properties_file
+        if filename == PROPERTIES_FILE:
+            fn, args = self.config_manager.save_config, (changes,)
+        else:
+            fn, args = self.config_manager.save_file, (filename, changes)
+        self.run_job(f"Save {filename}", fn, *args, on_done=lambda job: self._after_save_properties(job, filename, changes))
+
+    def _after_save_properties(self, job, filename, changes):
+        if not job.finished_ok:
+            dpg.set_value("properties_status", f"Save failed: {job.error}")
+            return
+        if filename == self.properties_file:
+            self.properties_view.model.commit(changes)
+            self.refresh_properties()
+            dpg.set_value("properties_status", f"Saved {len(job.result)} change(s)")
 
     def refresh_players(self):
+        self.show_players(*self.read_players(self.player_manager))
+
+    def show_players(self, whitelist, bans, ops, ip_bans, ip_ban_count):
         # Whitelist
-        whitelist = self.player_manager.get_whitelist()
         names = [p['name'] for p in whitelist]
         dpg.configure_item("whitelist_list", items=names)
         
         # Bans
-        bans = self.player_manager.get_banned_players()
         ban_names = [f"{p['name']} ({p.get('reason', 'No reason')})" for p in bans]
         dpg.configure_item("ban_list", items=ban_names)
 
+        # Operators
+        dpg.configure_item("ops_list", items=[f"{p['name']} (level {p.get('level', 4)})" for p in ops])
+
+        # IP bans
+        dpg.configure_item("ip_ban_list", items=[f"{p['ip']} ({p.get('reason', 'No reason')})" for p in ip_bans])
+        shown = f", showing the first {len(ip_bans)}" if len(ip_bans) < ip_ban_count else ""
+        dpg.set_value("ip_ban_count", f"{ip_ban_count} banned address(es) and range(s){shown}")
+
+    def _after_player_job(self, job, input_tag=None):
+        if job.finished_ok:
+            success, msg = job.result
+            if success and input_tag:
+                dpg.set_value(input_tag, "")
+        self.refresh_players()
+
     def add_whitelist(self):
         name = dpg.get_value("whitelist_input")
         if name:
-            success, msg = self.player_manager.add_to_whitelist(name)
-            if success:
-                dpg.set_value("whitelist_input", "")
-                self.refresh_players()
-            else:
-                print(msg) # TODO: Show in UI
+            self.run_job(f"Whitelist {name}", self.player_manager.add_to_whitelist, name,
+                         on_done=lambda job: self._after_player_job(job, "whitelist_input"))
 
     def remove_whitelist(self):
         selected = dpg.get_value("whitelist_list")
         if selected:
-            success, msg = self.player_manager.remove_from_whitelist(selected)
-            if success:
-                self.refresh_players()
+            self.run_job(f"Remove {selected} from whitelist", self.player_manager.remove_from_whitelist, selected,
+                         on_done=self._after_player_job)
 
     def ban_player(self):
         name = dpg.get_value("ban_input")
         reason = dpg.get_value("ban_reason")
         if name:
-            success, msg = self.player_manager.ban_player(name, reason)
-            if success:
-                dpg.set_value("ban_input", "")
-                self.refresh_players()
+            self.run_job(f"Ban {name}", self.player_manager.ban_player, name, reason,
+                         on_done=lambda job: self._after_player_job(job, "ban_input"))
 
     def unban_player(self):
         selected = dpg.get_value("ban_list")
         if selected:
             # Extract name from "Name (Reason)"
             name = selected.split(' (')[0]
-            success, msg = self.player_manager.unban_player(name)
-            if success:
-                self.refresh_players()
+            self.run_job(f"Unban {name}", self.player_manager.unban_player, name,
+                         on_done=self._after_player_job)
+
+    def op_player(self):
+        name = dpg.get_value("op_input")
+        level = dpg.get_value("op_level")
+        if name:
+            self.run_job(f"Op {name}", self.player_manager.op_player, name, level,
+                         on_done=lambda job: self._after_player_job(job, "op_input"))
+
+    def deop_player(self):
+        selected = dpg.get_value("ops_list")
+        if selected:
+            # Extract name from "Name (level N)"
+            name = selected.split(' (')[0]
+            self.run_job(f"Deop {name}", self.player_manager.deop_player, name,
+                         on_done=self._after_player_job)
+
+    def ban_ip(self):
+        address = dpg.get_value("ip_ban_input").strip()
+        reason = dpg.get_value("ip_ban_reason")
+        if address:
+            self.run_job(f"Ban {address}", self.player_manager.ban_ip, address, reason,
+                         on_done=lambda job: self._after_ip_job(job, "ip_ban_input"))
+
+    def unban_ip(self):
+        selected = dpg.get_value("ip_ban_list")
+        if selected:
+            address = selected.split(' (')[0]
+            self.run_job(f"Unban {address}", self.player_manager.unban_ip, address,
+                         on_done=self._after_ip_job)
+
+    def _after_ip_job(self, job, input_tag=None):
+        # Same as _after_player_job, but invalid addresses are reported
+        if job.finished_ok and not job.result[0]:
+            dpg.set_value("ip_check_result", job.result[1])
+        self._after_player_job(job, input_tag)
+
+    def check_ip(self):
+        address = dpg.get_value("ip_check_input").strip()
+        if address:
+            # A job: the first lookup after a change may re-read or re-index the list
+            self.run_job(f"Check {address}", self.player_manager.is_ip_banned, address,
+                         on_done=lambda job: self._after_check_ip(job, address))
+
+    def _after_check_ip(self, job, address):
+        if not job.finished_ok:
+            dpg.set_value("ip_check_result", str(job.error))
+            return
+        dpg.set_value("ip_check_result", f"{address} is {'banned' if job.result else 'not banned'}")
+
+    def import_ip_blocklist(self):
+        path = dpg.get_value("ip_bans_import_path").strip()
+        if not path:
+            return
+        if not os.path.isfile(path):
+            dpg.set_value("ip_bans_import_result", f"Not found: {path}")
+            return
+        reason = dpg.get_value("ip_ban_reason")
+        self.run_job(f"Import IP bans from {path}", self.player_manager.import_ip_blocklist, path, reason,
+                     on_done=lambda job: self._after_import(job, "ip_bans"))
+        dpg.set_value("ip_bans_import_result", "Importing...")
+
+    def import_players(self, target):
+        path = dpg.get_value(f"{target}_import_path").strip()
+        if not path:
+            return
+        if os.path.isdir(path):
+            self.run_job(f"Import {target} from {path}", self.player_manager.import_from_server, path, target,
+                         on_done=lambda job: self._after_import(job, target))
+        elif os.path.isfile(path):
+            reason = dpg.get_value("ban_reason")
+            self.run_job(f"Import {target} from {path}", self.player_manager.import_file, path, target, reason,
+                         on_done=lambda job: self._after_import(job, target))
+        else:
+            dpg.set_value(f"{target}_import_result", f"Not found: {path}")
+            return
+        dpg.set_value(f"{target}_import_result", "Importing...")
+
+    def _after_import(self, job, target):
+        if not job.finished_ok:
+            dpg.set_value(f"{target}_import_result", f"Import failed: {job.error}")
+            return
+        added, skipped, unresolved = job.result
+        msg = f"Added {added}, already present {skipped}"
+        if unresolved:
+            msg += f", {'invalid' if target == 'ip_bans' else 'unknown'}: {', '.join(unresolved[:10])}" + (" ..." if len(unresolved) > 10 else "")
+        dpg.set_value(f"{target}_import_result", msg)
+        self.refresh_players()
 
 if __name__ == "__main__":
     app = App()
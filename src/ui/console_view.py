@@ -0,0 +1,64 @@
+import dearpygui.dearpygui as dpg
+from src.backend.line_reader import decode_line
+
+
+class ConsoleView:
+    # Virtualized console: a fixed pool of text rows shows a window into the
+    # ConsoleBuffer. Rows are only rewritten when the buffer generation or the
+    # scroll position changes, so frame cost does not depend on scrollback size.
+    def __init__(self, buffer, parent, rows=30, height=-50):
+        self.buffer = buffer
+        self.rows = rows
+        self.offset = 0
+        self.follow = True
+        self._drawn = None
+
+        with dpg.group(horizontal=True, parent=parent):
+            with dpg.child_window(width=-30, height=height, no_scrollbar=True) as self.window:
+                self.row_tags = [dpg.add_text("") for _ in range(rows)]
+            self.scrollbar = dpg.add_slider_int(
+                vertical=True, width=20, height=height, min_value=0, max_value=0,
+                format="", callback=self._on_scrollbar,
+            )
+
+        with dpg.handler_registry():
+            dpg.add_mouse_wheel_handler(callback=self._on_wheel)
+
+    def set_buffer(self, buffer):
+        self.buffer = buffer
+        self.follow = True
+        self._drawn = None
+
+    def _max_offset(self):
+        return max(0, len(self.buffer) - self.rows)
+
+    def _scroll_to(self, offset):
+        max_offset = self._max_offset()
+        self.offset = min(max(0, offset), max_offset)
+        self.follow = self.offset >= max_offset
+
+    def _on_scrollbar(self, sender, value):
+        # Slider is vertical, so the top of the track is its max value
+        self._scroll_to(self._max_offset() - value)
+
+    def _on_wheel(self, sender, delta):
+        if dpg.is_item_hovered(self.window):
+            self._scroll_to(self.offset - int(delta) * 3)
+
+    def update(self):
+        if self.follow:
+            self.offset = self._max_offset()
+
+        state = (self.buffer.generation, self.offset)
+        if state == self._drawn:
+            return
+        self._drawn = state
+
+        lines = self.buffer.window(self.offset, self.rows)
+        for i, tag in enumerate(self.row_tags):
+            # Only the visible rows ever get decoded
+            dpg.set_value(tag, decode_line(lines[i]) if i < len(lines) else "")
+
+        max_offset = self._max_offset()
+        dpg.configure_item(self.scrollbar, max_value=max_offset)
+        dpg.set_value(self.scrollbar, max_offset - self.offset)
@@ -0,0 +1,205 @@
+import dearpygui.dearpygui as dpg
+from src.backend.config_formats import format_scalar
+
+KIND_BOOL = "bool"
+KIND_INT = "int"
+KIND_TEXT = "text"
+
+
+def value_kind(value):
+    if isinstance(value, bool) or (isinstance(value, str) and value.lower() in ("true", "false")):
+        return KIND_BOOL
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        return KIND_INT
+    return KIND_TEXT
+
+
+def widget_value(kind, value):
+    if kind == KIND_BOOL:
+        return value if isinstance(value, bool) else value.lower() == "true"
+    if kind == KIND_INT:
+        return int(value)
+    return value if isinstance(value, str) else format_scalar(value)
+
+
+class PropertiesModel:
+    # The keys and values of one config document plus the user's unsaved
+    # edits. load() diffs a freshly read document against what is held, so
+    # only keys that really changed bump the generation; the sorted key list
+    # and the filter are only recomputed when the set of keys changes.
+    def __init__(self):
+        self.values = {}
+        self.edits = {}
+        self.filter = ""
+        self.keys = []
+        self.visible = []
+        self._lower = {}
+        self.generation = 0
+
+    def load(self, values, reset=False):
+        # Returns the keys whose on-disk value changed
+        values = dict(values)
+        if reset:
+            self.edits = {}
+        changed = [k for k, v in values.items() if k not in self.values or self.values[k] != v]
+        removed = [k for k in self.values if k not in values]
+        if not changed and not removed and not reset:
+            return []
+        keys_changed = reset or removed or any(k not in self.values for k in changed)
+        self.values = values
+        for key in removed:
+            self.edits.pop(key, None)
+        # An edit that now matches the file is no longer dirty
+        for key in changed:
+            if key in self.edits and self.edits[key] == values[key]:
+                del self.edits[key]
+        if keys_changed:
+            self.keys = sorted(values)
+            self._lower = {key: key.lower() for key in self.keys}
+            self._apply_filter()
+        self.generation += 1
+        return changed + removed
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text != self.filter:
+            self.filter = text
+            self._apply_filter()
+            self.generation += 1
+
+    def _apply_filter(self):
+        if self.filter:
+            self.visible = [key for key in self.keys if self.filter in self._lower[key]]
+        else:
+            self.visible = self.keys
+
+    def value(self, key):
+        return self.edits.get(key, self.values.get(key))
+
+    def edit(self, key, value):
+        original = self.values.get(key)
+        if value == original or widget_value(value_kind(original), original) == value:
+            self.edits.pop(key, None)
+        else:
+            self.edits[key] = value
+        self.generation += 1
+
+    def is_dirty(self, key):
+        return key in self.edits
+
+    def dirty(self):
+        return dict(self.edits)
+
+    def commit(self, saved):
+        # Drop edits that were written (unless edited again meanwhile)
+        for key, value in saved.items():
+            if self.edits.get(key) == value:
+                del self.edits[key]
+        self.generation += 1
+
+
+class PropertiesView:
+    # Virtualized editor for a PropertiesModel: a fixed pool of rows shows a
+    # window into the (filtered) key list. Each row holds one widget of each
+    # kind and shows the one matching its value; a widget is only written
+    # when its key or value changed and never while the user is typing in it.
+    def __init__(self, parent, rows=25, height=-1):
+        self.model = PropertiesModel()
+        self.rows = rows
+        self.offset = 0
+        self._drawn = None
+        self._row_state = [None] * rows
+        self.row_keys = [None] * rows
+
+        self.filter_input = dpg.add_input_text(parent=parent, hint="Filter keys", width=300,
+                                               callback=lambda s, v: self._on_filter(v))
+        with dpg.group(horizontal=True, parent=parent):
+            with dpg.child_window(width=-30, height=height, no_scrollbar=True) as self.window:
+                self.row_widgets = [self._add_row(i) for i in range(rows)]
+            self.scrollbar = dpg.add_slider_int(
+                vertical=True, width=20, height=height, min_value=0, max_value=0,
+                format="", callback=self._on_scrollbar,
+            )
+
+        with dpg.handler_registry():
+            dpg.add_mouse_wheel_handler(callback=self._on_wheel)
+
+    def _add_row(self, index):
+        with dpg.group(horizontal=True, show=False) as group:
+            marker = dpg.add_text(" ", color=(255, 200, 0))
+            label = dpg.add_text("")
+            widgets = {
+                KIND_BOOL: dpg.add_checkbox(show=False, user_data=index, callback=self._on_edit),
+                KIND_INT: dpg.add_input_int(width=200, show=False, user_data=index, callback=self._on_edit),
+                KIND_TEXT: dpg.add_input_text(width=300, show=False, user_data=index, callback=self._on_edit),
+            }
+        return {"group": group, "marker": marker, "label": label, "widgets": widgets}
+
+    def load(self, values, reset=False):
+        if reset:
+            self.offset = 0
+        self.model.load(values, reset)
+
+    def _on_filter(self, text):
+        self.model.set_filter(text)
+        self.offset = 0
+
+    def _on_edit(self, sender, value, index):
+        key = self.row_keys[index]
+        if key is not None:
+            self.model.edit(key, value)
+
+    def _max_offset(self):
+        return max(0, len(self.model.visible) - self.rows)
+
+    def _on_scrollbar(self, sender, value):
+        self.offset = min(max(0, self._max_offset() - value), self._max_offset())
+
+    def _on_wheel(self, sender, delta):
+        if dpg.is_item_hovered(self.window):
+            self.offset = min(max(0, self.offset - int(delta) * 3), self._max_offset())
+
+    def update(self):
+        self.offset = min(self.offset, self._max_offset())
+        state = (self.model.generation, self.offset)
+        if state == self._drawn:
+            return
+        self._drawn = state
+
+        visible = self.model.visible
+        for i, row in enumerate(self.row_widgets):
+            pos = self.offset + i
+            key = visible[pos] if pos < len(visible) else None
+            self.row_keys[i] = key
+            if key is None:
+                if self._row_state[i] is not None:
+                    dpg.hide_item(row["group"])
+                    self._row_state[i] = None
+                continue
+            value = self.model.value(key)
+            kind = value_kind(self.model.values.get(key, value))
+            dirty = self.model.is_dirty(key)
+            new_state = (key, kind, value, dirty)
+            old_state = self._row_state[i]
+            if new_state == old_state:
+                continue
+            self._row_state[i] = new_state
+            if old_state is None:
+                dpg.show_item(row["group"])
+            if old_state is None or old_state[0] != key:
+                dpg.set_value(row["label"], f"{key}:")
+            if old_state is None or old_state[1] != kind:
+                for widget_kind, widget in row["widgets"].items():
+                    dpg.configure_item(widget, show=widget_kind == kind)
+            widget = row["widgets"][kind]
+            # Leave the widget alone while it is being edited
+            if not (old_state and old_state[0] == key and dpg.is_item_active(widget)):
+                try:
+                    dpg.set_value(widget, widget_value(kind, value))
+                except ValueError:
+                    dpg.set_value(widget, 0)
+            dpg.set_value(row["marker"], "*" if dirty else " ")
+
+        max_offset = self._max_offset()
+        dpg.configure_item(self.scrollbar, max_value=max_offset)
+        dpg.set_value(self.scrollbar, max_offset - self.offset)
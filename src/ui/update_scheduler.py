@@ -0,0 +1,93 @@
+import heapq
+import threading
+import time
+
+
+class UpdateScheduler:
+    # Runs backend polls on fixed wall-clock intervals in a background thread
+    # and records which pieces of state changed. The render loop calls
+    # take_changes() once per frame and only touches widgets for the keys it
+    # gets back, so an idle frame costs a single dict swap.
+    def __init__(self):
+        self._tasks = []
+        self._queue = []
+        self._changes = {}
+        self._last_values = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self.thread = None
+
+    def every(self, interval, key, poll, coalesce=True):
+        # poll() runs every `interval` seconds. A result different from the
+        # previous one is published under `key`. With coalesce=False every
+        # result is kept (as a list) until the render loop takes it.
+        task = {"interval": interval, "key": key, "poll": poll, "coalesce": coalesce}
+        self._tasks.append(task)
+        with self._lock:
+            heapq.heappush(self._queue, (time.monotonic(), len(self._tasks) - 1))
+        self._wakeup.set()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name="update-scheduler")
+        self.thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def invalidate(self):
+        # Force every key to be republished on its next poll (e.g. after the
+        # selected server changed)
+        with self._lock:
+            self._last_values.clear()
+            self._queue = [(time.monotonic(), index) for _, index in self._queue]
+            heapq.heapify(self._queue)
+        self._wakeup.set()
+
+    def publish(self, key, value, coalesce=True):
+        with self._lock:
+            if coalesce:
+                self._changes[key] = value
+            else:
+                self._changes.setdefault(key, []).append(value)
+
+    def take_changes(self):
+        with self._lock:
+            if not self._changes:
+                return {}
+            changes, self._changes = self._changes, {}
+            return changes
+
+    def _run(self):
+        while not self._stopped:
+            now = time.monotonic()
+            with self._lock:
+                if self._queue and self._queue[0][0] <= now:
+                    due, index = heapq.heappop(self._queue)
+                else:
+                    due, index = (self._queue[0][0] if self._queue else None), None
+            if index is None:
+                self._wakeup.wait(None if due is None else due - now)
+                self._wakeup.clear()
+                continue
+
+            task = self._tasks[index]
+            try:
+                value = task["poll"]()
+            except Exception as e:
+                print(f"Scheduled poll '{task['key']}' failed: {e}")
+                value = None
+
+            with self._lock:
+                # Fixed-rate: the next run is based on the planned time, not on
+                # when this one finished, so intervals do not drift
+                next_due = due + task["interval"]
+                if next_due < now:
+                    next_due = now + task["interval"]
+                heapq.heappush(self._queue, (next_due, index))
+                changed = not task["coalesce"] or self._last_values.get(task["key"], self) != value
+                if changed:
+                    self._last_values[task["key"]] = value
+            if changed and value is not None:
+                self.publish(task["key"], value, task["coalesce"])